@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark pentru codec-urile JSON folosite la incarcarea/salvarea datelor.
+
+Compara timpii de incarcare/salvare si dimensiunea fisierului pentru fiecare
+codec disponibil (json, orjson, msgspec), in format indentat si compact.
+
+Rulare:
+    python3 benchmarks/bench_codec.py                  (100k si 1M inregistrari)
+    python3 benchmarks/bench_codec.py --sizes 10000    (rulare rapida)
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from library_manager import CODECS  # noqa: E402
+
+
+def make_dataset(records: int) -> dict:
+    """Genereaza un set de date sintetic: ~10% carti, ~5% utilizatori, restul imprumuturi"""
+    n_books = max(1, records // 10)
+    n_users = max(1, records // 20)
+    n_loans = max(0, records - n_books - n_users)
+    categories = ["Fiction", "SF", "Poezie", "Istorie", "Stiinta", "Copii"]
+    books = [{
+        "id": i,
+        "title": f"Carte {i}",
+        "author": f"Autor {i % 5000}",
+        "isbn": f"978{i:010d}",
+        "category": categories[i % len(categories)],
+        "year": 1950 + i % 75,
+        "status": "DISPONIBIL",
+        "date_added": "2025-01-01",
+        "loan_count": i % 40
+    } for i in range(1, n_books + 1)]
+    users = [{
+        "id": str(1000 + i),
+        "name": f"Cititor {i}",
+        "email": f"cititor{i}@test.ro",
+        "registration_date": "2024-09-01",
+        "active_loans": 0,
+        "total_loans": 0,
+        "total_penalties": 0,
+        "returned_loans": 0,
+        "on_time_returns": 0,
+        "status": "ACTIV"
+    } for i in range(n_users)]
+    loans = [{
+        "id": i,
+        "book_id": 1 + i % n_books,
+        "book_title": f"Carte {1 + i % n_books}",
+        "user_id": str(1000 + i % n_users),
+        "user_name": f"Cititor {i % n_users}",
+        "loan_date": "2025-03-01",
+        "return_date": "2025-03-15",
+        "actual_return_date": "2025-03-14",
+        "status": "RETURNAT",
+        "penalty": 0,
+        "loan_day": 739311,
+        "return_day": 739325,
+        "actual_return_day": 739324
+    } for i in range(1, n_loans + 1)]
+    return {"books": books, "users": users, "loans": loans}
+
+
+def bench(codec, data: dict, compact: bool, path: str) -> tuple:
+    """Masoara salvarea si incarcarea unui fisier; returneaza (save_s, load_s, bytes)"""
+    start = time.perf_counter()
+    with open(path, 'wb') as f:
+        f.write(codec.dumps(data, compact))
+    save_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        codec.loads(f.read())
+    load_time = time.perf_counter() - start
+    return save_time, load_time, os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark codec-uri JSON")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000],
+                        help="Numarul de inregistrari generate (default: 100000 1000000)")
+    args = parser.parse_args()
+
+    codecs = []
+    for name, cls in CODECS.items():
+        try:
+            codecs.append(cls())
+        except ImportError:
+            print(f"(codec {name} nu este instalat - omis)")
+
+    fd, path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    try:
+        for size in args.sizes:
+            data = make_dataset(size)
+            print(f"\n{size} inregistrari")
+            print(f"{'Codec':<10} {'Format':<8} {'Salvare (s)':>12} {'Incarcare (s)':>14} {'Dimensiune (MB)':>16}")
+            for codec in codecs:
+                for compact in (False, True):
+                    save_time, load_time, size_bytes = bench(codec, data, compact, path)
+                    fmt = "compact" if compact else "indent"
+                    print(f"{codec.name:<10} {fmt:<8} {save_time:>12.3f} {load_time:>14.3f} "
+                          f"{size_bytes / 1_000_000:>16.1f}")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
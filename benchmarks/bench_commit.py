@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark pentru durabilitatea modificarilor: fsync dupa fiecare operatie vs group commit.
+
+Pe un set de date generat executa aceeasi secventa de imprumuturi/returnari
+(fiecare operatie modifica o carte, un utilizator si un imprumut) si afiseaza
+operatiile pe secunda pentru modul "fsync" si pentru modul "group" cu diferite
+dimensiuni ale grupului. Timpul include scrierea finala (flush).
+
+Rulare:
+    python3 benchmarks/bench_commit.py                          (1k si 10k inregistrari)
+    python3 benchmarks/bench_commit.py --sizes 100000 --ops 200  (in modul fsync dureaza minute)
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_codec import make_dataset  # noqa: E402
+from library_manager import LibraryManager  # noqa: E402
+
+SETTINGS = [("fsync", 1), ("group", 10), ("group", 100), ("group", 1000)]
+
+
+def run_ops(data_file: str, durability: str, group_ops: int, ops: int) -> tuple:
+    """Executa `ops` operatii (imprumut + returnare alternativ); returneaza (operatii/secunda, scrieri)"""
+    manager = LibraryManager(data_file, durability=durability, group_ops=group_ops, group_ms=60_000)
+    books = [b for b in manager.data["books"] if b["status"] == "DISPONIBIL"][:ops // 2 + 1]
+    user_id = manager.data["users"][0]["id"]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(ops):
+            book = books[i // 2]
+            if i % 2 == 0:
+                manager.borrow_book(str(book["id"]), user_id)
+            else:
+                manager.return_book(str(book["id"]), user_id)
+        manager.flush()
+    elapsed = time.perf_counter() - start
+    return ops / elapsed, manager.counters["saves"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fsync vs group commit")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000],
+                        help="Numarul de inregistrari generate (default: 1000 10000)")
+    parser.add_argument("--ops", type=int, default=400, help="Operatii per masuratoare (default: 400)")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            data_file = os.path.join(folder, "library_data.json")
+            manager = LibraryManager(data_file)
+            manager.data.update(make_dataset(size))
+            for collection in ("books", "users", "loans"):
+                manager._mark_dirty(collection)
+            manager._save_data()
+
+            print(f"\n{size} inregistrari, {args.ops} operatii")
+            print(f"  {'Durabilitate':<22} {'Operatii/s':>11} {'Scrieri':>8}")
+            for durability, group_ops in SETTINGS:
+                ops_per_second, saves = run_ops(data_file, durability, group_ops, args.ops)
+                label = durability if durability == "fsync" else f"group ({group_ops} op)"
+                print(f"  {label:<22} {ops_per_second:>11.1f} {saves:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark pentru codificarea cu tabela de texte (formatul 2 al fisierului de date).
+
+Compara formatul 1 (texte complete in fiecare inregistrare) cu formatul 2
+(autor, categorie, status, titlu si nume salvate o singura data, ca referinte)
+pe un set de date generat: dimensiunea fisierului, timpul de salvare/incarcare
+si memoria ocupata de datele incarcate.
+
+Rulare:
+    python3 benchmarks/bench_encoding.py                  (100k si 1M inregistrari)
+    python3 benchmarks/bench_encoding.py --sizes 10000    (rulare rapida)
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_codec import make_dataset  # noqa: E402
+from library_manager import LibraryManager, decode_data, get_codec  # noqa: E402
+
+
+def save(path: str, dataset: dict, data_format: int, compact: bool) -> tuple:
+    """Salveaza setul de date prin LibraryManager; returneaza (save_s, bytes)"""
+    manager = LibraryManager(path, data_format=data_format, compact=compact)
+    manager.data.update(dataset)
+    for collection in dataset:
+        manager._mark_dirty(collection)
+    start = time.perf_counter()
+    manager._save_data()
+    return time.perf_counter() - start, os.path.getsize(path)
+
+
+def load(path: str, intern: bool) -> tuple:
+    """Incarca fisierul (cu sau fara decodare/internare); returneaza (load_s, MB in memorie)"""
+    codec = get_codec()
+    tracemalloc.start()
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        data = codec.loads(f.read())
+    if intern:
+        decode_data(data)
+    elapsed = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del data
+    return elapsed, memory / 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tabela de texte (format 2)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000],
+                        help="Numarul de inregistrari generate (default: 100000 1000000)")
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, "library_data.json")
+    try:
+        for size in args.sizes:
+            dataset = make_dataset(size)
+            print(f"\n{size} inregistrari")
+            print(f"{'Format':<22} {'Salvare (s)':>12} {'Incarcare (s)':>14} {'Fisier (MB)':>12} {'Memorie (MB)':>13}")
+            for data_format, intern, label in ((1, False, "1 (fara internare)"), (1, True, "1 (texte internate)"),
+                                               (2, True, "2 (tabela de texte)")):
+                for compact in (False, True):
+                    save_time, size_bytes = save(path, dataset, data_format, compact)
+                    load_time, memory = load(path, intern)
+                    print(f"{label + (' compact' if compact else ''):<22} {save_time:>12.3f} {load_time:>14.3f} "
+                          f"{size_bytes / 1_000_000:>12.1f} {memory:>13.1f}")
+    finally:
+        import shutil
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark pentru instantaneul binar doar-citire (library_data.snap).
+
+Pentru seturi de date de marimi diferite masoara, intr-un proces nou, timpul
+comenzilor de citire servite din instantaneu fata de citirea completa a
+fisierului JSON (instantaneul mutat temporar), cu cache-ul de interogari
+deja populat. Afiseaza si costul instantaneului la salvare: complet la prima
+salvare, doar sectiunile modificate la o salvare obisnuita.
+
+Rulare:
+    python3 benchmarks/bench_snapshot.py                       (10k, 100k si 1M inregistrari)
+    python3 benchmarks/bench_snapshot.py --sizes 10000 --runs 3
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_codec import make_dataset  # noqa: E402
+from library_manager import LibraryManager  # noqa: E402
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'main.py')
+COMMANDS = [
+    ["stats"],
+    ["search", "Carte 5"],
+    ["report", "--overdue"],
+    ["report", "--popular"],
+]
+
+
+def run_ms(args: list, env: dict, runs: int) -> float:
+    """Mediana timpului (ms) pentru `runs` executii ale unei comenzi (dupa o rulare de incalzire)"""
+    subprocess.run(args, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(args, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark instantaneu doar-citire")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="Numarul de inregistrari generate (default: 10000 100000 1000000)")
+    parser.add_argument("--runs", type=int, default=5, help="Numarul de rulari per comanda (default: 5)")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            data_file = os.path.join(folder, "library_data.json")
+            snapshot = os.path.join(folder, "library_data.snap")
+            env = dict(os.environ, LIBRARY_DATA_FILE=data_file)
+
+            manager = LibraryManager(data_file)
+            manager.data.update(make_dataset(size))
+            for collection in ("books", "users", "loans"):
+                manager._mark_dirty(collection)
+            start = time.perf_counter()
+            manager._save_data()
+            save_time = time.perf_counter() - start
+            # O salvare obisnuita: doar cartile (si meta) sunt serializate din nou in instantaneu
+            start = time.perf_counter()
+            manager.data["books"][0]["loan_count"] += 1
+            manager._record_change("update", "books", manager.data["books"][0])
+            manager._save_data()
+            update_time = time.perf_counter() - start
+
+            print(f"\n{size} inregistrari: JSON {os.path.getsize(data_file) / 1_000_000:.1f} MB, "
+                  f"instantaneu {os.path.getsize(snapshot) / 1_000_000:.1f} MB")
+            print(f"  Salvare completa (cu instantaneul): {save_time:.2f} s, salvare dupa modificarea unei "
+                  f"carti: {update_time:.2f} s ({manager.counters['snapshot_reused']} sectiuni refolosite)")
+            print(f"  {'Comanda':<20} {'JSON (ms)':>10} {'Instantaneu (ms)':>17}")
+            # Prima rulare populeaza cache-ul de interogari
+            for command in COMMANDS:
+                subprocess.run([sys.executable, MAIN] + command, env=env, stdout=subprocess.DEVNULL, check=False)
+            for command in COMMANDS:
+                os.replace(snapshot, snapshot + ".off")
+                from_json = run_ms([sys.executable, MAIN] + command, env, args.runs)
+                os.replace(snapshot + ".off", snapshot)
+                from_snapshot = run_ms([sys.executable, MAIN] + command, env, args.runs)
+                print(f"  {' '.join(command):<20} {from_json:>10.1f} {from_snapshot:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark pentru timpul de pornire al CLI-ului.
+
+Ruleaza cateva comenzi simple intr-un proces nou (ca in utilizarea reala),
+masoara timpul total si foloseste `python -X importtime` pentru a afisa
+modulele care costa cel mai mult la import. Scriptul se termina cu cod 1
+daca o comanda depaseste bugetul de timp.
+
+Rulare:
+    python3 benchmarks/bench_startup.py
+    python3 benchmarks/bench_startup.py --runs 20 --budget 150
+"""
+import argparse
+import compileall
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'main.py')
+STARTUP_BUDGET_MS = 120  # peste timpul de pornire al interpretorului (python -c pass)
+COMMANDS = [
+    ["--help"],
+    ["stats"],
+    ["list"],
+    ["search", "Carte 5"],
+    ["user_history", "1001"],
+]
+
+
+def run_ms(args: list, env: dict, runs: int) -> float:
+    """Mediana timpului (ms) pentru `runs` executii ale unei comenzi"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(args, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def import_profile(env: dict, command: list, top: int = 10) -> list:
+    """Cele mai costisitoare importuri (cumulativ, ms) raportate de -X importtime"""
+    result = subprocess.run([sys.executable, "-X", "importtime", MAIN] + command, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=False)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark timp de pornire")
+    parser.add_argument("--runs", type=int, default=10, help="Numarul de rulari per comanda (default: 10)")
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_MS,
+                        help=f"Bugetul in ms peste pornirea interpretorului (default: {STARTUP_BUDGET_MS})")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        env = dict(os.environ, LIBRARY_DATA_FILE=os.path.join(folder, "library_data.json"))
+        # ca in utilizarea reala, implementarea se incarca din bytecode-ul din __pycache__
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        compileall.compile_dir(os.path.dirname(MAIN), quiet=1)
+        setup = [
+            ["add_user", "Ion Popescu", "--id", "1001"],
+            ["add_book", "Carte 5", "Autor Test"],
+            ["borrow", "Carte 5", "--user_id", "1001"],
+        ]
+        for command in setup:
+            subprocess.run([sys.executable, MAIN] + command, env=env, stdout=subprocess.DEVNULL, check=True)
+
+        baseline = run_ms([sys.executable, "-c", "pass"], env, args.runs)
+        print(f"Pornire interpretor (python -c pass): {baseline:.1f} ms\n")
+        print(f"{'Comanda':<28} {'Total (ms)':>11} {'Peste baza (ms)':>16}  Buget")
+
+        over_budget = False
+        for command in COMMANDS:
+            total = run_ms([sys.executable, MAIN] + command, env, args.runs)
+            ok = total - baseline <= args.budget
+            over_budget |= not ok
+            print(f"{' '.join(command):<28} {total:>11.1f} {total - baseline:>16.1f}  {'OK' if ok else 'DEPASIT'}")
+
+        print("\nImporturi cele mai costisitoare (stats, cumulativ):")
+        for cumulative_ms, name in import_profile(env, ["stats"]):
+            print(f"  {cumulative_ms:>7.1f} ms  {name}")
+
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
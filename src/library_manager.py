@@ -0,0 +1,5451 @@
+﻿#!/usr/bin/env python3
+import argparse
+import bisect
+import heapq
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+# Fix pentru encoding Unicode pe Windows
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+# Modulele folosite doar de anumite comenzi (csv, json, hashlib, mmap) sunt
+# importate in functiile care au nevoie de ele, pentru o pornire rapida.
+
+# Configurare cai fisiere
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, '..', 'data')
+DATA_FILE = os.environ.get("LIBRARY_DATA_FILE", os.path.join(DATA_DIR, 'library_data.json'))
+DATE_FORMAT = "%Y-%m-%d"
+PENALTY_PER_DAY = 1  # 1 RON per zi penalitatea in caz de intarziere
+ARCHIVE_AFTER_DAYS = 180  # imprumuturile returnate mai vechi de atat sunt arhivate
+ARCHIVE_INDEX_FILE = "index.json"
+HOLD_PICKUP_DAYS = 3  # zilele in care o rezervare pregatita poate fi ridicata
+NOTIFY_BATCH = 1000  # notificari pe fisier NDJSON in folderul outbox
+IMPORT_CHUNK = 5000  # randuri CSV validate impreuna la importul de utilizatori/imprumuturi
+IMPORT_SPLIT_BYTES = 8 * 1024 * 1024  # fisierele CSV mai mari sunt parsate pe bucati, in paralel
+BOOK_FIELDS = ['id', 'title', 'author', 'isbn', 'category', 'year', 'status', 'date_added', 'loan_count']
+USER_FIELDS = ['id', 'name', 'email', 'registration_date', 'active_loans', 'total_loans', 'status']
+LOAN_FIELDS = ['id', 'book_id', 'book_title', 'user_id', 'user_name', 'loan_date', 'return_date', 'status']
+WATERMARK_FILE = "watermark.json"  # ultimul seq exportat, pastrat in folderul de export incremental
+DIFF_BUCKETS = 1024  # numarul de grupe (dupa ID) comparate la diff/merge
+# Campuri calculate din imprumuturi: ignorate la comparare si recalculate dupa merge
+DERIVED_FIELDS = {
+    "books": ("status", "loan_count"),
+    "users": ("active_loans", "total_loans", "total_penalties", "returned_loans", "on_time_returns")
+}
+# Identifica aceeasi carte/acelasi imprumut adaugat sub ID-uri diferite in doua copii
+NATURAL_KEYS = {"books": ("title", "author", "isbn"), "loans": ("book_id", "user_id", "loan_date")}
+BACKUP_CHUNK_RECORDS = 512  # dimensiunea medie (in inregistrari) a unui bloc de backup
+QUERY_CACHE_SIZE = 128  # numarul maxim de rezultate de interogari pastrate in cache
+QUERY_CACHE_COMPACT = 4  # jurnalul cache-ului este compactat peste QUERY_CACHE_COMPACT * QUERY_CACHE_SIZE intrari
+# Durabilitatea modificarilor: "fsync" scrie si sincronizeaza pe disc dupa fiecare operatie,
+# "group" le aduna in memorie si le scrie impreuna (group commit) la N operatii sau T ms.
+# Jurnalul de schimbari este sincronizat separat (un fsync in plus) doar o data pe grup.
+DURABILITY_MODES = ("fsync", "group")
+DURABILITY = os.environ.get("LIBRARY_DURABILITY", "fsync")
+GROUP_COMMIT_OPS = int(os.environ.get("LIBRARY_GROUP_OPS", "100"))
+GROUP_COMMIT_MS = int(os.environ.get("LIBRARY_GROUP_MS", "1000"))
+DEFAULT_BRANCH = "principal"  # filiala care foloseste DATA_FILE
+BRANCH_ALL = "all"  # --branch all: interogare federata peste toate filialele
+BRANCHES_FOLDER = "branches"
+FEDERATED_COMMANDS = ("search", "report", "stats", "branches")
+
+# Campurile de tip data ale unui imprumut si perechea lor ordinala (numarul zilei)
+LOAN_DATE_FIELDS = {
+    "loan_date": "loan_day",
+    "return_date": "return_day",
+    "actual_return_date": "actual_return_day",
+}
+
+
+@lru_cache(maxsize=8192)
+def _date_ordinal(value: str) -> int:
+    """Transforma o data YYYY-MM-DD in ordinalul zilei (rezultatele sunt memorate)"""
+    return date.fromisoformat(value).toordinal()
+
+
+@lru_cache(maxsize=8192)
+def _ordinal_date(day: int) -> str:
+    """Inversul lui _date_ordinal: ordinalul zilei ca text YYYY-MM-DD"""
+    return date.fromordinal(day).strftime(DATE_FORMAT)
+
+
+# Serializare: "auto" alege orjson/msgspec daca sunt instalate, altfel json din stdlib
+JSON_CODEC = os.environ.get("LIBRARY_JSON_CODEC", "auto")
+JSON_COMPACT = os.environ.get("LIBRARY_JSON_COMPACT", "0") == "1"
+# Formatul fisierului de date: 1 = texte complete, 2 = texte repetitive intr-o tabela comuna
+DATA_FORMAT = int(os.environ.get("LIBRARY_DATA_FORMAT", "2"))
+# Campurile cu valori repetitive, salvate in formatul 2 ca numere (pozitia in tabela de texte)
+ENCODED_FIELDS = {"books": ("author", "category", "status"), "loans": ("book_title", "user_name", "status")}
+
+
+class JsonCodec:
+    """Codec JSON implicit, bazat pe modulul json din biblioteca standard"""
+
+    name = "json"
+
+    def __init__(self):
+        import json
+        self._json = json
+        self.decode_errors = (json.JSONDecodeError, UnicodeDecodeError)
+
+    def dumps(self, obj, compact: bool = False) -> bytes:
+        if compact:
+            return self._json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return self._json.dumps(obj, indent=4, ensure_ascii=False).encode('utf-8')
+
+    def loads(self, raw: bytes):
+        return self._json.loads(raw)
+
+
+class OrjsonCodec(JsonCodec):
+    """Codec orjson (orjson suporta doar indentare de 2 spatii)"""
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self.decode_errors = (orjson.JSONDecodeError, UnicodeDecodeError)
+
+    def dumps(self, obj, compact: bool = False) -> bytes:
+        option = 0 if compact else self._orjson.OPT_INDENT_2
+        return self._orjson.dumps(obj, option=option)
+
+    def loads(self, raw: bytes):
+        return self._orjson.loads(raw)
+
+
+class MsgspecCodec(JsonCodec):
+    """Codec msgspec"""
+
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+        self._msgspec = msgspec
+        self.decode_errors = (msgspec.DecodeError, UnicodeDecodeError)
+
+    def dumps(self, obj, compact: bool = False) -> bytes:
+        raw = self._msgspec.json.encode(obj)
+        return raw if compact else self._msgspec.json.format(raw, indent=4)
+
+    def loads(self, raw: bytes):
+        return self._msgspec.json.decode(raw)
+
+
+CODECS = {"json": JsonCodec, "orjson": OrjsonCodec, "msgspec": MsgspecCodec}
+
+
+def get_codec(name: str = "auto") -> JsonCodec:
+    """Returneaza codec-ul cerut; "auto" il alege pe cel mai rapid disponibil"""
+    if name == "auto":
+        for candidate in ("orjson", "msgspec"):
+            try:
+                return CODECS[candidate]()
+            except ImportError:
+                continue
+        return JsonCodec()
+    if name not in CODECS:
+        raise ValueError(f"Codec necunoscut: {name} (disponibile: auto, {', '.join(CODECS)})")
+    return CODECS[name]()
+
+
+def encode_records(records: List[Dict], fields: tuple, table: Dict[str, int]) -> List[Dict]:
+    """Copii ale inregistrarilor cu textele din campurile date inlocuite prin pozitia lor in tabela.
+
+    Tabela este doar extinsa (textele noi primesc pozitii noi), deci fragmentele
+    serializate anterior cu aceeasi tabela raman valide.
+    """
+    encoded = []
+    for record in records:
+        record = dict(record)
+        for field in fields:
+            value = record.get(field)
+            if isinstance(value, str):
+                ref = table.get(value)
+                if ref is None:
+                    ref = table[value] = len(table)
+                record[field] = ref
+        encoded.append(record)
+    return encoded
+
+
+def decode_data(loaded: Dict) -> Dict:
+    """Inlocuieste referintele din formatul 2 cu textele din tabela (pe loc).
+
+    Fiecare text distinct exista o singura data in memorie: in formatul 2 toate
+    referintele folosesc acelasi obiect din tabela, iar in formatul 1 textele sunt internate.
+    """
+    strings = [sys.intern(value) for value in loaded.get("strings", [])]
+    encoded = loaded.get("format", 1) >= 2
+    for collection, fields in ENCODED_FIELDS.items():
+        for record in loaded.get(collection, []):
+            for field in fields:
+                value = record.get(field)
+                if encoded and isinstance(value, int):
+                    record[field] = strings[value]
+                elif isinstance(value, str):
+                    record[field] = sys.intern(value)
+    return loaded
+
+
+def _content_hash(blob: bytes) -> str:
+    """Amprenta continutului unui bloc de backup (numele fisierului din depozit)"""
+    from hashlib import blake2b
+    return blake2b(blob, digest_size=20).hexdigest()
+
+
+def _record_chunks(records: List[Dict]):
+    """Imparte o colectie in blocuri cu limite stabilite de ID-ul inregistrarilor.
+
+    Un bloc se inchide dupa inregistrarile al caror hash de ID este multiplu de
+    BACKUP_CHUNK_RECORDS, deci adaugarea sau stergerea unei inregistrari schimba
+    doar blocul ei, nu si pe cele care urmeaza (ca la impartirea dupa pozitie).
+    """
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if _key_hash(str(record.get("id"))) % BACKUP_CHUNK_RECORDS == 0:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def record_buckets(records, collection: str, codec: JsonCodec, wanted=None, hashes: array = None) -> tuple:
+    """Imparte inregistrarile in DIFF_BUCKETS grupe dupa ID, intr-o singura trecere.
+
+    Returneaza (sumare, grupe): sumarul unei grupe este XOR-ul hash-urilor
+    inregistrarilor ei, iar grupa este un dict {id: (hash, inregistrare)}.
+    Grupele cu acelasi sumar in ambele fisiere nu mai sunt comparate. Cu `wanted`,
+    doar grupele cu aceste numere pastreaza inregistrarile (celelalte au doar sumarul);
+    `hashes` primeste hash-ul fiecarei inregistrari, in ordine.
+    """
+    derived = DERIVED_FIELDS.get(collection, ())
+    summaries = [0] * DIFF_BUCKETS
+    buckets: List[Dict] = [{} for _ in range(DIFF_BUCKETS)]
+    dumps = codec.dumps
+    for record in records:
+        record_id = record.get("id")
+        stable = {k: v for k, v in record.items() if k not in derived} if derived else record
+        # hash() pe 64 de biti este suficient: ambele fisiere sunt comparate in acelasi proces
+        h = hash(dumps(stable, True))
+        bucket = hash(record_id) % DIFF_BUCKETS
+        summaries[bucket] ^= h
+        if hashes is not None:
+            hashes.append(h)
+        if wanted is None or bucket in wanted:
+            buckets[bucket][record_id] = (h, record)
+    return summaries, buckets
+
+
+def changed_records(ours: tuple, theirs: tuple):
+    """(id, intrarea noastra, intrarea lor) pentru inregistrarile care difera"""
+    (our_summaries, our_buckets), (their_summaries, their_buckets) = ours, theirs
+    for bucket in range(DIFF_BUCKETS):
+        if our_summaries[bucket] == their_summaries[bucket]:
+            continue
+        mine, other = our_buckets[bucket], their_buckets[bucket]
+        for record_id in mine.keys() | other.keys():
+            o, t = mine.get(record_id), other.get(record_id)
+            if o is None or t is None or o[0] != t[0]:
+                yield record_id, o, t
+
+
+class JsonStream:
+    """Cititor JSON incremental: documentul este parcurs element cu element, fara sa fie
+    incarcat tot in memorie (doar blocul curent si elementul decodat)"""
+
+    def __init__(self, f, chunk_size: int = 1 << 16):
+        import codecs
+        import json
+        self._f = f
+        self._chunk_size = chunk_size
+        self._text = codecs.getincrementaldecoder('utf-8-sig')()
+        self._raw_decode = json.JSONDecoder().raw_decode
+        self._buf, self._pos, self._eof = "", 0, False
+
+    def _fill(self) -> bool:
+        """Adauga urmatorul bloc din fisier; False la sfarsitul fisierului"""
+        if self._eof:
+            return False
+        chunk = self._f.read(self._chunk_size)
+        self._eof = not chunk
+        self._buf = self._buf[self._pos:] + self._text.decode(chunk, final=self._eof)
+        self._pos = 0
+        return not self._eof
+
+    def peek(self) -> str:
+        """Urmatorul caracter diferit de spatiu (fara sa fie consumat); "" la sfarsit"""
+        while True:
+            buf, pos = self._buf, self._pos
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            self._pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        """Consuma unul dintre caracterele date (altfel ValueError)"""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"JSON invalid: se astepta unul dintre {chars!r}, gasit {char!r}")
+        self._pos += 1
+        return char
+
+    def value(self):
+        """Decodeaza valoarea urmatoare (folosit pentru valori mici: chei, inregistrari)"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._raw_decode(self._buf, self._pos)
+            except ValueError:
+                # Elementul continua in blocul urmator (un element nu trece de 64 de blocuri,
+                # altfel eroarea este reala si nu mai citim restul fisierului)
+                if len(self._buf) - self._pos > 64 * self._chunk_size or not self._fill():
+                    raise
+                continue
+            # Un numar de la sfarsitul blocului poate continua in blocul urmator
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def items(self):
+        """Elementele unui tablou sau perechile (cheie, valoare) ale unui obiect, pe rand"""
+        close = "]" if self.expect("[{") == "[" else "}"
+        if self.peek() == close:
+            self._pos += 1
+            return
+        while True:
+            if close == "}":
+                key = self.value()
+                self.expect(":")
+                yield key, self.value()
+            else:
+                yield self.value()
+            if self.expect("," + close) == close:
+                return
+
+    def members(self):
+        """Cheile obiectului de pe primul nivel; apelantul citeste valoarea fiecareia"""
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.expect(",}") == "}":
+                return
+
+    def skip(self) -> None:
+        """Sare peste valoarea urmatoare (tablourile si obiectele element cu element)"""
+        if self.peek() in "[{":
+            for _ in self.items():
+                pass
+        else:
+            self.value()
+
+
+class DataFileStream:
+    """Alt fisier de date (diff/merge), citit incremental: fiecare parcurgere a unei colectii
+    reciteste fisierul, deci memoria nu depinde de marimea lui"""
+
+    def __init__(self, path: str):
+        self.path = path
+        # Cel mai mare ID numeric vazut pe colectie (ID-urile noi de la merge)
+        self.max_ids: Dict[str, int] = {}
+        # Prima parcurgere valideaza tot fisierul si citeste tabela de texte (formatul 2),
+        # scrisa dupa colectii
+        data_format, strings = 1, []
+        with open(path, 'rb') as f:
+            stream = JsonStream(f)
+            for key in stream.members():
+                if key == "format":
+                    data_format = stream.value()
+                elif key == "strings":
+                    strings = [sys.intern(value) for value in stream.items()]
+                else:
+                    stream.skip()
+            if stream.peek():
+                raise ValueError("JSON invalid: continut dupa sfarsitul documentului")
+        self.strings = strings if data_format >= 2 else None
+
+    def records(self, collection: str):
+        """Inregistrarile colectiei, decodate una cate una (ca decode_data)"""
+        fields = ENCODED_FIELDS.get(collection, ())
+        strings = self.strings
+        max_id = self.max_ids.get(collection, 0)
+        with open(self.path, 'rb') as f:
+            stream = JsonStream(f)
+            for key in stream.members():
+                if key != collection:
+                    stream.skip()
+                    continue
+                for record in stream.items():
+                    for field in fields:
+                        value = record.get(field)
+                        if strings is not None and isinstance(value, int):
+                            record[field] = strings[value]
+                        elif isinstance(value, str):
+                            record[field] = sys.intern(value)
+                    record_id = record.get("id")
+                    if isinstance(record_id, int) and record_id > max_id:
+                        max_id = self.max_ids[collection] = record_id
+                    yield record
+                # Colectiile urmatoare nu mai sunt citite
+                return
+
+
+def diff_buckets(ours: List[Dict], theirs, collection: str, codec: JsonCodec) -> tuple:
+    """Grupele (record_buckets) ale ambelor copii, cu inregistrarile pastrate doar in grupele
+    care difera, pentru changed_records.
+
+    `theirs` returneaza o parcurgere noua a colectiei din celalalt fisier (citita
+    incremental); aceasta este parcursa de doua ori: sumarele, apoi grupele diferite.
+    Pentru colectia noastra (deja in memorie) sunt pastrate doar hash-urile.
+    """
+    hashes = array('q')
+    our_summaries, our_buckets = record_buckets(ours, collection, codec, wanted=(), hashes=hashes)
+    their_summaries, their_buckets = record_buckets(theirs(), collection, codec, wanted=())
+    wanted = {bucket for bucket in range(DIFF_BUCKETS) if our_summaries[bucket] != their_summaries[bucket]}
+    if wanted:
+        for record, h in zip(ours, hashes):
+            record_id = record.get("id")
+            bucket = hash(record_id) % DIFF_BUCKETS
+            if bucket in wanted:
+                our_buckets[bucket][record_id] = (h, record)
+        their_buckets = record_buckets(theirs(), collection, codec, wanted)[1]
+    return (our_summaries, our_buckets), (their_summaries, their_buckets), wanted
+
+
+def _csv_chunks(reader, size: int = IMPORT_CHUNK):
+    """Randurile unui csv.DictReader in loturi de (numar linie, rand)"""
+    chunk = []
+    for row in reader:
+        chunk.append((reader.line_num, row))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _csv_value(row: Dict, *names: str) -> str:
+    """Prima valoare nevida dintre coloanele cu numele date (ex: 'name'/'nume')"""
+    for name in names:
+        value = row.get(name)
+        if value and value.strip():
+            return value.strip()
+    return ""
+
+
+def _import_files(paths: List[str]) -> List[str]:
+    """Fisierele CSV de importat, in ordine: cele date explicit, iar din foldere alfabetic"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                         if name.lower().endswith(".csv"))
+        else:
+            files.append(path)
+    return files
+
+
+def _import_parts(files: List[str], split_bytes: int) -> List[tuple]:
+    """Imparte fisierele in intervale de octeti (fisier, inceput, sfarsit); cele mici raman intregi"""
+    parts = []
+    for path in files:
+        size = os.path.getsize(path)
+        if size <= split_bytes:
+            parts.append((path, 0, size))
+        else:
+            parts.extend((path, start, min(start + split_bytes, size)) for start in range(0, size, split_bytes))
+    return parts
+
+
+def _parse_book_part(part: tuple) -> tuple:
+    """Parseaza si valideaza cartile dintr-un interval al unui CSV (executat intr-un proces separat).
+
+    Intervalul contine liniile care incep intre inceput si sfarsit. Returneaza randurile
+    valide (isbn, titlu, autor, categorie, an), numarul celor invalide si paritatea
+    ghilimelelor, folosita la verificarea ca taietura nu a cazut intr-un camp cu linii noi.
+    """
+    import csv
+    import io
+    path, start, end = part
+    with open(path, 'rb') as f:
+        header = f.readline()
+        if start > len(header):
+            # Linia care contine octetul start-1 apartine intervalului anterior
+            f.seek(start - 1)
+            f.readline()
+        chunk = f.read(max(0, end - f.tell()))
+        if chunk and not chunk.endswith(b"\n"):
+            chunk += f.readline()
+
+    fieldnames = next(csv.reader([header.decode('utf-8')]), [])
+    rows, invalid = [], 0
+    for row in csv.DictReader(io.StringIO(chunk.decode('utf-8'), newline=''), fieldnames=fieldnames):
+        title = (row.get('title', row.get('titlu', '')) or '').strip()
+        author = (row.get('author', row.get('autor', '')) or '').strip()
+        if not title or not author:
+            invalid += 1
+            continue
+        year_str = row.get('year', row.get('an', ''))
+        year = int(year_str) if year_str and str(year_str).isdigit() else None
+        rows.append((row.get('isbn', row.get('ISBN', '')) or '', title, author,
+                     row.get('category', row.get('categorie', 'Necategorizat')), year))
+    return rows, invalid, chunk.count(b'"') % 2
+
+
+# Fatetele afisate la cautare (numarul de valori afisate pentru fiecare) si sectiunile lor din
+# fisierul index: hash-ul valorii -> ID-urile cartilor, sortate
+FACETS = ("category", "author", "status", "decade")
+FACET_TOP = 5
+FACET_SECTIONS = {"category": b"f_categ", "author": b"f_author", "status": b"f_status", "decade": b"f_decade"}
+
+
+def _facet_value(facet: str, book: Dict) -> str:
+    """Valoarea unei carti pentru o fateta (deceniul este derivat din an)"""
+    if facet == "decade":
+        year = book.get("year")
+        return f"{year // 10 * 10}s" if isinstance(year, int) else "necunoscut"
+    return str(book.get(facet) or "N/A")
+
+
+def _sorted_contains(values, value) -> bool:
+    """Cautare binara intr-o lista sortata (lista de ID-uri a unei valori de fateta)"""
+    pos = bisect.bisect_left(values, value)
+    return pos < len(values) and values[pos] == value
+
+
+# Matricea de co-imprumut ("au mai imprumutat"): carte -> {alta carte: numar de cititori comuni}
+COBORROW_NEIGHBOURS = 50  # vecinii pastrati pentru fiecare carte dupa pruning
+COBORROW_HISTORY = 100  # ultimele carti distincte ale unui cititor luate in calcul la un imprumut nou
+RECOMMEND_TOP = 5
+ALSO_BORROWED_SHOWN = 3  # titluri afisate la fiecare rezultat al cautarii
+ALSO_BORROWED_ROWS = 10  # primele rezultate ale cautarii care primesc recomandari
+
+
+def _coborrow_add(matrix: Dict[str, Dict[str, int]], book_id: str, others: List[str]) -> set:
+    """Numara perechile (carte noua, carti citite anterior); returneaza cartile atinse.
+
+    Cheile sunt siruri (cerinta JSON/orjson). Cand o carte depaseste dublul
+    limitei de vecini, sunt pastrati doar cei mai frecventi COBORROW_NEIGHBOURS.
+    """
+    touched = {book_id}
+    for other in others:
+        for a, b in ((book_id, other), (other, book_id)):
+            row = matrix.setdefault(a, {})
+            row[b] = row.get(b, 0) + 1
+            if len(row) > 2 * COBORROW_NEIGHBOURS:
+                kept = sorted(row.items(), key=lambda pair: (-pair[1], int(pair[0])))[:COBORROW_NEIGHBOURS]
+                matrix[a] = dict(kept)
+        touched.add(other)
+    return touched
+
+
+# Contoarele zilnice de circulatie (data -> valori) si perioadele raportului `trends`
+ROLLUP_FIELDS = ("loans", "returns", "overdue", "penalties")
+TREND_PERIODS = ("day", "week", "month")
+
+
+def _rollup_loan(rollups: Dict[str, Dict], loan: Dict) -> None:
+    """Adauga contributia unui imprumut la contoarele zilnice"""
+    if loan.get("loan_date"):
+        rollups.setdefault(loan["loan_date"], dict.fromkeys(ROLLUP_FIELDS, 0))["loans"] += 1
+    if loan.get("status") == "RETURNAT" and loan.get("actual_return_date"):
+        row = rollups.setdefault(loan["actual_return_date"], dict.fromkeys(ROLLUP_FIELDS, 0))
+        row["returns"] += 1
+        if loan.get("penalty", 0) > 0:
+            row["overdue"] += 1
+            row["penalties"] += loan["penalty"]
+
+
+def _period_start(day: date, period: str) -> date:
+    """Prima zi a perioadei (zi, saptamana incepand luni, luna) care contine ziua data"""
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+
+TRIE_BURST = 64  # dimensiunea maxima a unei frunze din trie inainte de a fi impartita
+SHELL_COMPLETIONS = 50  # numarul maxim de variante oferite la Tab
+SHELL_COMMANDS = ("add_book", "add_user", "list", "search", "borrow", "return", "reserve", "cancel_reservation",
+                  "delete_book", "delete_user", "reactivate_user", "user_history", "recommend", "report", "stats",
+                  "trends", "archive", "notify", "export", "check", "diff", "merge", "backup", "restore", "import",
+                  "flush")
+# Optiunile alese o singura data, la pornirea shell-ului sau a unui batch
+SESSION_OPTIONS = ("--branch", "--codec", "--compact", "--durability", "--group-ops", "--group-ms")
+
+
+class _TrieNode:
+    __slots__ = ("children", "bucket", "ended")
+
+    def __init__(self, bucket: List[tuple] = None):
+        self.children: Optional[Dict[str, "_TrieNode"]] = None
+        self.bucket: Optional[List[tuple]] = bucket if bucket is not None else []
+        self.ended: List[str] = []
+
+
+class PrefixTrie:
+    """Trie de prefixe pentru completare (fara diferente intre litere mari si mici).
+
+    Nodurile interne au cate un copil pentru fiecare caracter; frunzele pastreaza o
+    lista sortata de (cheie, text) si sunt impartite abia cand depasesc TRIE_BURST
+    intrari, astfel incat un catalog de milioane de titluri nu creeaza milioane de
+    noduri. Textele identice sunt numarate, deci pot fi adaugate/sterse repetat.
+    """
+
+    def __init__(self, words=()):
+        self._counts: Dict[str, int] = {}
+        for word in words:
+            if word:
+                self._counts[word] = self._counts.get(word, 0) + 1
+        self.root = _TrieNode(sorted((word.lower(), word) for word in self._counts))
+        self._burst(self.root, 0)
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def _burst(self, node: _TrieNode, depth: int) -> None:
+        if len(node.bucket) <= TRIE_BURST:
+            return
+        node.children = {}
+        for key, word in node.bucket:
+            if len(key) == depth:
+                node.ended.append(word)
+            else:
+                node.children.setdefault(key[depth], _TrieNode()).bucket.append((key, word))
+        node.bucket = None
+        for child in node.children.values():
+            self._burst(child, depth + 1)
+
+    def _leaf(self, key: str, create: bool = False) -> tuple:
+        """Nodul in care se afla (sau ar trebui sa se afle) cheia si adancimea lui"""
+        node, depth = self.root, 0
+        while node.children is not None and depth < len(key):
+            child = node.children.get(key[depth])
+            if child is None:
+                if not create:
+                    return None, depth
+                child = node.children[key[depth]] = _TrieNode()
+            node, depth = child, depth + 1
+        return node, depth
+
+    def add(self, word: str) -> None:
+        if not word:
+            return
+        self._counts[word] = self._counts.get(word, 0) + 1
+        if self._counts[word] > 1:
+            return
+        key = word.lower()
+        node, depth = self._leaf(key, create=True)
+        if node.children is not None:
+            bisect.insort(node.ended, word)
+        else:
+            bisect.insort(node.bucket, (key, word))
+            self._burst(node, depth)
+
+    def remove(self, word: str) -> None:
+        count = self._counts.get(word, 0)
+        if count > 1:
+            self._counts[word] = count - 1
+            return
+        if not count:
+            return
+        del self._counts[word]
+        key = word.lower()
+        node, _ = self._leaf(key)
+        if node is None:
+            return
+        entries, entry = (node.ended, word) if node.children is not None else (node.bucket, (key, word))
+        i = bisect.bisect_left(entries, entry)
+        if i < len(entries) and entries[i] == entry:
+            del entries[i]
+
+    def complete(self, prefix: str, limit: int = SHELL_COMPLETIONS) -> List[str]:
+        """Primele `limit` texte care incep cu prefixul, in ordine alfabetica"""
+        key = prefix.lower()
+        node, depth = self._leaf(key)
+        if node is None:
+            return []
+        if node.children is None:
+            results = []
+            for i in range(bisect.bisect_left(node.bucket, (key,)), len(node.bucket)):
+                entry_key, word = node.bucket[i]
+                if not entry_key.startswith(key) or len(results) == limit:
+                    break
+                results.append(word)
+            return results
+        results: List[str] = []
+        self._collect(node, results, limit)
+        return results
+
+    def _collect(self, node: _TrieNode, results: List[str], limit: int) -> None:
+        if node.children is None:
+            results.extend(word for _, word in node.bucket[:limit - len(results)])
+            return
+        results.extend(node.ended[:limit - len(results)])
+        for char in sorted(node.children):
+            if len(results) >= limit:
+                return
+            self._collect(node.children[char], results, limit)
+
+
+# Campurile cu interogari pe interval: colectia si sectiunea din fisierul index
+RANGE_FIELDS = {
+    "year": ("books", b"r_year"),
+    "date_added": ("books", b"r_added"),
+    "loan_date": ("loans", b"r_loan"),
+    "return_date": ("loans", b"r_return")
+}
+
+
+def _range_key(field: str, record: Dict) -> Optional[int]:
+    """Cheia intreaga (an sau ordinalul zilei) a unei inregistrari pentru un index pe interval"""
+    if field == "year":
+        value = record.get("year")
+        return value if isinstance(value, int) and value >= 0 else None
+    if field == "date_added":
+        value = record.get("date_added")
+        try:
+            return _date_ordinal(value) if value else None
+        except (ValueError, TypeError):
+            return None
+    return record.get(LOAN_DATE_FIELDS[field])
+
+
+class RangeIndex:
+    """Index sortat dupa o cheie intreaga; un interval costa O(log n + k)"""
+
+    def __init__(self, pairs: List[tuple]):
+        pairs.sort(key=lambda pair: pair[0])
+        self.keys = [key for key, _ in pairs]
+        self.records = [record for _, record in pairs]
+
+    def add(self, key: Optional[int], record: Dict) -> None:
+        if key is None:
+            return
+        i = bisect.bisect_right(self.keys, key)
+        self.keys.insert(i, key)
+        self.records.insert(i, record)
+
+    def remove(self, key: Optional[int], record: Dict) -> None:
+        if key is None:
+            return
+        for i in range(bisect.bisect_left(self.keys, key), bisect.bisect_right(self.keys, key)):
+            if self.records[i] is record:
+                del self.keys[i]
+                del self.records[i]
+                return
+
+    def between(self, low: Optional[int], high: Optional[int]) -> List[Dict]:
+        start = 0 if low is None else bisect.bisect_left(self.keys, low)
+        end = len(self.keys) if high is None else bisect.bisect_right(self.keys, high)
+        return self.records[start:end]
+
+    def iter_between(self, low: Optional[int], high: Optional[int]):
+        """Ca `between`, dar fara copierea listei: perechile (cheie, inregistrare)"""
+        start = 0 if low is None else bisect.bisect_left(self.keys, low)
+        end = len(self.keys) if high is None else bisect.bisect_right(self.keys, high)
+        for i in range(start, end):
+            yield self.keys[i], self.records[i]
+
+
+class LibraryIndex:
+    """Indecsi in memorie (dictionare) pentru cautarile frecvente"""
+
+    def __init__(self, data: Dict[str, List[Dict]]):
+        self.data = data
+        # Indecsii pe interval sunt construiti (sortati) abia la prima interogare
+        self.ranges: Dict[str, RangeIndex] = {}
+        self.books_by_id: Dict[int, Dict] = {}
+        self.books_by_isbn: Dict[str, List[Dict]] = {}
+        self.books_by_title: Dict[str, List[Dict]] = {}
+        self.users_by_id: Dict[str, Dict] = {}
+        self.loans_by_user: Dict[str, List[Dict]] = {}
+        self.active_loans: Dict[int, Dict] = {}
+        # Imprumuturile active ordonate dupa (zi scadenta, ID), construit la prima folosire
+        self.active_due: Optional[RangeIndex] = None
+        # Dictionarele unei colectii sunt construite la prima cautare in ea (o comanda
+        # care adauga o carte nu mai indexeaza toate imprumuturile)
+        self._built: set = set()
+
+    def _build(self, collection: str) -> None:
+        if collection in self._built:
+            return
+        self._built.add(collection)
+        add = {"books": self._index_book, "users": self.add_user, "loans": self._index_loan}[collection]
+        for record in self.data[collection]:
+            add(record)
+
+    # Actualizari (inregistrarile unei colectii inca neindexate sunt preluate la construire)
+
+    def _update_ranges(self, collection: str, record: Dict, remove: bool = False) -> None:
+        for field, index in self.ranges.items():
+            if RANGE_FIELDS[field][0] == collection:
+                (index.remove if remove else index.add)(_range_key(field, record), record)
+
+    def add_book(self, book: Dict) -> None:
+        self._update_ranges("books", book)
+        if "books" in self._built:
+            self._index_book(book)
+
+    def _index_book(self, book: Dict) -> None:
+        self.books_by_id[book.get("id")] = book
+        self.books_by_isbn.setdefault(book.get("isbn", ""), []).append(book)
+        self.books_by_title.setdefault(book.get("title", "").lower(), []).append(book)
+
+    def remove_book(self, book: Dict) -> None:
+        self._update_ranges("books", book, remove=True)
+        if "books" not in self._built:
+            return
+        self.books_by_id.pop(book.get("id"), None)
+        for index, key in ((self.books_by_isbn, book.get("isbn", "")),
+                           (self.books_by_title, book.get("title", "").lower())):
+            bucket = [b for b in index.get(key, []) if b is not book]
+            if bucket:
+                index[key] = bucket
+            else:
+                index.pop(key, None)
+
+    def add_user(self, user: Dict) -> None:
+        if "users" in self._built:
+            self.users_by_id[str(user.get("id"))] = user
+
+    def add_loan(self, loan: Dict) -> None:
+        self._update_ranges("loans", loan)
+        if "loans" in self._built:
+            self._index_loan(loan)
+
+    def _index_loan(self, loan: Dict) -> None:
+        self.loans_by_user.setdefault(str(loan.get("user_id")), []).append(loan)
+        if loan.get("status") == "ACTIV":
+            self.active_loans[loan.get("book_id")] = loan
+            if self.active_due is not None:
+                # Un imprumut nou are ID-ul cel mai mare, deci ajunge ultimul in ziua lui
+                self.active_due.add(_range_key("return_date", loan), loan)
+
+    def close_loan(self, loan: Dict) -> None:
+        if self.active_loans.get(loan.get("book_id")) is loan:
+            del self.active_loans[loan.get("book_id")]
+        if self.active_due is not None:
+            self.active_due.remove(_range_key("return_date", loan), loan)
+
+    # Interogari
+
+    def book(self, book_id: int) -> Optional[Dict]:
+        self._build("books")
+        return self.books_by_id.get(book_id)
+
+    def books_with_isbn(self, isbn: str) -> List[Dict]:
+        self._build("books")
+        return self.books_by_isbn.get(isbn, [])
+
+    def books_titled(self, title: str) -> List[Dict]:
+        self._build("books")
+        return self.books_by_title.get(title.lower(), [])
+
+    def user(self, user_id: str) -> Optional[Dict]:
+        self._build("users")
+        return self.users_by_id.get(str(user_id))
+
+    def user_loans(self, user_id: str) -> List[Dict]:
+        self._build("loans")
+        return self.loans_by_user.get(str(user_id), [])
+
+    def active_loan(self, book_id: int) -> Optional[Dict]:
+        self._build("loans")
+        return self.active_loans.get(book_id)
+
+    def active(self) -> List[Dict]:
+        """Toate imprumuturile active (fara parcurgerea celor returnate)"""
+        self._build("loans")
+        return list(self.active_loans.values())
+
+    def due_loans(self, today_day: int, after: tuple):
+        """Imprumuturile active cu (zi scadenta, ID) dupa cursorul `after` si scadenta pana la
+        `today_day`, generate pe rand in aceasta ordine"""
+        for return_day, loan in self._due_pairs(today_day, after):
+            yield loan
+
+    def _due_pairs(self, today_day: int, after: tuple):
+        if self.active_due is None:
+            self._build("loans")
+            pairs = [(_range_key("return_date", loan), loan) for loan in self.active_loans.values()]
+            pairs = [pair for pair in pairs if pair[0] is not None]
+            pairs.sort(key=lambda pair: (pair[0], pair[1].get("id")))
+            self.active_due = RangeIndex(pairs)
+        for return_day, loan in self.active_due.iter_between(after[0], today_day):
+            if (return_day, loan["id"]) > after and loan.get("status") == "ACTIV":
+                yield return_day, loan
+
+    def _range_index(self, field: str) -> RangeIndex:
+        """Indexul sortat pentru un camp (construit la prima folosire)"""
+        if field not in self.ranges:
+            collection = RANGE_FIELDS[field][0]
+            pairs = [(_range_key(field, r), r) for r in self.data[collection]]
+            self.ranges[field] = RangeIndex([pair for pair in pairs if pair[0] is not None])
+        return self.ranges[field]
+
+    def in_range(self, field: str, low: Optional[int], high: Optional[int]) -> List[Dict]:
+        """Inregistrarile cu cheia in [low, high], in ordinea cheii (capete None = deschis)"""
+        return self._range_index(field).between(low, high)
+
+    def iter_range(self, field: str, low: Optional[int], high: Optional[int]):
+        """Perechile (cheie, inregistrare) din interval, generate pe rand (fara copierea listei)"""
+        return self._range_index(field).iter_between(low, high)
+
+
+# Fisierul index (sidecar): antet, tabel de sectiuni si, pentru fiecare sectiune,
+# un vector sortat de hash-uri (uint64) urmat de pozitiile inregistrarilor (uint32);
+# sectiunile pe interval pastreaza valoarea cheii (an/ordinal) in loc de hash
+INDEX_MAGIC = b"LMI" + (b"l" if sys.byteorder == "little" else b"b")
+INDEX_VERSION = 3
+INDEX_HEADER = struct.Struct("<4sIqqIIII")
+INDEX_SECTION = struct.Struct("<8sQQ")
+
+
+def _key_hash(key: str) -> int:
+    """Hash stabil pe 64 de biti (hash() din Python difera intre procese)"""
+    return _key_hashes((key,))[0]
+
+
+def _key_hashes(keys) -> List[int]:
+    """_key_hash pentru mai multe chei (importul si cautarile de nume se fac o singura data)"""
+    from hashlib import blake2b
+    from_bytes = int.from_bytes
+    return [from_bytes(blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little') for key in keys]
+
+
+def _index_sections(data: Dict[str, List[Dict]]) -> Dict[bytes, List[tuple]]:
+    """Perechile (cheie, pozitie) pentru fiecare sectiune a fisierului index"""
+    sections = {b"book_id": [], b"isbn": [], b"title": [], b"user_id": [], b"uloans": [], b"active": [],
+                b"due": []}
+    for pos, book in enumerate(data["books"]):
+        sections[b"book_id"].append((str(book.get("id")), pos))
+        sections[b"isbn"].append((book.get("isbn", ""), pos))
+        sections[b"title"].append((book.get("title", "").lower(), pos))
+    for pos, user in enumerate(data["users"]):
+        sections[b"user_id"].append((str(user.get("id")), pos))
+    for pos, loan in enumerate(data["loans"]):
+        sections[b"uloans"].append((str(loan.get("user_id")), pos))
+        if loan.get("status") == "ACTIV":
+            sections[b"active"].append((str(loan.get("book_id")), pos))
+            return_day = _range_key("return_date", loan)
+            if return_day is not None:
+                sections[b"due"].append((return_day, pos))
+    # Imprumuturile active dupa scadenta; in aceeasi zi, dupa ID (sortarea la scriere este stabila)
+    sections[b"due"].sort(key=lambda pair: (pair[0], data["loans"][pair[1]].get("id")))
+    for field, (collection, section) in RANGE_FIELDS.items():
+        pairs = sections[section] = []
+        for pos, record in enumerate(data[collection]):
+            key = _range_key(field, record)
+            if key is not None:
+                pairs.append((key, pos))
+    # Listele fatetelor contin ID-uri (nu pozitii), crescatoare pentru fiecare valoare
+    books = sorted(data["books"], key=lambda book: book.get("id"))
+    for facet, section in FACET_SECTIONS.items():
+        sections[section] = [(_facet_value(facet, book), book.get("id")) for book in books]
+    return sections
+
+
+def write_index_sidecar(path: str, data: Dict[str, List[Dict]], data_stat: os.stat_result) -> None:
+    """Scrie fisierul index pentru datele date, legat de mtime/dimensiunea fisierului de date"""
+    sections = _index_sections(data)
+    offset = INDEX_HEADER.size + INDEX_SECTION.size * len(sections)
+    table, blobs = [], []
+    for name, pairs in sections.items():
+        keys = [key for key, _ in pairs]
+        if keys and not isinstance(keys[0], int):
+            keys = _key_hashes(keys)
+        # Pozitiile sunt crescatoare, deci sortarea stabila pastreaza ordinea lor la hash-uri egale
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        blob = array('Q', [keys[i] for i in order]).tobytes() + array('I', [pairs[i][1] for i in order]).tobytes()
+        blob += b"\0" * (-len(blob) % 8)
+        table.append(INDEX_SECTION.pack(name, offset, len(keys)))
+        blobs.append(blob)
+        offset += len(blob)
+
+    header = INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, data_stat.st_mtime_ns, data_stat.st_size,
+                               len(data["books"]), len(data["users"]), len(data["loans"]), len(sections))
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(header + b"".join(table) + b"".join(blobs))
+    os.replace(temp_path, path)
+
+
+class MappedIndex(LibraryIndex):
+    """Index doar-citire, servit direct din fisierul sidecar mapat in memorie"""
+
+    def __init__(self, path: str, data: Dict[str, List[Dict]], data_stat: os.stat_result):
+        import mmap
+        self.data = data
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._view = memoryview(self._mmap)
+            magic, version, mtime_ns, size, n_books, n_users, n_loans, n_sections = \
+                INDEX_HEADER.unpack_from(self._view, 0)
+            if (magic, version, mtime_ns, size) != (INDEX_MAGIC, INDEX_VERSION, data_stat.st_mtime_ns,
+                                                    data_stat.st_size) or \
+                    (n_books, n_users, n_loans) != tuple(len(data[k]) for k in ("books", "users", "loans")):
+                raise ValueError("index invechit")
+            self._sections = {}
+            for i in range(n_sections):
+                name, offset, count = INDEX_SECTION.unpack_from(self._view, INDEX_HEADER.size + i * INDEX_SECTION.size)
+                hashes = self._view[offset:offset + 8 * count].cast('Q')
+                positions = self._view[offset + 8 * count:offset + 12 * count].cast('I')
+                self._sections[name.rstrip(b"\0")] = (hashes, positions)
+        except (ValueError, struct.error):
+            self.close()
+            raise
+        # Inregistrarile adaugate dupa deschidere sunt indexate in memorie; pozitiile din
+        # fisier raman valide cat timp colectiile doar cresc. O stergere muta pozitiile, deci
+        # trece prin LibraryManager._mutable_index(), care inlocuieste acest index
+        self._added = LibraryIndex({"books": [], "users": [], "loans": []})
+
+    def add_book(self, book: Dict) -> None:
+        self._added.data["books"].append(book)
+        self._added.add_book(book)
+
+    def add_user(self, user: Dict) -> None:
+        self._added.data["users"].append(user)
+        self._added.add_user(user)
+
+    def add_loan(self, loan: Dict) -> None:
+        self._added.data["loans"].append(loan)
+        self._added.add_loan(loan)
+
+    def close_loan(self, loan: Dict) -> None:
+        # Imprumuturile din fisier sunt filtrate dupa status la cautare
+        self._added.close_loan(loan)
+
+    def close(self) -> None:
+        """Elibereaza maparea (necesar inainte ca fisierul sa fie rescris)"""
+        for hashes, positions in getattr(self, "_sections", {}).values():
+            hashes.release()
+            positions.release()
+        self._sections = {}
+        if getattr(self, "_view", None) is not None:
+            self._view.release()
+            self._view = None
+        self._mmap.close()
+
+    def _lookup(self, section: bytes, collection: str, key: str) -> List[Dict]:
+        hashes, positions = self._sections[section]
+        h = _key_hash(key)
+        start = bisect.bisect_left(hashes, h)
+        end = bisect.bisect_right(hashes, h, start)
+        records = self.data[collection]
+        return [records[positions[i]] for i in range(start, end)]
+
+    def book(self, book_id: int) -> Optional[Dict]:
+        for book in self._lookup(b"book_id", "books", str(book_id)):
+            if book.get("id") == book_id:
+                return book
+        return self._added.book(book_id)
+
+    def books_with_isbn(self, isbn: str) -> List[Dict]:
+        return [b for b in self._lookup(b"isbn", "books", isbn) if b.get("isbn", "") == isbn] + \
+            self._added.books_with_isbn(isbn)
+
+    def books_titled(self, title: str) -> List[Dict]:
+        key = title.lower()
+        return [b for b in self._lookup(b"title", "books", key) if b.get("title", "").lower() == key] + \
+            self._added.books_titled(title)
+
+    def user(self, user_id: str) -> Optional[Dict]:
+        user_id = str(user_id)
+        for user in self._lookup(b"user_id", "users", user_id):
+            if str(user.get("id")) == user_id:
+                return user
+        return self._added.user(user_id)
+
+    def user_loans(self, user_id: str) -> List[Dict]:
+        user_id = str(user_id)
+        return [l for l in self._lookup(b"uloans", "loans", user_id) if str(l.get("user_id")) == user_id] + \
+            self._added.user_loans(user_id)
+
+    def active_loan(self, book_id: int) -> Optional[Dict]:
+        added = self._added.active_loan(book_id)
+        if added is not None:
+            return added
+        for loan in self._lookup(b"active", "loans", str(book_id)):
+            if loan.get("book_id") == book_id and loan.get("status") == "ACTIV":
+                return loan
+        return None
+
+    def active(self) -> List[Dict]:
+        records = self.data["loans"]
+        mapped = (records[pos] for pos in self._sections[b"active"][1])
+        return [loan for loan in mapped if loan.get("status") == "ACTIV"] + self._added.active()
+
+    def _due_pairs(self, today_day: int, after: tuple):
+        keys, positions = self._sections[b"due"]
+        records = self.data["loans"]
+
+        def mapped():
+            for i in range(bisect.bisect_left(keys, after[0]), len(keys)):
+                if keys[i] > today_day:
+                    return
+                loan = records[positions[i]]
+                if (keys[i], loan["id"]) > after and loan.get("status") == "ACTIV":
+                    yield keys[i], loan
+
+        # Imprumuturile adaugate dupa deschidere sunt interclasate, tot pe rand
+        return heapq.merge(mapped(), self._added._due_pairs(today_day, after),
+                           key=lambda pair: (pair[0], pair[1]["id"]))
+
+    # Fatetele sunt citite din fisier doar cat timp cartile nu au fost modificate (vezi
+    # LibraryManager._facet_postings)
+
+    def facet_postings(self, facet: str):
+        """(valoare, ID-urile sortate ale cartilor) pentru fiecare valoare a fatetei"""
+        hashes, ids = self._sections[FACET_SECTIONS[facet]]
+        start = 0
+        while start < len(hashes):
+            end = bisect.bisect_right(hashes, hashes[start], start)
+            # Valoarea (textul) este luata de la prima carte din lista
+            yield _facet_value(facet, self.book(ids[start])), ids[start:end]
+            start = end
+
+    def facet_ids(self, facet: str, value: str):
+        """ID-urile sortate ale cartilor cu o valoare de fateta"""
+        hashes, ids = self._sections[FACET_SECTIONS[facet]]
+        h = _key_hash(value)
+        start = bisect.bisect_left(hashes, h)
+        return ids[start:bisect.bisect_right(hashes, h, start)]
+
+    def in_range(self, field: str, low: Optional[int], high: Optional[int]) -> List[Dict]:
+        return [record for _, record in self.iter_range(field, low, high)]
+
+    def iter_range(self, field: str, low: Optional[int], high: Optional[int]):
+        collection, section = RANGE_FIELDS[field]
+        keys, positions = self._sections[section]
+        start = 0 if low is None else bisect.bisect_left(keys, low)
+        end = len(keys) if high is None else bisect.bisect_right(keys, high)
+        records = self.data[collection]
+        mapped = ((keys[i], records[positions[i]]) for i in range(start, end))
+        if not self._added.data[collection]:
+            return mapped
+        return heapq.merge(mapped, self._added.iter_range(field, low, high), key=lambda pair: pair[0])
+
+
+# Instantaneul doar-citire (.snap): antet, tabel de sectiuni si, pentru fiecare colectie,
+# vectori de latime fixa pe camp (masca campurilor prezente uint32, intregi int64, texte
+# uint32 = pozitia in tabela de texte), urmati de tabela de texte. Inregistrarea de pe
+# pozitia i este formata din elementele i ale vectorilor. Intregii lipsa (None) sunt
+# SNAPSHOT_NONE_INT, textele lipsa SNAPSHOT_NONE_REF.
+SNAPSHOT_MAGIC = b"LMS" + (b"l" if sys.byteorder == "little" else b"b")
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<4sIqqI")
+SNAPSHOT_SECTION = struct.Struct("<12sQQ")
+SNAPSHOT_NONE_INT = -2 ** 63
+SNAPSHOT_NONE_REF = 0xFFFFFFFF
+# Campurile salvate in formatul fix: "q" = intreg, "s" = text (pozitia in tabela de texte)
+SNAPSHOT_FIELDS = {
+    "books": (("id", "q"), ("title", "s"), ("author", "s"), ("isbn", "s"), ("category", "s"), ("year", "q"),
+              ("status", "s"), ("date_added", "s"), ("loan_count", "q")),
+    "users": (("id", "s"), ("name", "s"), ("email", "s"), ("registration_date", "s"), ("active_loans", "q"),
+              ("total_loans", "q"), ("total_penalties", "q"), ("returned_loans", "q"), ("on_time_returns", "q"),
+              ("status", "s")),
+    "loans": (("id", "q"), ("book_id", "q"), ("book_title", "s"), ("user_id", "s"), ("user_name", "s"),
+              ("loan_date", "s"), ("return_date", "s"), ("actual_return_date", "s"), ("status", "s"),
+              ("penalty", "q"), ("loan_day", "q"), ("return_day", "q"), ("actual_return_day", "q"))
+}
+# Dictionarele mari salvate ca intrari gasite dupa hash-ul cheii (numele sectiunilor au maxim 12 caractere)
+SNAPSHOT_MAPPINGS = ("coborrow", "recent_books")
+# Comenzile care doar citesc datele (servite din instantaneu cand acesta este valid)
+SNAPSHOT_COMMANDS = ("list", "search", "report", "stats")
+
+
+def snapshot_records(records: List[Dict], fields: tuple) -> bytes:
+    """Serializeaza o colectie in formatul fix; ValueError daca o inregistrare nu se incadreaza"""
+    from operator import itemgetter
+    names = [field for field, _ in fields]
+    unknown = set().union(*records) - set(names)
+    if unknown:
+        raise ValueError(f"campuri necunoscute: {sorted(unknown)}")
+    if set(map(len, records)) <= {len(names)}:
+        # Cazul obisnuit: toate campurile sunt prezente, coloanele sunt extrase direct
+        masks = array('I', [(1 << len(names)) - 1]) * len(records)
+        columns = [list(map(itemgetter(field), records)) for field in names]
+    else:
+        masks = array('I', [sum(1 << bit for bit, field in enumerate(names) if field in record)
+                            for record in records])
+        columns = [[record.get(field) for record in records] for field in names]
+
+    blobs = [masks.tobytes()]
+    # Pozitiile textelor; None are rezervata valoarea SNAPSHOT_NONE_REF
+    refs: Dict[Optional[str], int] = {None: SNAPSHOT_NONE_REF}
+    try:
+        for (field, kind), values in zip(fields, columns):
+            if kind == "q":
+                column = array('q', [SNAPSHOT_NONE_INT if value is None else value for value in values]
+                               if None in values else values)
+            else:
+                for value in dict.fromkeys(values):
+                    if value not in refs:
+                        refs[value] = len(refs) - 1
+                column = array('I', map(refs.__getitem__, values))
+            blobs.append(column.tobytes())
+    except (TypeError, OverflowError) as e:
+        raise ValueError(f"valoare neasteptata pentru '{field}': {e}")
+    strings = list(refs)[1:]
+    if any(type(text) is not str for text in strings):
+        raise ValueError("valoare care nu este text intr-un camp text")
+
+    encoded = [text.encode('utf-8') for text in strings]
+    offsets = array('I', [0])
+    for blob in encoded:
+        offsets.append(offsets[-1] + len(blob))
+    blobs = [blob + b"\0" * (-len(blob) % 8) for blob in blobs]
+    return struct.pack("=II", len(records), len(strings)) + b"".join(blobs) + offsets.tobytes() + b"".join(encoded)
+
+
+def snapshot_mapping(mapping: Dict[str, object], codec: JsonCodec) -> bytes:
+    """Serializeaza un dict (ex: matricea de co-imprumut) ca intrari JSON gasite dupa hash-ul cheii"""
+    entries = sorted(zip(_key_hashes(mapping), (codec.dumps(item, True) for item in mapping.items())))
+    offsets = array('I', [0])
+    for _, blob in entries:
+        offsets.append(offsets[-1] + len(blob))
+    return (struct.pack("=Q", len(entries)) + array('Q', [h for h, _ in entries]).tobytes() +
+            offsets.tobytes() + b"".join(blob for _, blob in entries))
+
+
+def write_snapshot(path: str, sections: Dict[str, bytes], data_stat: os.stat_result) -> None:
+    """Scrie instantaneul din sectiunile date, legat de mtime/dimensiunea fisierului de date"""
+    offset = SNAPSHOT_HEADER.size + SNAPSHOT_SECTION.size * len(sections)
+    table, blobs = [], []
+    for name, blob in sections.items():
+        table.append(SNAPSHOT_SECTION.pack(name.encode('ascii'), offset, len(blob)))
+        # Sectiunile incep la multipli de 8 (vectorii sunt cititi direct din mapare)
+        blob += b"\0" * (-len(blob) % 8)
+        blobs.append(blob)
+        offset += len(blob)
+    header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, data_stat.st_mtime_ns, data_stat.st_size,
+                                  len(sections))
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(header + b"".join(table) + b"".join(blobs))
+    os.replace(temp_path, path)
+
+
+class SnapshotRecords:
+    """Colectie doar-citire servita din instantaneu: o inregistrare este construita abia la acces"""
+
+    def __init__(self, view: memoryview, fields: tuple):
+        self._count, n_strings = struct.unpack_from("=II", view, 0)
+        self._fields = fields
+        start, self._columns = 8, []
+        for kind in ["I"] + [kind for _, kind in fields]:
+            size = (4 if kind == "I" or kind == "s" else 8) * self._count
+            self._columns.append(view[start:start + size].cast("q" if kind == "q" else "I"))
+            start += size + (-size % 8)
+        self._offsets = view[start:start + 4 * (n_strings + 1)].cast('I')
+        self._heap = view[start + 4 * (n_strings + 1):]
+        self._strings: Dict[int, str] = {}
+        # Aceeasi pozitie intoarce acelasi obiect (comparatiile dupa id() raman valabile)
+        self._records: Dict[int, Dict] = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return [self[i] for i in range(*pos.indices(self._count))]
+        if pos < 0:
+            pos += self._count
+        if not 0 <= pos < self._count:
+            raise IndexError("pozitie in afara colectiei")
+        record = self._records.get(pos)
+        if record is None:
+            record = self._records[pos] = self._build([column[pos] for column in self._columns])
+        return record
+
+    def __iter__(self):
+        for pos in range(self._count):
+            yield self[pos]
+
+    def _text(self, ref: int) -> str:
+        text = self._strings.get(ref)
+        if text is None:
+            text = self._strings[ref] = sys.intern(str(self._heap[self._offsets[ref]:self._offsets[ref + 1]], 'utf-8'))
+        return text
+
+    def _build(self, values: List) -> Dict:
+        mask, record = values[0], {}
+        for bit, ((field, kind), value) in enumerate(zip(self._fields, values[1:])):
+            if mask >> bit & 1:
+                if kind == "q":
+                    record[field] = None if value == SNAPSHOT_NONE_INT else value
+                else:
+                    record[field] = None if value == SNAPSHOT_NONE_REF else self._text(value)
+        return record
+
+    def release(self) -> None:
+        for view in self._columns + [self._offsets, self._heap]:
+            view.release()
+
+
+class SnapshotMapping:
+    """Dict doar-citire din instantaneu; o intrare este decodata abia cand este ceruta (get)"""
+
+    def __init__(self, view: memoryview, codec: JsonCodec):
+        count = struct.unpack_from("=Q", view, 0)[0]
+        self._codec = codec
+        self._hashes = view[8:8 + 8 * count].cast('Q')
+        start = 8 + 8 * count
+        self._offsets = view[start:start + 4 * (count + 1)].cast('I')
+        self._blobs = view[start + 4 * (count + 1):]
+
+    def get(self, key: str, default=None):
+        h = _key_hash(key)
+        pos = bisect.bisect_left(self._hashes, h)
+        while pos < len(self._hashes) and self._hashes[pos] == h:
+            stored, value = self._codec.loads(bytes(self._blobs[self._offsets[pos]:self._offsets[pos + 1]]))
+            if stored == key:
+                return value
+            pos += 1
+        return default
+
+    def release(self) -> None:
+        for view in (self._hashes, self._offsets, self._blobs):
+            view.release()
+
+
+class LibrarySnapshot:
+    """Instantaneul binar doar-citire al datelor, mapat in memorie si validat fata de fisierul JSON"""
+
+    def __init__(self, path: str, data_stat: os.stat_result, codec: JsonCodec):
+        import mmap
+        self._codec = codec
+        self._opened: List = []
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._view = memoryview(self._mmap)
+            magic, version, mtime_ns, size, n_sections = SNAPSHOT_HEADER.unpack_from(self._view, 0)
+            if (magic, version, mtime_ns, size) != (SNAPSHOT_MAGIC, SNAPSHOT_VERSION, data_stat.st_mtime_ns,
+                                                    data_stat.st_size):
+                raise ValueError("instantaneu invechit")
+            self._sections = {}
+            for i in range(n_sections):
+                name, offset, length = SNAPSHOT_SECTION.unpack_from(
+                    self._view, SNAPSHOT_HEADER.size + i * SNAPSHOT_SECTION.size)
+                self._sections[name.rstrip(b"\0").decode('ascii')] = (offset, length)
+        except (ValueError, struct.error):
+            self.close()
+            raise
+
+    def raw(self, name: str) -> Optional[bytes]:
+        """Octetii unei sectiuni (refolositi la regenerare daca sectiunea nu s-a schimbat)"""
+        if name not in self._sections:
+            return None
+        offset, length = self._sections[name]
+        return bytes(self._view[offset:offset + length])
+
+    def section(self, name: str):
+        """Colectia cu numele dat: inregistrari/dict mapate sau valoarea JSON decodata"""
+        offset, length = self._sections[name]
+        view = self._view[offset:offset + length]
+        if name in SNAPSHOT_FIELDS:
+            section = SnapshotRecords(view, SNAPSHOT_FIELDS[name])
+        elif name in SNAPSHOT_MAPPINGS:
+            section = SnapshotMapping(view, self._codec)
+        else:
+            value = self._codec.loads(bytes(view))
+            view.release()
+            return value
+        view.release()
+        self._opened.append(section)
+        return section
+
+    def close(self) -> None:
+        """Elibereaza maparea"""
+        for section in self._opened:
+            section.release()
+        self._opened = []
+        if getattr(self, "_view", None) is not None:
+            self._view.release()
+            self._view = None
+        self._mmap.close()
+
+
+class SnapshotData(dict):
+    """self.data pentru comenzile de citire: fiecare colectie este deschisa din instantaneu la primul acces"""
+
+    def __init__(self, snapshot: LibrarySnapshot):
+        super().__init__()
+        self.snapshot = snapshot
+
+    def __missing__(self, key: str):
+        value = self[key] = self.snapshot.section(key)
+        return value
+
+
+class QueryCache:
+    """Cache LRU pentru rezultatele interogarilor, persistat intre rulari.
+
+    Cheile contin versiunea datelor, deci orice modificare invalideaza automat
+    intrarile vechi. Fisierul persistat este acceptat doar daca versiunea si
+    semnatura (mtime/dimensiune) fisierului de date coincid. Fisierul este un
+    jurnal: un antet (versiune, semnatura) urmat de cate o intrare [cheie, valoare]
+    pe linie; o intrare noua este adaugata la sfarsit, iar fisierul este rescris
+    doar cand datele se schimba sau cand jurnalul depaseste QUERY_CACHE_COMPACT
+    intrari pentru fiecare intrare pastrata.
+    """
+
+    def __init__(self, path: str, codec: JsonCodec, max_size: int = QUERY_CACHE_SIZE):
+        self.path = path
+        self.codec = codec
+        self.max_size = max_size
+        self.entries: "OrderedDict[str, object]" = OrderedDict()
+        # Antetul fisierului de pe disc (versiune, semnatura) si numarul de intrari din jurnal
+        self._stored: Optional[tuple] = None
+        self._logged = 0
+
+    def load(self, version: int, signature: List[int]) -> None:
+        """Incarca intrarile persistate, daca apartin exact acestor date"""
+        try:
+            with open(self.path, 'rb') as f:
+                header = self.codec.loads(f.readline())
+                if header.get("version") != version or header.get("signature") != signature:
+                    return
+                self._stored = (version, list(signature))
+                for line in f:
+                    try:
+                        key, value = self.codec.loads(line)
+                    except self.codec.decode_errors:
+                        # Linie incompleta (scriere intrerupta): ignoram restul jurnalului
+                        break
+                    self.entries[key] = value
+                    self.entries.move_to_end(key)
+                    self._logged += 1
+        except (OSError, AttributeError) + self.codec.decode_errors:
+            return
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def save(self, version: int, signature: List[int]) -> None:
+        """Rescrie jurnalul cu intrarile versiunii curente (scriere atomica)"""
+        prefix = f"{version}|"
+        lines = [self.codec.dumps({"version": version, "signature": signature}, True) + b"\n"]
+        lines += [self.codec.dumps([key, value], True) + b"\n"
+                  for key, value in self.entries.items() if key.startswith(prefix)]
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(b"".join(lines))
+            os.replace(temp_path, self.path)
+        except OSError:
+            return
+        self._stored = (version, list(signature))
+        self._logged = len(lines) - 1
+
+    def append(self, key: str, version: int, signature: List[int]) -> None:
+        """Persista o singura intrare noua, adaugand-o la sfarsitul jurnalului"""
+        if self._stored != (version, list(signature)) or self._logged >= QUERY_CACHE_COMPACT * self.max_size:
+            self.save(version, signature)
+            return
+        try:
+            with open(self.path, 'ab') as f:
+                f.write(self.codec.dumps([key, self.entries[key]], True) + b"\n")
+        except OSError:
+            return
+        self._logged += 1
+
+    def get(self, key: str):
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value) -> None:
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+
+
+class LibraryManager:
+    """
+    Clasa principala pentru gestionarea bibliotecii.
+    Gestioneaza: Books, Users, Loans
+    """
+
+    def __init__(self, data_file: str = DATA_FILE, codec: str = None, compact: bool = None,
+                 data_format: int = None, read_only: bool = False, durability: str = None,
+                 group_ops: int = None, group_ms: int = None):
+        """Initializeaza managerul de biblioteca (read_only: datele pot fi servite din instantaneu)"""
+        self.data_file = data_file
+        self.read_only = read_only
+        self.codec = get_codec(codec or JSON_CODEC)
+        self.durability = durability or DURABILITY
+        if self.durability not in DURABILITY_MODES:
+            raise ValueError(f"Durabilitate necunoscuta: {self.durability} "
+                             f"(disponibile: {', '.join(DURABILITY_MODES)})")
+        self.group_ops = GROUP_COMMIT_OPS if group_ops is None else group_ops
+        self.group_ms = GROUP_COMMIT_MS if group_ms is None else group_ms
+        # Operatiile confirmate dar inca nescrise pe disc (group commit) si momentul primei dintre ele
+        self._pending_ops = 0
+        self._pending_since: Optional[float] = None
+        self.compact = JSON_COMPACT if compact is None else compact
+        self.data_format = DATA_FORMAT if data_format is None else data_format
+        self.archive_dir = os.path.splitext(data_file)[0] + "_archive"
+        self._archive_index: Optional[Dict] = None
+        self.data: Dict[str, List[Dict]] = {
+            "books": [],
+            "users": [],
+            "loans": [],
+            "rollups": {},
+            "coborrow": {},
+            # Ultimele COBORROW_HISTORY carti distincte ale fiecarui cititor (folosite la un imprumut nou)
+            "recent_books": {},
+            "holds": [],
+            # Cozile de rezervari: heap pe carte (-prioritate, id), heap global dupa termenul
+            # de ridicare si rezervarea pregatita pentru fiecare carte REZERVAT
+            "hold_queues": {"waiting": {}, "ready": [], "assigned": {}},
+            # O biblioteca noua are matricea de co-imprumut (goala) completa
+            "meta": {"version": 0, "coborrow_history": COBORROW_HISTORY}
+        }
+        # Colectiile/inregistrarile modificate de la ultima salvare
+        self._dirty: Dict[str, set] = {}
+        # Fragmentele serializate ale colectiilor nemodificate, refolosite la salvare
+        self._fragments: Dict[str, bytes] = {}
+        # Tabela de texte a formatului 2 (text -> pozitie), comuna tuturor fragmentelor
+        self._strings: Dict[str, int] = {}
+        self._strings_fragment = (0, b'[]')
+        # Contoare afisate cu --profile
+        self.counters: Dict[str, int] = {
+            "saves": 0,
+            "saves_skipped": 0,
+            "saves_deferred": 0,
+            "collections_written": 0,
+            "collections_reused": 0,
+            "records_dirty": 0,
+            "fsyncs": 0,
+            "snapshot_written": 0,
+            "snapshot_reused": 0
+        }
+        self.counters.update({"index_loaded": 0, "index_rebuilt": 0, "cache_hits": 0, "cache_misses": 0})
+        self.index_file = os.path.splitext(data_file)[0] + ".idx"
+        self.snapshot_file = os.path.splitext(data_file)[0] + ".snap"
+        # Functii apelate la fiecare modificare (op, colectie, inregistrare), ex: shell-ul interactiv
+        self.change_listeners: List = []
+        # Vecinii sortati ai cartilor din matricea de co-imprumut (invalidati la actualizare)
+        self._neighbours: Dict[str, List[tuple]] = {}
+        # Jurnalul de schimbari (CDC) si evenimentele inca nescrise
+        self.changes_file = os.path.splitext(data_file)[0] + ".changes"
+        self._changes: List[Dict] = []
+        self._query_cache: Optional[QueryCache] = None
+        # Listele de ID-uri pe valori de fateta construite din catalog, cand fisierul index nu
+        # poate fi folosit (invalidate la orice modificare a cartilor)
+        self._postings: Optional[Dict[str, Dict[str, List[int]]]] = None
+        self._snapshot = self._open_snapshot() if read_only else None
+        if self._snapshot is not None:
+            # Instantaneul este scris dupa incarcarea completa, deci completarile la incarcare sunt deja facute
+            self.data = SnapshotData(self._snapshot)
+            self._saved_version = self.data["meta"].get("version", 0)
+            self._index = self._open_index()
+            return
+        # Starea fisierului de date incarcat (sau scris ultima oara): instantaneul care ii
+        # corespunde are sectiunile colectiilor nemodificate valabile la urmatoarea salvare
+        self._data_stat = os.stat(self.data_file) if os.path.exists(self.data_file) else None
+        self._load_data()
+        self._saved_version = self.data["meta"].get("version", 0)
+        self._upgrade_loan_ordinals()
+        self._index = self._open_index()
+        self._upgrade_user_counters()
+        self._upgrade_rollups()
+
+    def _read_json(self, path: str):
+        """Citeste un fisier JSON folosind codec-ul configurat"""
+        with open(path, 'rb') as f:
+            return self.codec.loads(f.read())
+
+    def _write_json(self, path: str, obj) -> None:
+        """Scrie un fisier JSON folosind codec-ul configurat"""
+        with open(path, 'wb') as f:
+            f.write(self.codec.dumps(obj, self.compact))
+
+    def _load_data(self) -> None:
+        """Incarca datele din fisierul JSON"""
+        if os.path.exists(self.data_file):
+            try:
+                loaded_data = decode_data(self._read_json(self.data_file))
+                for key in self.data.keys():
+                    if key in loaded_data:
+                        self.data[key] = loaded_data[key]
+                if "recent_books" not in loaded_data:
+                    # Fisier mai vechi, fara istoricul recent al cititorilor: matricea se reconstruieste
+                    self.data["meta"].pop("coborrow_history", None)
+            except self.codec.decode_errors:
+                pass
+
+    def _mark_dirty(self, collection: str, record_id=None, bump_version: bool = True) -> None:
+        """Marcheaza o colectie (si optional o inregistrare) ca modificata"""
+        records = self._dirty.setdefault(collection, set())
+        if record_id is not None:
+            records.add(record_id)
+        self._fragments.pop(collection, None)
+        if collection == "books":
+            self._postings = None
+        if not bump_version:
+            # Completarile automate la incarcare nu schimba continutul logic
+            return
+        # Orice modificare schimba versiunea datelor (invalideaza cache-ul de interogari)
+        self.data["meta"]["version"] = self.data["meta"].get("version", 0) + 1
+        self._dirty.setdefault("meta", set())
+        self._fragments.pop("meta", None)
+
+    def _record_change(self, op: str, collection: str, record: Dict) -> None:
+        """Marcheaza inregistrarea ca modificata si adauga evenimentul in jurnalul de schimbari"""
+        self._mark_dirty(collection, record["id"])
+        seq = self.data["meta"].get("change_seq", 0) + 1
+        self.data["meta"]["change_seq"] = seq
+        # Randul este serializat abia la salvare, deci evenimentul contine starea finala
+        self._changes.append({"seq": seq, "op": op, "collection": collection, "id": record["id"],
+                              "row": None if op == "delete" else record})
+        for listener in self.change_listeners:
+            listener(op, collection, record)
+
+    def _append_changes(self, sync: bool = True) -> None:
+        """Adauga evenimentele noi la sfarsitul jurnalului (un obiect JSON pe linie)"""
+        if not self._changes:
+            return
+        lines = [self.codec.dumps(event, True) + b"\n" for event in self._changes]
+        with open(self.changes_file, 'ab') as f:
+            f.write(b"".join(lines))
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+                self.counters["fsyncs"] += 1
+        self._changes.clear()
+
+    def _changes_offset(self, f, size: int, since: int) -> int:
+        """Cautare binara in jurnal: pozitia primei linii cu seq > since"""
+        def first_seq_at(pos):
+            # Seq-ul primei linii care incepe la sau dupa pozitia data
+            if pos > 0:
+                f.seek(pos - 1)
+                f.readline()
+            else:
+                f.seek(0)
+            line_start = f.tell()
+            line = f.readline()
+            try:
+                return line_start, self.codec.loads(line)["seq"] if line else None
+            except self.codec.decode_errors + (KeyError, TypeError):
+                return line_start, None
+
+        lo, hi = 0, size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            _, seq = first_seq_at(mid)
+            if seq is None or seq > since:
+                hi = mid
+            else:
+                lo = mid + 1
+        return first_seq_at(lo)[0]
+
+    def _truncate_changes(self, seq: int) -> None:
+        """Pastreaza in jurnal doar evenimentele cu seq <= seq"""
+        if not os.path.exists(self.changes_file):
+            return
+        with open(self.changes_file, 'r+b') as f:
+            f.truncate(self._changes_offset(f, os.path.getsize(self.changes_file), seq))
+
+    def changes_since(self, since: int):
+        """Evenimentele din jurnal cu seq > since, in ordine"""
+        if not os.path.exists(self.changes_file):
+            return
+        with open(self.changes_file, 'rb') as f:
+            f.seek(self._changes_offset(f, os.path.getsize(self.changes_file), since))
+            for line in f:
+                try:
+                    event = self.codec.loads(line)
+                except self.codec.decode_errors:
+                    # Linie incompleta (scriere intrerupta)
+                    break
+                yield event
+
+    def _data_signature(self) -> List[int]:
+        """Semnatura fisierului de date (mtime, dimensiune) folosita la validarea cache-urilor"""
+        try:
+            data_stat = os.stat(self.data_file)
+        except OSError:
+            return [0, 0]
+        return [data_stat.st_mtime_ns, data_stat.st_size]
+
+    def _cached_query(self, kind: str, params: list, compute):
+        """Returneaza rezultatul unei interogari din cache sau il calculeaza si il memoreaza"""
+        version = self.data["meta"].get("version", 0)
+        if self._query_cache is None:
+            self._query_cache = QueryCache(os.path.splitext(self.data_file)[0] + ".qcache", self.codec)
+            self._query_cache.load(version, self._data_signature())
+
+        key = f"{version}|{kind}|" + self.codec.dumps(params, True).decode('utf-8')
+        value = self._query_cache.get(key)
+        if value is not None:
+            self.counters["cache_hits"] += 1
+            return value
+
+        self.counters["cache_misses"] += 1
+        value = compute()
+        self._query_cache.put(key, value)
+        # Persistam doar daca fisierul de pe disc corespunde versiunii din memorie
+        if version == self._saved_version:
+            self._query_cache.append(key, version, self._data_signature())
+        return value
+
+    def _save_data(self) -> None:
+        """Salveaza datele in fisierul JSON (doar daca ceva s-a modificat).
+
+        In modul "group" operatia este doar confirmata in memorie; fisierul este
+        scris cand se aduna group_ops operatii, dupa group_ms ms sau la flush().
+        """
+        if not self._dirty or self.read_only:
+            # Comenzile de citire nu rescriu datele (completarile la incarcare ajung in instantaneu)
+            self.counters["saves_skipped"] += 1
+            return
+        if self.durability == "group":
+            now = time.monotonic()
+            if self._pending_since is None:
+                self._pending_since = now
+            self._pending_ops += 1
+            if self._pending_ops < self.group_ops and (now - self._pending_since) * 1000 < self.group_ms:
+                self.counters["saves_deferred"] += 1
+                return
+        self._write_data()
+
+    def flush(self, due_only: bool = False) -> int:
+        """Scrie pe disc modificarile amanate; returneaza numarul de operatii scrise.
+
+        Cu due_only, scrie doar daca prima operatie amanata este mai veche de group_ms.
+        """
+        if not self._dirty or self.read_only:
+            return 0
+        if due_only and (self._pending_since is None or
+                         (time.monotonic() - self._pending_since) * 1000 < self.group_ms):
+            return 0
+        pending = self._pending_ops
+        self._write_data()
+        return pending
+
+    def _write_data(self) -> None:
+        """Scrie fisierul de date, fisierele auxiliare si jurnalul de schimbari"""
+        # Fisierul este unul singur, deci se rescrie complet, dar colectiile
+        # nemodificate de la salvarea anterioara nu mai sunt serializate din nou
+        parts = []
+        for key, value in self.data.items():
+            fragment = self._fragments.get(key)
+            if fragment is None:
+                if self.data_format >= 2 and key in ENCODED_FIELDS:
+                    value = encode_records(value, ENCODED_FIELDS[key], self._strings)
+                fragment = self.codec.dumps(value, self.compact)
+                self._fragments[key] = fragment
+                self.counters["collections_written"] += 1
+            else:
+                self.counters["collections_reused"] += 1
+            parts.append(self.codec.dumps(key) + (b':' if self.compact else b': ') + fragment)
+        if self.data_format >= 2:
+            if self._strings_fragment[0] != len(self._strings):
+                self._strings_fragment = (len(self._strings), self.codec.dumps(list(self._strings), self.compact))
+            colon = b':' if self.compact else b': '
+            parts.append(b'"format"' + colon + b'2')
+            parts.append(b'"strings"' + colon + self._strings_fragment[1])
+
+        separator, start, end = (b',', b'{', b'}') if self.compact else (b',\n', b'{\n', b'\n}')
+        # Folderul de date este creat abia la prima salvare (nu la import)
+        os.makedirs(os.path.dirname(os.path.abspath(self.data_file)), exist_ok=True)
+        with open(self.data_file, 'wb') as f:
+            f.write(start + separator.join(parts) + end)
+            # Operatia (sau grupul de operatii) este confirmata abia dupa sincronizarea pe disc
+            f.flush()
+            os.fsync(f.fileno())
+            self.counters["fsyncs"] += 1
+        # Instantaneul este regenerat acum, doar pentru colectiile modificate; fisierul index
+        # ramane invechit (mtime/dimensiune) si il reconstruieste prima comanda de citire
+        data_stat = os.stat(self.data_file)
+        self._write_snapshot(data_stat, self._data_stat, set(self._dirty))
+        self._data_stat = data_stat
+        # In modul "fsync" fiecare operatie are un singur fsync (al fisierului de date);
+        # jurnalul este sincronizat doar in modul "group", o data pe grup
+        self._append_changes(sync=self.durability == "group")
+
+        self.counters["saves"] += 1
+        self.counters["records_dirty"] += sum(len(records) for records in self._dirty.values())
+        self._dirty.clear()
+        self._saved_version = self.data["meta"].get("version", 0)
+        self._pending_ops, self._pending_since = 0, None
+
+    def _upgrade_loan_ordinals(self) -> None:
+        """Adauga ordinalele zilelor la imprumuturile din fisierele mai vechi"""
+        for loan in self.data["loans"]:
+            for field, day_field in LOAN_DATE_FIELDS.items():
+                if day_field not in loan:
+                    value = loan.get(field)
+                    loan[day_field] = _date_ordinal(value) if value else None
+                    self._mark_dirty("loans", loan.get("id"), bump_version=False)
+
+    def _open_index(self) -> LibraryIndex:
+        """Foloseste fisierul index daca este valid, altfel il reconstruieste"""
+        # Versiunea datelor pentru care fisierul index este valid (fatetele din fisier)
+        self._index_version = self.data["meta"].get("version", 0)
+        if not os.path.exists(self.data_file):
+            return LibraryIndex(self.data)
+        data_stat = os.stat(self.data_file)
+        if os.path.exists(self.index_file):
+            try:
+                index = MappedIndex(self.index_file, self.data, data_stat)
+                self.counters["index_loaded"] += 1
+                return index
+            except (OSError, ValueError, struct.error):
+                pass
+        self.counters["index_rebuilt"] += 1
+        if self.read_only:
+            # Doar comenzile de citire scriu fisierul index: o comanda care modifica datele
+            # l-ar invechi oricum la salvare. Fisierul nou este folosit imediat.
+            self._write_index(data_stat)
+            try:
+                return MappedIndex(self.index_file, self.data, data_stat)
+            except (OSError, ValueError, struct.error):
+                pass
+        return LibraryIndex(self.data)
+
+    def _write_index(self, data_stat: os.stat_result = None) -> None:
+        """Scrie fisierul index pentru starea curenta a datelor"""
+        try:
+            write_index_sidecar(self.index_file, self.data, data_stat or os.stat(self.data_file))
+        except OSError:
+            pass
+
+    def _open_snapshot(self) -> Optional[LibrarySnapshot]:
+        """Instantaneul doar-citire, daca exista si corespunde fisierului de date"""
+        try:
+            return LibrarySnapshot(self.snapshot_file, os.stat(self.data_file), self.codec)
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def _write_snapshot(self, data_stat: os.stat_result, previous: os.stat_result = None,
+                        dirty: set = ()) -> None:
+        """Regenereaza instantaneul pentru datele scrise in fisierul cu starea data.
+
+        Daca instantaneul existent corespunde starii anterioare a fisierului (`previous`),
+        sectiunile colectiilor nemodificate sunt copiate din el, fara serializare.
+        """
+        old = None
+        if previous is not None:
+            try:
+                old = LibrarySnapshot(self.snapshot_file, previous, self.codec)
+            except (OSError, ValueError, struct.error):
+                pass
+        try:
+            sections = {}
+            for key, value in self.data.items():
+                blob = old.raw(key) if old is not None and key not in dirty else None
+                if blob is not None:
+                    sections[key] = blob
+                    self.counters["snapshot_reused"] += 1
+                    continue
+                self.counters["snapshot_written"] += 1
+                if key in SNAPSHOT_FIELDS:
+                    sections[key] = snapshot_records(value, SNAPSHOT_FIELDS[key])
+                elif key in SNAPSHOT_MAPPINGS:
+                    sections[key] = snapshot_mapping(value, self.codec)
+                else:
+                    # Colectiile mici raman JSON
+                    sections[key] = self.codec.dumps(value, True)
+            if old is not None:
+                # Maparea este eliberata inainte ca fisierul sa fie inlocuit
+                old.close()
+                old = None
+            write_snapshot(self.snapshot_file, sections, data_stat)
+        except (ValueError, struct.error):
+            # Date care nu incap in formatul fix: comenzile de citire folosesc fisierul JSON
+            if os.path.exists(self.snapshot_file):
+                os.unlink(self.snapshot_file)
+        except OSError:
+            pass
+        finally:
+            if old is not None:
+                old.close()
+
+    def _mutable_index(self) -> LibraryIndex:
+        """Indexul din memorie, necesar la stergeri (pozitiile din fisierul index se schimba)"""
+        if isinstance(self._index, MappedIndex):
+            self._index.close()
+            self._index = LibraryIndex(self.data)
+        return self._index
+
+    def _upgrade_user_counters(self) -> None:
+        """Completeaza contoarele de returnari pentru fisierele mai vechi"""
+        missing = {str(u.get("id")): u for u in self.data["users"] if "returned_loans" not in u}
+        if not missing:
+            return
+        for user_id, user in missing.items():
+            user["returned_loans"] = 0
+            user["on_time_returns"] = 0
+            self._mark_dirty("users", user_id, bump_version=False)
+        for source in (self._iter_archived_loans(), self.data["loans"]):
+            for loan in source:
+                user = missing.get(str(loan.get("user_id")))
+                if user is not None and loan.get("status") == "RETURNAT":
+                    user["returned_loans"] += 1
+                    if loan.get("penalty", 0) == 0:
+                        user["on_time_returns"] += 1
+
+    def _upgrade_rollups(self) -> None:
+        """Construieste contoarele zilnice pentru fisierele mai vechi (o singura data)"""
+        if self.data["rollups"] or not (self.data["loans"] or self._load_archive_index()["partitions"]):
+            return
+        self.data["rollups"] = self._scan_loans()[3]
+        self._mark_dirty("rollups", bump_version=False)
+
+    def _update_rollup(self, day: str, **amounts) -> None:
+        """Actualizeaza contoarele zilei date (la imprumut/returnare)"""
+        row = self.data["rollups"].setdefault(day, dict.fromkeys(ROLLUP_FIELDS, 0))
+        for field, amount in amounts.items():
+            row[field] += amount
+        self._mark_dirty("rollups", day)
+
+    def _coborrow_matrix(self) -> Dict[str, Dict[str, int]]:
+        """Matricea de co-imprumut; construita din istoric la prima folosire.
+
+        Reconstruirea ramane doar in memorie (comenzile de citire nu scriu);
+        este salvata odata cu urmatoarea modificare.
+        """
+        if self.data["meta"].get("coborrow_history") != COBORROW_HISTORY:
+            matrix: Dict[str, Dict[str, int]] = {}
+            histories: Dict[str, List[str]] = {}
+            seen: Dict[str, set] = {}
+            for source in (self._iter_archived_loans(), self.data["loans"]):
+                for loan in source:
+                    user_id, book_id = str(loan.get("user_id")), str(loan.get("book_id"))
+                    if book_id in seen.setdefault(user_id, set()):
+                        continue
+                    history = histories.setdefault(user_id, [])
+                    _coborrow_add(matrix, book_id, history[-COBORROW_HISTORY:])
+                    history.append(book_id)
+                    seen[user_id].add(book_id)
+            self.data["coborrow"] = matrix
+            self.data["recent_books"] = {user_id: history[-COBORROW_HISTORY:]
+                                         for user_id, history in histories.items()}
+            self.data["meta"]["coborrow_history"] = COBORROW_HISTORY
+            self._neighbours.clear()
+            # Continutul logic (versiunea) nu se schimba, deci cache-ul de interogari ramane valid
+            for collection in ("coborrow", "recent_books", "meta"):
+                self._mark_dirty(collection, bump_version=False)
+        return self.data["coborrow"]
+
+    def _invalidate_coborrow(self) -> None:
+        """Istoricul a fost inlocuit (merge/restore): matricea se reconstruieste la urmatoarea folosire"""
+        self.data["coborrow"] = {}
+        self.data["recent_books"] = {}
+        self.data["meta"].pop("coborrow_history", None)
+        self._neighbours.clear()
+        self._mark_dirty("coborrow", bump_version=False)
+        self._mark_dirty("recent_books", bump_version=False)
+
+    def _record_coborrow(self, book_id: int, user_id: str) -> None:
+        """Actualizeaza matricea la un imprumut nou, din ultimele carti ale cititorului (fara arhiva)"""
+        matrix = self._coborrow_matrix()
+        history = self.data["recent_books"].setdefault(str(user_id), [])
+        if str(book_id) in history:
+            # Cititorul a mai imprumutat recent cartea: perechile au fost deja numarate
+            return
+        for key in _coborrow_add(matrix, str(book_id), history):
+            self._neighbours.pop(key, None)
+        history.append(str(book_id))
+        del history[:-COBORROW_HISTORY]
+        self._mark_dirty("coborrow", str(book_id))
+        self._mark_dirty("recent_books", str(user_id))
+
+    def also_borrowed(self, book: Dict, top: int = RECOMMEND_TOP) -> List[tuple]:
+        """Cartile imprumutate de cititorii cartii date: [(carte, cititori comuni)]"""
+        key = str(book.get("id"))
+        neighbours = self._neighbours.get(key)
+        if neighbours is None:
+            row = self._coborrow_matrix().get(key, {})
+            neighbours = sorted(((int(other), count) for other, count in row.items()),
+                                key=lambda pair: (-pair[1], pair[0]))
+            self._neighbours[key] = neighbours
+        results = []
+        for other_id, count in neighbours:
+            other = self._index.book(other_id)
+            # Cartile sterse raman in matrice, dar nu mai sunt recomandate
+            if other is not None:
+                results.append((other, count))
+                if len(results) == top:
+                    break
+        return results
+
+    def recommend(self, identifier: str, top: int = RECOMMEND_TOP) -> None:
+        """Afiseaza recomandarile pentru o carte ("cititorii ei au mai imprumutat")"""
+        book = self._find_book(identifier)
+        if not book:
+            print(f"EROARE! Cartea '{identifier}' nu a fost gasita!")
+            return
+        print_recommendations(book, self.also_borrowed(book, top))
+
+    def _generate_loan_id(self) -> int:
+        """Genereaza un ID unic pentru imprumut (tine cont si de arhiva)"""
+        max_id = self._load_archive_index().get("max_loan_id", 0)
+        for loan in self.data["loans"]:
+            if loan.get("id", 0) > max_id:
+                max_id = loan["id"]
+        return max_id + 1
+
+    def _generate_book_id(self) -> int:
+        """Genereaza un ID unic pentru carte"""
+        if not self.data["books"]:
+            return 1
+        # Cartile sunt adaugate cu ID-uri crescatoare, deci ultima are ID-ul maxim
+        last_id = self.data["books"][-1].get("id", 0)
+        if self._index.book(last_id + 1) is None:
+            return last_id + 1
+        return max(book.get("id", 0) for book in self.data["books"]) + 1
+
+    # Gestionare carti
+    
+    def add_book(self, title: str, author: str, isbn: str = None,
+                 category: str = None, year: int = None) -> None:
+        """Adauga o carte noua in biblioteca"""
+        # Validare unicitate
+        if isbn:
+            if self._index.books_with_isbn(isbn):
+                print(f"EROARE! O carte cu ISBN {isbn} exista deja!")
+                return
+        else:
+            if any(book.get("author", "").lower() == author.lower() for book in self._index.books_titled(title)):
+                print(f"EROARE! Cartea '{title}' de '{author}' exista deja in biblioteca.")
+                return
+
+        # Validare an
+        if year:
+            current_year = datetime.now().year
+            if year < 1450 or year > current_year + 1:
+                print(f"EROARE! Anul {year} nu este valid (1450-{current_year})!")
+                return
+
+        new_book = {
+            "id": self._generate_book_id(),
+            "title": title,
+            "author": author,
+            "isbn": isbn if isbn else "N/A",
+            "category": category if category else "Necategorizat",
+            "year": year,
+            "status": "DISPONIBIL",
+            "date_added": datetime.now().strftime(DATE_FORMAT),
+            "loan_count": 0
+        }
+
+        self.data["books"].append(new_book)
+        self._index.add_book(new_book)
+        self._record_change("insert", "books", new_book)
+        self._save_data()
+
+        print("")
+        print("▀" * 50)
+        print("      CARTE ADAUGATA CU SUCCES!")
+        print("▀" * 50)
+        print(f"  ID:        {new_book['id']}")
+        print(f"  Titlu:     {title}")
+        print(f"  Autor:     {author}")
+        print(f"  ISBN:      {new_book['isbn']}")
+        print(f"  Categorie: {new_book['category']}")
+        if year:
+            print(f"  An:        {year}")
+        print(f"  Status:    DISPONIBIL")
+        print(f"  Data:      {new_book['date_added']}")
+        print("▀" * 50)
+        print("")
+
+    def list_books(self, status: str = None) -> None:
+        """Listeaza toate cartile din biblioteca"""
+        books = self.data["books"]
+
+        # Filtrare dupa status
+        if status:
+            status_upper = status.upper()
+            if status_upper == "BORROWED":
+                status_upper = "IMPRUMUTAT"
+            elif status_upper == "AVAILABLE":
+                status_upper = "DISPONIBIL"
+            books = [b for b in books if b.get("status", "").upper() == status_upper]
+
+        if not books:
+            if not status:
+                print("\n Nu exista carti in biblioteca.\n")
+            else:
+                print(f"\n Nu exista carti cu status '{status}'.\n")
+            return
+
+        header_text = "CATALOG BIBLIOTECA" if not status else f"CARTI - {status.upper()}"
+        print("")
+        print("▀" * 75)
+        print(f"  {header_text} ({len(books)} total)")
+        print("▀" * 75)
+        print(f"{'ID':<4} {'Titlu':<28} {'Autor':<22} {'Status':<12} {'Categorie':<10}")
+        for book in books:
+            title = book['title'][:26] + ".." if len(book['title']) > 28 else book['title']
+            author = book['author'][:20] + ".." if len(book['author']) > 22 else book['author']
+            print(f"{book['id']:<4} {title:<28} {author:<22} {book['status']:<12} {book.get('category', 'N/A'):<10}")
+
+        print("▀" * 75)
+        print("")
+
+    def _search_positions(self, query: str, search_type: str) -> List[int]:
+        """Pozitiile (in lista de carti) ale cartilor care se potrivesc cautarii"""
+        if search_type not in ("title", "author", "isbn", "category"):
+            return []
+        query_lower = query.lower()
+        return [pos for pos, book in enumerate(self.data["books"])
+                if query_lower in book.get(search_type, "").lower()]
+
+    def _facet_postings(self, facet: str):
+        """(valoare, ID-urile sortate ale cartilor) pentru fiecare valoare a fatetei.
+
+        Listele vin din fisierul index cat timp cartile nu au fost modificate de la
+        deschiderea lui; altfel sunt construite din catalog, o data pana la urmatoarea modificare.
+        """
+        if self._mapped_facets():
+            return self._index.facet_postings(facet)
+        return self._memory_postings()[facet].items()
+
+    def _facet_ids(self, facet: str, value: str):
+        """ID-urile sortate ale cartilor cu o valoare de fateta"""
+        if self._mapped_facets():
+            return self._index.facet_ids(facet, value)
+        return self._memory_postings()[facet].get(value, [])
+
+    def _mapped_facets(self) -> bool:
+        return (isinstance(self._index, MappedIndex) and self._postings is None and
+                self._index_version == self.data["meta"].get("version", 0))
+
+    def _memory_postings(self) -> Dict[str, Dict[str, List[int]]]:
+        if self._postings is None:
+            postings = {facet: {} for facet in FACETS}
+            for book in sorted(self.data["books"], key=lambda book: book.get("id")):
+                for facet in FACETS:
+                    postings[facet].setdefault(_facet_value(facet, book), []).append(book.get("id"))
+            self._postings = postings
+        return self._postings
+
+    def facet_counts(self, results: List[Dict]) -> Dict[str, List[tuple]]:
+        """Numarul de rezultate pentru fiecare valoare de fateta (intersectia listelor de ID-uri
+        ale fatetei cu ID-urile rezultatelor)"""
+        result_ids = sorted(book.get("id") for book in results)
+        id_set = set(result_ids)
+        counts = {}
+        for facet in FACETS:
+            pairs = []
+            for value, ids in self._facet_postings(facet):
+                # Se parcurge lista mai scurta: ID-urile valorii sau rezultatele (cautare binara)
+                if len(ids) <= len(result_ids):
+                    count = len(id_set.intersection(ids))
+                else:
+                    count = sum(1 for book_id in result_ids if _sorted_contains(ids, book_id))
+                if count:
+                    pairs.append((value, count))
+            counts[facet] = sorted(pairs, key=lambda pair: (-pair[1], pair[0]))
+        return counts
+
+    def _search_results(self, query: Optional[str], search_type: str, ranges: Dict = None,
+                        facet: tuple = None) -> List[Dict]:
+        """Cartile gasite de o cautare, filtrate optional pe intervale ({camp: (min, max)}) si fateta"""
+        results = None
+        if query:
+            # Cautarea text vine din cache daca interogarea a mai fost facuta
+            positions = self._cached_query("search", [search_type, query.lower()],
+                                           lambda: self._search_positions(query, search_type))
+            results = [self.data["books"][pos] for pos in positions]
+        for field, (low, high) in (ranges or {}).items():
+            matched = self._index.in_range(field, low, high)
+            if results is None:
+                results = matched
+            else:
+                wanted = {id(book) for book in matched}
+                results = [book for book in results if id(book) in wanted]
+        if facet:
+            ids = self._facet_ids(*facet)
+            if results is None:
+                results = [book for book in map(self._index.book, ids) if book is not None]
+            else:
+                results = [book for book in results if _sorted_contains(ids, book.get("id"))]
+        return results or []
+
+    def _expected_return(self, book: Dict) -> Optional[str]:
+        """Data estimata de returnare pentru o carte imprumutata"""
+        loan = self._index.active_loan(book["id"])
+        return loan.get("return_date", "N/A") if loan else None
+
+    def search_books(self, query: Optional[str], search_type: str = "title", ranges: Dict = None,
+                     facet: tuple = None) -> None:
+        """Cauta carti dupa diferite criterii (cu numarul de rezultate pe fatete)"""
+        results = self._search_results(query, search_type, ranges, facet)
+        print_search_results(results, search_label(query, search_type, ranges, facet), self._expected_return,
+                             self.facet_counts(results) if results else None, self._also_borrowed_titles)
+
+    def _also_borrowed_titles(self, book: Dict) -> List[str]:
+        """Titlurile afisate la un rezultat al cautarii ("au mai imprumutat")"""
+        return [other["title"] for other, _ in self.also_borrowed(book, ALSO_BORROWED_SHOWN)]
+
+    def _find_book(self, identifier: str) -> Optional[Dict]:
+        """Gaseste o carte dupa titlu, ISBN sau ID"""
+        candidates = self._index.books_titled(identifier)[:1] + self._index.books_with_isbn(identifier)[:1]
+        if identifier.isdigit() and str(int(identifier)) == identifier:
+            book = self._index.book(int(identifier))
+            if book:
+                candidates.append(book)
+        # Ca la cautarea secventiala, castiga prima carte din catalog (ID-ul cel mai mic)
+        return min(candidates, key=lambda b: b.get("id", 0), default=None)
+
+    def delete_book(self, identifier: str) -> None:
+        """Sterge o carte din catalog"""
+        # Verificare duplicate la titlu
+        matches = self._index.books_titled(identifier)
+        if len(matches) > 1:
+            print(f"\nEROARE! Exista {len(matches)} carti cu titlul '{identifier}'.")
+            print("Care dintre ele doresti sa o stergi?")
+            for m in matches:
+                print(f"  [ID: {m['id']}] {m['title']} - {m['author']} (ISBN: {m.get('isbn', 'N/A')})")
+            
+            try:
+                valid_ids = [str(m['id']) for m in matches]
+                while True:
+                    choice = input("\nIntrodu ID-ul corect (sau Enter pentru anulare): ").strip()
+                    if not choice:
+                        print("Operatiune anulata.")
+                        return
+                    if choice not in valid_ids:
+                        print(f"EROARE! ID-ul '{choice}' nu e in lista de mai sus.")
+                        print(f"Introdu unul dintre: {', '.join(valid_ids)}")
+                        continue
+                    # Apelam recursiv cu ID-ul ales
+                    self.delete_book(choice)
+                    return
+            except KeyboardInterrupt:
+                print("\nOperatiune anulata.")
+                return
+
+        book = self._find_book(identifier)
+
+        if not book:
+            print(f"EROARE! Cartea '{identifier}' nu a fost gasita!")
+            return
+
+        if book['status'] == "REZERVAT":
+            print("EROARE! Nu poti sterge o carte care asteapta sa fie ridicata (rezervata)!")
+            return
+        if book['status'] != "DISPONIBIL":
+            print("EROARE! Nu poti sterge o carte care este imprumutata!")
+            return
+
+        self.data["books"].remove(book)
+        self._mutable_index().remove_book(book)
+        self._record_change("delete", "books", book)
+        self._save_data()
+
+        print(f"\n Cartea '{book['title']}' a fost stearsa din catalog.\n")
+
+    # Gestionare utilizatori
+    
+    def add_user(self, name: str, user_id: str, email: str = None) -> None:
+        """Inregistreaza un utilizator nou"""
+        user_id = str(user_id)
+
+        if self._index.user(user_id):
+            print(f"EROARE! Un utilizator cu ID {user_id} exista deja!")
+            return
+
+        if email and '@' not in email:
+            print("EROARE! Formatul email-ului nu este valid!")
+            return
+
+        new_user = {
+            "id": user_id,
+            "name": name,
+            "email": email if email else "N/A",
+            "registration_date": datetime.now().strftime(DATE_FORMAT),
+            "active_loans": 0,
+            "total_loans": 0,
+            "total_penalties": 0,
+            "returned_loans": 0,
+            "on_time_returns": 0,
+            "status": "ACTIV"
+        }
+
+        self.data["users"].append(new_user)
+        self._index.add_user(new_user)
+        self._record_change("insert", "users", new_user)
+        self._save_data()
+
+        print("")
+        print("▀" * 50)
+        print("      UTILIZATOR ADAUGAT CU SUCCES!")
+        print("▀" * 50)
+        print(f"  Nume:              {name}")
+        print(f"  ID:                {user_id}")
+        print(f"  Email:             {new_user['email']}")
+        print(f"  Data inregistrare: {new_user['registration_date']}")
+        print(f"  Carti imprumutate: 0")
+        print(f"  Status:            ACTIV")
+        print("▀" * 50)
+        print("")
+
+    def list_users(self) -> None:
+        """Listeaza toti utilizatorii"""
+        users = self.data["users"]
+
+        if not users:
+            print("\n Nu exista utilizatori inregistrati.\n")
+            return
+
+        print("")
+        print("▀" * 80)
+        print(f"  UTILIZATORI INREGISTRATI ({len(users)} total)")
+        print("▀" * 80)
+        print(f"{'ID':<10} {'Nume':<25} {'Email':<25} {'Impr. Active':<10} {'Status':<10}")
+        print("░" * 80)
+
+        for user in users:
+            name = user['name'][:23] + ".." if len(user['name']) > 25 else user['name']
+            email = user.get('email', 'N/A')[:23] + ".." if len(user.get('email', 'N/A')) > 25 else user.get('email', 'N/A')
+            status = user.get('status', 'N/A')
+            print(f"{user['id']:<10} {name:<25} {email:<25} {user.get('active_loans', 0):<10} {status:<10}")
+        print("▀" * 80)
+        print("")
+
+    def _find_user(self, user_id: str) -> Optional[Dict]:
+        """Gaseste un utilizator dupa ID"""
+        return self._index.user(user_id)
+
+    def deactivate_user(self, user_id: str) -> None:
+        """Dezactiveaza un utilizator"""
+        user = self._find_user(user_id)
+        if not user:
+            print(f"EROARE! Utilizatorul cu ID '{user_id}' nu exista!")
+            return
+
+        if user.get('active_loans', 0) > 0:
+            print(f"EROARE! Utilizatorul are {user['active_loans']} imprumuturi active!")
+            print("Returneaza cartile inainte de a dezactiva contul.")
+            return
+
+        user['status'] = "INACTIV"
+        self._record_change("update", "users", user)
+        self._save_data()
+
+        print(f"\n Utilizatorul '{user['name']}' a fost dezactivat.\n")
+
+    def reactivate_user(self, user_id: str) -> None:
+        """Reactiveaza un utilizator inactiv."""
+        user = self._find_user(user_id)
+        if not user:
+            print(f"EROARE! Utilizatorul cu ID '{user_id}' nu exista!")
+            return
+
+        if user.get('status') == "ACTIV":
+            print(f"Utilizatorul '{user['name']}' este deja activ.")
+            return
+
+        user['status'] = "ACTIV"
+        self._record_change("update", "users", user)
+        self._save_data()
+
+        print(f"\nUtilizatorul '{user['name']}' a fost reactivat cu succes.\n")
+
+    # Gestionare imprumuturi
+
+    def borrow_book(self, identifier: str, user_id: str, days: int = 14) -> None:
+        """Imprumuta o carte"""
+        print("\nVerificare disponibilitate...")
+
+        user_id = str(user_id)
+
+        # Verificare ambiguitate (duplicate la titlu)
+        matches = [b for b in self._index.books_titled(identifier) if b["status"] == "DISPONIBIL"]
+        if len(matches) > 1:
+            print(f"\nExista {len(matches)} carti disponibile cu titlul '{identifier}'.")
+            print("Care dintre ele doresti sa o imprumuti?")
+            for m in matches:
+                print(f"  [ID: {m['id']}] {m['title']} - {m['author']} (ISBN: {m.get('isbn', 'N/A')})")
+            
+            try:
+                valid_ids = [str(m['id']) for m in matches]
+                while True:
+                    choice = input("\nIntrodu ID-ul corect (sau Enter pentru anulare): ").strip()
+                    if not choice:
+                        print("Operatiune anulata.")
+                        return
+                    if choice not in valid_ids:
+                        print(f"EROARE! ID-ul '{choice}' nu e in lista de mai sus.")
+                        print(f"Introdu unul dintre: {', '.join(valid_ids)}")
+                        continue
+                    # Apelam recursiv cu ID-ul ales
+                    self.borrow_book(choice, user_id, days)
+                    return
+            except KeyboardInterrupt:
+                print("\nOperatiune anulata.")
+                return
+
+        book = self._find_book(identifier)
+        if not book:
+            print(f"EROARE! Cartea '{identifier}' nu a fost gasita!")
+            return
+
+        user = self._find_user(user_id)
+        if not user:
+            print(f"EROARE! Utilizatorul cu ID '{user_id}' nu exista!")
+            return
+
+        if user.get('status') != "ACTIV":
+            print("EROARE! Contul utilizatorului este inactiv!")
+            return
+
+        if days < 1 or days > 60:
+            print("EROARE! Perioada de imprumut trebuie sa fie intre 1 si 60 de zile!")
+            return
+
+        # Rezervarile expirate sunt procesate doar dupa validari; daca imprumutul este respins
+        # dupa aceea, expirarile sunt salvate (nu raman modificari nesalvate in memorie)
+        self._expire_holds(date.today().toordinal())
+        hold = None
+        if book["status"] == "REZERVAT":
+            hold = self._hold(self.data["hold_queues"]["assigned"].get(str(book["id"])))
+            if hold is None or hold["user_id"] != user_id:
+                print(f"EROARE! Cartea '{book['title']}' este rezervata pentru alt cititor!")
+                if hold:
+                    print(f"         Rezervarea expira la: {hold['pickup_until']}")
+                self._save_data()
+                return
+
+        if book["status"] not in ("DISPONIBIL", "REZERVAT"):
+            print(f"EROARE! Cartea '{book['title']}' nu este disponibila!")
+            loan = self._index.active_loan(book["id"])
+            if loan:
+                print(f"         Returnare estimata: {loan.get('return_date', 'N/A')}")
+            print(f"         O puteti rezerva: reserve \"{book['title']}\" --user_id {user_id}")
+            self._save_data()
+            return
+
+        print("Carte disponibila!")
+        print("Utilizator valid!")
+
+        loan_date = datetime.now()
+        return_date = loan_date + timedelta(days=days)
+        loan_day = loan_date.date().toordinal()
+
+        self._record_coborrow(book["id"], user_id)
+        loan = {
+            "id": self._generate_loan_id(),
+            "book_id": book["id"],
+            "book_title": book["title"],
+            "user_id": user_id,
+            "user_name": user["name"],
+            "loan_date": loan_date.strftime(DATE_FORMAT),
+            "return_date": return_date.strftime(DATE_FORMAT),
+            "actual_return_date": None,
+            "status": "ACTIV",
+            "penalty": 0,
+            "loan_day": loan_day,
+            "return_day": loan_day + days,
+            "actual_return_day": None
+        }
+
+        self.data["loans"].append(loan)
+        self._index.add_loan(loan)
+
+        book["status"] = "IMPRUMUTAT"
+        book["loan_count"] = book.get("loan_count", 0) + 1
+
+        user["active_loans"] = user.get("active_loans", 0) + 1
+        user["total_loans"] = user.get("total_loans", 0) + 1
+
+        self._record_change("insert", "loans", loan)
+        self._record_change("update", "books", book)
+        self._record_change("update", "users", user)
+        self._update_rollup(loan["loan_date"], loans=1)
+        if hold is not None:
+            # Rezervarea este ridicata; intrarea din heap-ul global este ignorata la citire
+            hold["status"] = "ONORATA"
+            del self.data["hold_queues"]["assigned"][str(book["id"])]
+            self._record_change("update", "holds", hold)
+            self._mark_dirty("hold_queues")
+        self._save_data()
+
+        print("")
+        print("▀" * 50)
+        print("      IMPRUMUT INREGISTRAT!")
+        print("▀" * 50)
+        print(f"  Carte:         {book['title']} ({book['author']})")
+        print(f"  Utilizator:    {user['name']} (ID: {user_id})")
+        print(f"  Data imprumut: {loan['loan_date']}")
+        print(f"  Data returnare: {loan['return_date']} ({days} zile)")
+        print("▀" * 50)
+        print(f"\n⚠️  Reminder: Returneaza cartea pana la {loan['return_date']}")
+        print("   pentru a evita penalitati!\n")
+
+    def return_book(self, identifier: str, user_id: str) -> None:
+        """Returneaza o carte imprumutata"""
+        print("\nProcesare returnare...")
+
+        user_id = str(user_id)
+
+        # Verificare ambiguitate (duplicate la titlu) - doar cartile imprumutate
+        matches = [b for b in self._index.books_titled(identifier) if b["status"] == "IMPRUMUTAT"]
+        if len(matches) > 1:
+            print(f"\nExista {len(matches)} carti imprumutate cu titlul '{identifier}'.")
+            print("Care dintre ele doresti sa o returnezi?")
+            for m in matches:
+                print(f"  [ID: {m['id']}] {m['title']} - {m['author']} (ISBN: {m.get('isbn', 'N/A')})")
+            
+            try:
+                valid_ids = [str(m['id']) for m in matches]
+                while True:
+                    choice = input("\nIntrodu ID-ul corect (sau Enter pentru anulare): ").strip()
+                    if not choice:
+                        print("Operatiune anulata.")
+                        return
+                    if choice not in valid_ids:
+                        print(f"EROARE! ID-ul '{choice}' nu e in lista de mai sus.")
+                        print(f"Introdu unul dintre: {', '.join(valid_ids)}")
+                        continue
+                    # Apelam recursiv cu ID-ul ales
+                    self.return_book(choice, user_id)
+                    return
+            except KeyboardInterrupt:
+                print("\nOperatiune anulata.")
+                return
+
+        book = self._find_book(identifier)
+        if not book:
+            print(f"EROARE! Cartea '{identifier}' nu a fost gasita!")
+            return
+
+        user = self._find_user(user_id)
+        if not user:
+            print(f"EROARE! Utilizatorul cu ID '{user_id}' nu exista!")
+            return
+
+        active_loan = self._index.active_loan(book["id"])
+        if active_loan and str(active_loan.get("user_id")) != user_id:
+            active_loan = None
+
+        if not active_loan:
+            print(f"EROARE! Nu exista un imprumut activ pentru '{book['title']}' de catre utilizatorul {user_id}!")
+            return
+
+        today = datetime.now()
+        today_day = today.date().toordinal()
+        loan_days = today_day - active_loan["loan_day"]
+
+        penalty = 0
+        overdue_days = 0
+
+        if today_day > active_loan["return_day"]:
+            overdue_days = today_day - active_loan["return_day"]
+            penalty = overdue_days * PENALTY_PER_DAY
+
+        active_loan["actual_return_date"] = today.strftime(DATE_FORMAT)
+        active_loan["actual_return_day"] = today_day
+        active_loan["status"] = "RETURNAT"
+        active_loan["penalty"] = penalty
+        self._index.close_loan(active_loan)
+
+        book["status"] = "DISPONIBIL"
+
+        user["active_loans"] = max(0, user.get("active_loans", 1) - 1)
+        user["total_penalties"] = user.get("total_penalties", 0) + penalty
+        user["returned_loans"] = user.get("returned_loans", 0) + 1
+        if penalty == 0:
+            user["on_time_returns"] = user.get("on_time_returns", 0) + 1
+
+        self._record_change("update", "loans", active_loan)
+        self._record_change("update", "books", book)
+        self._record_change("update", "users", user)
+        self._update_rollup(active_loan["actual_return_date"], returns=1,
+                            overdue=1 if penalty else 0, penalties=penalty)
+        self._expire_holds(today_day)
+        hold = self._assign_next_hold(book, today_day)
+        self._save_data()
+
+        print("")
+        print("▀" * 50)
+        print("      CARTE RETURNATA CU SUCCES!")
+        print("▀" * 50)
+        print(f"  Carte:             {book['title']}")
+        print(f"  Utilizator:        {user['name']}")
+        print(f"  Data imprumut:     {active_loan['loan_date']}")
+        print(f"  Data returnare:    {today.strftime(DATE_FORMAT)}")
+        print(f"  Zile imprumut:     {loan_days} zile")
+
+        if overdue_days > 0:
+            print(f"  ⚠️  Intarziere:    {overdue_days} zile")
+            print(f"    Penalitate:    {penalty} RON")
+        else:
+            print("  Returnat la timp!")
+            print("  Fara penalitati!")
+
+        print("▀" * 50)
+        if hold:
+            print(f"\n📚 Cartea este REZERVATA pentru {hold['user_name']} (ID: {hold['user_id']}), "
+                  f"ridicare pana la {hold['pickup_until']}.\n")
+        else:
+            print("\n📚 Cartea este acum DISPONIBILA pentru imprumut.\n")
+
+    # Rezervari
+
+    def _hold(self, hold_id: Optional[int]) -> Optional[Dict]:
+        """Rezervarea cu ID-ul dat (ID-urile sunt crescatoare, deci cautare binara)"""
+        holds = self.data["holds"]
+        if hold_id is None:
+            return None
+        i = bisect.bisect_left(holds, hold_id, key=lambda hold: hold["id"])
+        return holds[i] if i < len(holds) and holds[i]["id"] == hold_id else None
+
+    def _book_holds(self, book_id: int) -> List[Dict]:
+        """Rezervarile in asteptare ale unei carti, in ordinea in care vor fi servite"""
+        entries = sorted(self.data["hold_queues"]["waiting"].get(str(book_id), []))
+        holds = (self._hold(hold_id) for _, hold_id in entries)
+        return [hold for hold in holds if hold and hold["status"] == "ASTEPTARE"]
+
+    def reserve_book(self, identifier: str, user_id: str, priority: int = 0) -> None:
+        """Adauga utilizatorul in coada de rezervari a unei carti indisponibile"""
+        user_id = str(user_id)
+        book = self._find_book(identifier)
+        if not book:
+            print(f"EROARE! Cartea '{identifier}' nu a fost gasita!")
+            return
+        user = self._find_user(user_id)
+        if not user:
+            print(f"EROARE! Utilizatorul cu ID '{user_id}' nu exista!")
+            return
+        if user.get("status") != "ACTIV":
+            print("EROARE! Contul utilizatorului este inactiv!")
+            return
+
+        self._expire_holds(date.today().toordinal())
+        if book["status"] == "DISPONIBIL":
+            print(f"EROARE! Cartea '{book['title']}' este disponibila, o puteti imprumuta direct!")
+            return
+        loan = self._index.active_loan(book["id"])
+        if loan and loan.get("user_id") == user_id:
+            print(f"EROARE! Cartea '{book['title']}' este deja imprumutata de acest utilizator!")
+            return
+        assigned = self._hold(self.data["hold_queues"]["assigned"].get(str(book["id"])))
+        if any(hold["user_id"] == user_id for hold in self._book_holds(book["id"]) + [assigned] if hold):
+            print(f"EROARE! Utilizatorul {user_id} are deja o rezervare pentru '{book['title']}'!")
+            return
+
+        holds = self.data["holds"]
+        hold = {
+            "id": holds[-1]["id"] + 1 if holds else 1,
+            "book_id": book["id"],
+            "book_title": book["title"],
+            "user_id": user_id,
+            "user_name": user["name"],
+            "priority": priority,
+            "request_date": datetime.now().strftime(DATE_FORMAT),
+            "status": "ASTEPTARE",
+            "pickup_until": None,
+            "pickup_day": None
+        }
+        holds.append(hold)
+        heapq.heappush(self.data["hold_queues"]["waiting"].setdefault(str(book["id"]), []),
+                       [-priority, hold["id"]])
+        self._record_change("insert", "holds", hold)
+        self._mark_dirty("hold_queues", str(book["id"]))
+        self._save_data()
+
+        position = next(i for i, h in enumerate(self._book_holds(book["id"]), 1) if h is hold)
+        print(f"\n Rezervare inregistrata pentru '{book['title']}' ({user['name']}).")
+        print(f"   Pozitia in coada: {position}")
+        if loan:
+            print(f"   Returnare estimata: {loan.get('return_date', 'N/A')}")
+        print("")
+
+    def cancel_reservation(self, identifier: str, user_id: str) -> None:
+        """Anuleaza rezervarea unui utilizator (o rezervare pregatita trece la urmatorul din coada)"""
+        user_id = str(user_id)
+        book = self._find_book(identifier)
+        if not book:
+            print(f"EROARE! Cartea '{identifier}' nu a fost gasita!")
+            return
+        queues = self.data["hold_queues"]
+        assigned = self._hold(queues["assigned"].get(str(book["id"])))
+        candidates = [assigned] if assigned else []
+        hold = next((h for h in candidates + self._book_holds(book["id"]) if h["user_id"] == user_id), None)
+        if hold is None:
+            print(f"EROARE! Utilizatorul {user_id} nu are o rezervare activa pentru '{book['title']}'!")
+            return
+
+        was_ready = hold["status"] == "PREGATITA"
+        # Intrarea din heap ramane si este sarita la extragere (stergere lenesa)
+        hold["status"] = "ANULATA"
+        self._record_change("update", "holds", hold)
+        if was_ready:
+            del queues["assigned"][str(book["id"])]
+            self._assign_next_hold(book, date.today().toordinal())
+        self._save_data()
+        print(f"\n Rezervarea lui {hold['user_name']} pentru '{book['title']}' a fost anulata.\n")
+
+    def _assign_next_hold(self, book: Dict, today_day: int) -> Optional[Dict]:
+        """Cartea returnata trece la urmatoarea rezervare valida din coada ei (O(log n))"""
+        queues = self.data["hold_queues"]
+        key = str(book["id"])
+        heap = queues["waiting"].get(key, [])
+        hold = None
+        while heap:
+            _, hold_id = heapq.heappop(heap)
+            candidate = self._hold(hold_id)
+            if candidate is None or candidate["status"] != "ASTEPTARE":
+                continue
+            user = self._find_user(candidate["user_id"])
+            if user is None or user.get("status") != "ACTIV":
+                candidate["status"] = "ANULATA"
+                self._record_change("update", "holds", candidate)
+                continue
+            hold = candidate
+            break
+        if not heap:
+            queues["waiting"].pop(key, None)
+        self._mark_dirty("hold_queues", key)
+
+        status = "DISPONIBIL"
+        if hold is not None:
+            pickup_day = today_day + HOLD_PICKUP_DAYS
+            hold.update(status="PREGATITA", pickup_day=pickup_day,
+                        pickup_until=date.fromordinal(pickup_day).strftime(DATE_FORMAT))
+            heapq.heappush(queues["ready"], [pickup_day, hold["id"]])
+            queues["assigned"][key] = hold["id"]
+            self._record_change("update", "holds", hold)
+            status = "REZERVAT"
+        if book["status"] != status:
+            book["status"] = status
+            self._record_change("update", "books", book)
+        return hold
+
+    def _expire_holds(self, today_day: int) -> int:
+        """Expira rezervarile neridicate la termen (doar varful heap-ului global este citit)"""
+        ready = self.data["hold_queues"]["ready"]
+        expired = 0
+        while ready and ready[0][0] < today_day:
+            _, hold_id = heapq.heappop(ready)
+            self._mark_dirty("hold_queues")
+            hold = self._hold(hold_id)
+            if hold is None or hold["status"] != "PREGATITA":
+                continue
+            hold["status"] = "EXPIRATA"
+            self._record_change("update", "holds", hold)
+            self.data["hold_queues"]["assigned"].pop(str(hold["book_id"]), None)
+            book = self._index.book(hold["book_id"])
+            if book is not None:
+                self._assign_next_hold(book, today_day)
+            expired += 1
+        return expired
+
+    def _ready_holds(self) -> List[Dict]:
+        """Rezervarile gata de ridicare, ordonate dupa termen (citeste doar heap-ul global)"""
+        holds = (self._hold(hold_id) for _, hold_id in sorted(self.data["hold_queues"]["ready"]))
+        return [hold for hold in holds if hold and hold["status"] == "PREGATITA"]
+
+    def _rebuild_hold_queues(self) -> None:
+        """Reconstruieste cozile din inregistrarile rezervarilor (dupa restaurare)"""
+        queues = {"waiting": {}, "ready": [], "assigned": {}}
+        for hold in self.data["holds"]:
+            if hold.get("status") == "ASTEPTARE":
+                queues["waiting"].setdefault(str(hold["book_id"]), []).append([-hold.get("priority", 0), hold["id"]])
+            elif hold.get("status") == "PREGATITA":
+                queues["ready"].append([hold["pickup_day"], hold["id"]])
+                queues["assigned"][str(hold["book_id"])] = hold["id"]
+        for heap in queues["waiting"].values():
+            heapq.heapify(heap)
+        heapq.heapify(queues["ready"])
+        self.data["hold_queues"] = queues
+
+    def _user_loans(self, user_id: str, date_from: str = None, date_to: str = None) -> List[Dict]:
+        """Imprumuturile unui utilizator (inclusiv arhivate), filtrate dupa data imprumutului"""
+        user_id = str(user_id)
+        loans = []
+        # Din arhiva citim doar partitiile care contin utilizatorul; o carte
+        # returnata intr-o luna anterioara lui date_from nu poate fi in interval
+        for month, partition in sorted(self._load_archive_index()["partitions"].items()):
+            spans = partition.get("users", {}).get(user_id)
+            if not spans:
+                continue
+            if date_from and month < date_from[:7]:
+                continue
+            loans.extend(self._read_archived_user_loans(partition, spans, user_id))
+        loans.extend(self._index.user_loans(user_id))
+
+        if date_from:
+            loans = [l for l in loans if l.get("loan_date", "") >= date_from]
+        if date_to:
+            loans = [l for l in loans if l.get("loan_date", "") <= date_to]
+        return loans
+
+    def user_history(self, user_id: str, date_from: str = None, date_to: str = None) -> None:
+        """Afiseaza istoricul de imprumuturi al unui utilizator"""
+        user = self._find_user(user_id)
+        if not user:
+            print(f"EROARE! Utilizatorul cu ID '{user_id}' nu exista!")
+            return
+
+        for value in (date_from, date_to):
+            if value:
+                try:
+                    datetime.strptime(value, DATE_FORMAT)
+                except ValueError:
+                    print(f"EROARE! Data '{value}' nu respecta formatul YYYY-MM-DD!")
+                    return
+
+        loans = self._user_loans(user_id, date_from, date_to)
+
+        print("")
+        print("▀" * 75)
+        print(f"  ISTORIC IMPRUMUTURI - {user['name']} (ID: {user['id']})")
+        if date_from or date_to:
+            print(f"  Interval: {date_from or '...'} -> {date_to or '...'}")
+        print("▀" * 75)
+
+        if loans:
+            print(f"{'ID':<6} {'Titlu':<24} {'Imprumut':<12} {'Scadenta':<12} {'Returnat':<12} {'Pen.':<5}")
+            print("░" * 75)
+            for loan in loans:
+                title = loan['book_title'][:22] + ".." if len(loan['book_title']) > 24 else loan['book_title']
+                returned = loan.get('actual_return_date') or "ACTIV"
+                print(f"{loan['id']:<6} {title:<24} {loan['loan_date']:<12} {loan['return_date']:<12} "
+                      f"{returned:<12} {loan.get('penalty', 0):<5}")
+        else:
+            print("\n  Nu exista imprumuturi in intervalul cerut.\n")
+
+        print("░" * 75)
+        if date_from or date_to:
+            returned = [l for l in loans if l.get("status") == "RETURNAT"]
+            on_time = len([l for l in returned if l.get("penalty", 0) == 0])
+            on_time_rate = (on_time / len(returned) * 100) if returned else 100
+            print(f"  In interval:  {len(loans)} imprumuturi, "
+                  f"{sum(l.get('penalty', 0) for l in returned)} RON penalitati, "
+                  f"{on_time_rate:.0f}% la timp")
+
+        returned_count = user.get("returned_loans", 0)
+        on_time_rate = (user.get("on_time_returns", 0) / returned_count * 100) if returned_count else 100
+        print(f"  Total cont:   {user.get('total_loans', 0)} imprumuturi, "
+              f"{user.get('total_penalties', 0)} RON penalitati, {on_time_rate:.0f}% la timp")
+        print("▀" * 75)
+        print("")
+
+    # Arhiva imprumuturi
+
+    def _load_archive_index(self) -> Dict:
+        """Incarca (o singura data) indexul arhivei cu sumarele pe partitii"""
+        if self._archive_index is None:
+            self._archive_index = {"max_loan_id": 0, "partitions": {}}
+            index_file = os.path.join(self.archive_dir, ARCHIVE_INDEX_FILE)
+            if os.path.exists(index_file):
+                try:
+                    self._archive_index.update(self._read_json(index_file))
+                except self.codec.decode_errors:
+                    pass
+        return self._archive_index
+
+    def _save_archive_index(self) -> None:
+        """Salveaza indexul arhivei"""
+        index_file = os.path.join(self.archive_dir, ARCHIVE_INDEX_FILE)
+        self._write_json(index_file, self._load_archive_index())
+
+    def _read_archive_partition(self, month: str) -> List[Dict]:
+        """Citeste imprumuturile dintr-o partitie lunara a arhivei"""
+        partition = self._load_archive_index()["partitions"].get(month)
+        if not partition:
+            return []
+        path = os.path.join(self.archive_dir, partition["file"])
+        if not os.path.exists(path):
+            return []
+        return self._read_json(path)
+
+    def _read_archived_user_loans(self, partition: Dict, spans, user_id: str) -> List[Dict]:
+        """Citeste dintr-o partitie doar imprumuturile utilizatorului (pozitiile sunt in indexul arhivei)"""
+        path = os.path.join(self.archive_dir, partition["file"])
+        if not os.path.exists(path):
+            return []
+        if isinstance(spans, int):
+            # Partitie scrisa de o versiune mai veche (indexul retine doar numarul de imprumuturi)
+            return [l for l in self._read_json(path) if str(l.get("user_id")) == user_id]
+        loans = []
+        with open(path, 'rb') as f:
+            for offset, length in spans:
+                f.seek(offset)
+                loans.append(self.codec.loads(f.read(length)))
+        return loans
+
+    def _write_archive_partition(self, partition: Dict, loans: List[Dict]) -> None:
+        """Scrie o partitie si retine in index pozitia (offset, lungime) fiecarui imprumut, pe utilizator"""
+        separator, start, end = (b',', b'[', b']') if self.compact else (b',\n', b'[\n', b'\n]')
+        users: Dict[str, List[List[int]]] = {}
+        parts, offset = [], len(start)
+        for loan in loans:
+            blob = self.codec.dumps(loan, self.compact)
+            users.setdefault(str(loan.get("user_id")), []).append([offset, len(blob)])
+            parts.append(blob)
+            offset += len(blob) + len(separator)
+        with open(os.path.join(self.archive_dir, partition["file"]), 'wb') as f:
+            f.write(start + separator.join(parts) + end)
+        partition["users"] = users
+
+    def _iter_archived_loans(self):
+        """Parcurge imprumuturile arhivate partitie cu partitie (cronologic)"""
+        for month in sorted(self._load_archive_index()["partitions"]):
+            yield from self._read_archive_partition(month)
+
+    def _archive_totals(self) -> Dict[str, int]:
+        """Aduna sumarele partitiilor fara a citi imprumuturile arhivate"""
+        totals = {"count": 0, "on_time": 0, "penalties": 0}
+        for partition in self._load_archive_index()["partitions"].values():
+            for key in totals:
+                totals[key] += partition.get(key, 0)
+        return totals
+
+    def archive_loans(self, days: int = ARCHIVE_AFTER_DAYS) -> None:
+        """Muta imprumuturile returnate mai vechi de `days` zile in arhiva lunara"""
+        if days < 0:
+            print("EROARE! Numarul de zile trebuie sa fie pozitiv!")
+            return
+
+        cutoff = (datetime.now() - timedelta(days=days)).strftime(DATE_FORMAT)
+        by_month: Dict[str, List[Dict]] = {}
+        keep = []
+        for loan in self.data["loans"]:
+            returned = loan.get("actual_return_date")
+            if loan.get("status") == "RETURNAT" and returned and returned < cutoff:
+                by_month.setdefault(returned[:7], []).append(loan)
+            else:
+                keep.append(loan)
+
+        if not by_month:
+            print(f"\n Nu exista imprumuturi returnate inainte de {cutoff} de arhivat.\n")
+            return
+
+        os.makedirs(self.archive_dir, exist_ok=True)
+        index = self._load_archive_index()
+
+        for month, loans in sorted(by_month.items()):
+            partition = index["partitions"].setdefault(month, {
+                "file": f"loans_{month}.json",
+                "count": 0,
+                "on_time": 0,
+                "penalties": 0,
+                "users": {}
+            })
+            existing = self._read_archive_partition(month)
+            # Evitam dublurile daca o arhivare anterioara a fost intrerupta
+            known_ids = {loan.get("id") for loan in existing}
+            for loan in loans:
+                if loan.get("id") in known_ids:
+                    continue
+                existing.append(loan)
+                partition["count"] += 1
+                partition["penalties"] += loan.get("penalty", 0)
+                if loan.get("penalty", 0) == 0:
+                    partition["on_time"] += 1
+                index["max_loan_id"] = max(index["max_loan_id"], loan.get("id", 0))
+
+            self._write_archive_partition(partition, existing)
+
+        # Indexul si partitiile se scriu inaintea fisierului principal
+        self._save_archive_index()
+        archived = len(self.data["loans"]) - len(keep)
+        self.data["loans"] = keep
+        if isinstance(self._index, MappedIndex):
+            self._index.close()
+        self._index = LibraryIndex(self.data)
+        self._mark_dirty("loans")
+        # Partitiile sunt deja pe disc: fisierul principal nu poate astepta grupul
+        self.flush()
+
+        print(f"\n Arhivate {archived} imprumuturi returnate inainte de {cutoff}.")
+        print(f" Partitii actualizate: {', '.join(sorted(by_month))}")
+        print(f" Imprumuturi ramase in fisierul principal: {len(keep)}\n")
+
+    # Rapoarte  
+
+    def generate_report(self, report_type: str, top: int = 10, date_range: tuple = None) -> None:
+        """Genereaza diverse rapoarte"""
+        if report_type in ("due", "loaned"):
+            print_borrowed_report(self._loans_in_range(report_type, *date_range),
+                                  range_report_title(report_type, date_range))
+        elif report_type == "overdue":
+            self._report_overdue()
+        elif report_type == "borrowed":
+            self._report_borrowed()
+        elif report_type == "popular":
+            self._report_popular(top)
+        elif report_type == "users":
+            self._report_active_users(top)
+        elif report_type == "ready":
+            print_ready_holds_report(self._ready_holds())
+        else:
+            print(f"EROARE! Tip raport invalid: {report_type}")
+            print("Tipuri disponibile: overdue, borrowed, popular, users, due, loaned, ready")
+
+    def _loans_in_range(self, report_type: str, low: Optional[int], high: Optional[int]) -> List[Dict]:
+        """Imprumuturile active scadente in interval (due) sau facute in interval (loaned)"""
+        if report_type == "due":
+            return [l for l in self._index.in_range("return_date", low, high) if l.get("status") == "ACTIV"]
+        return self._index.in_range("loan_date", low, high)
+
+    def _overdue_loans(self, today_day: int) -> List[Dict]:
+        """Imprumuturile active scadente (copii cu zilele de intarziere si penalitatea curenta)"""
+        # Raportul depinde de data curenta, deci ziua face parte din cheia de cache
+        positions = self._cached_query("overdue", [today_day], lambda: [
+            pos for pos, loan in enumerate(self.data["loans"])
+            if loan.get("status") == "ACTIV" and today_day >= loan["return_day"]
+        ])
+        overdue_list = []
+        for pos in positions:
+            loan = self.data["loans"][pos]
+            days = today_day - loan["return_day"]
+            book = self._index.book(loan["book_id"])
+            loan_copy = loan.copy()
+            loan_copy["author"] = book.get("author", "N/A") if book else "N/A"
+            loan_copy["overdue_days"] = days
+            loan_copy["current_penalty"] = days * PENALTY_PER_DAY
+            overdue_list.append(loan_copy)
+        return overdue_list
+
+    def _report_overdue(self) -> None:
+        """Raport cu cartile intarziate"""
+        today = datetime.now().date()
+        print_overdue_report(self._overdue_loans(today.toordinal()), today)
+
+    def _borrowed_loans(self) -> List[Dict]:
+        """Imprumuturile active"""
+        loans = self.data["loans"]
+        positions = self._cached_query("borrowed", [], lambda: [
+            pos for pos, loan in enumerate(loans) if loan.get("status") == "ACTIV"
+        ])
+        return [loans[pos] for pos in positions]
+
+    def _report_borrowed(self) -> None:
+        """Raport cu cartile imprumutate"""
+        print_borrowed_report(self._borrowed_loans())
+
+    def _popular_books(self, top: int = 10) -> List[Dict]:
+        """Cele mai imprumutate carti"""
+        books = self.data["books"]
+        positions = self._cached_query("popular", [top], lambda: sorted(
+            range(len(books)),
+            key=lambda pos: books[pos].get("loan_count", 0),
+            reverse=True
+        )[:top])
+        return [books[pos] for pos in positions]
+
+    def _report_popular(self, top: int = 10) -> None:
+        """Raport cu cartile populare"""
+        print_popular_report(self._popular_books(top), top)
+
+    def _top_active_users(self, top: int = 10) -> List[Dict]:
+        """Utilizatorii activi cu cele mai multe imprumuturi"""
+        users = self.data["users"]
+        # Filtram doar utilizatorii activi (status != INACTIV) cu cel putin 1 imprumut
+        positions = self._cached_query("users", [top], lambda: sorted(
+            (pos for pos, u in enumerate(users)
+             if u.get("status", "ACTIV") != "INACTIV" and u.get("total_loans", 0) > 0),
+            key=lambda pos: users[pos].get("total_loans", 0),
+            reverse=True
+        )[:top])
+        return [users[pos] for pos in positions]
+
+    def _report_active_users(self, top: int = 10) -> None:
+        """Raport cu utilizatorii activi"""
+        print_active_users_report(self._top_active_users(top))
+
+    def _statistics_summary(self, top: int = 5) -> Dict:
+        """Valorile afisate de `stats` (pot fi combinate intre filiale), din cache pentru ziua curenta"""
+        today_day = date.today().toordinal()
+        return self._cached_query("stats", [today_day, top], lambda: self._compute_statistics(today_day, top))
+
+    def _compute_statistics(self, today_day: int, top: int) -> Dict:
+        """Calculeaza statisticile printr-o trecere prin carti, utilizatori si imprumuturi"""
+        books = self.data["books"]
+        users = self.data["users"]
+        loans = self.data["loans"]
+
+        archived = self._archive_totals()
+        overdue_count = 0
+        for loan in loans:
+            if loan.get("status") == "ACTIV" and today_day > loan["return_day"]:
+                overdue_count += 1
+
+        cat_count = {}
+        for b in books:
+            cat = b.get("category", "N/A")
+            cat_count[cat] = cat_count.get(cat, 0) + 1
+
+        returned = [l for l in loans if l.get("status") == "RETURNAT"]
+        sorted_books = sorted(books, key=lambda x: x.get("loan_count", 0), reverse=True)[:top]
+        sorted_users = sorted(users, key=lambda x: x.get("total_loans", 0), reverse=True)[:3]
+
+        return {
+            "total_books": len(books),
+            "available_books": len([b for b in books if b.get("status") == "DISPONIBIL"]),
+            "total_users": len(users),
+            "active_users": len([u for u in users if u.get("active_loans", 0) > 0]),
+            "total_loans": len(loans) + archived["count"],
+            "active_loans": len([l for l in loans if l.get("status") == "ACTIV"]),
+            "overdue_count": overdue_count,
+            "categories": cat_count,
+            "authors": sorted(set(b.get("author", "N/A") for b in books)),
+            "returned_count": len(returned) + archived["count"],
+            "on_time": len([l for l in returned if l.get("penalty", 0) == 0]) + archived["on_time"],
+            "total_penalties": sum(l.get("penalty", 0) for l in returned) + archived["penalties"],
+            "top_books": [[b["title"], b.get("loan_count", 0)] for b in sorted_books],
+            "top_users": [[u["name"], u.get("total_loans", 0)] for u in sorted_users]
+        }
+
+    def show_statistics(self, top: int = 5) -> None:
+        """Afiseaza statistici complete despre biblioteca"""
+        print_statistics(self._statistics_summary(top), top)
+
+    def _trend_rows(self, days: int, window: int, period: str = "day") -> List[Dict]:
+        """Totalurile pe perioade din ultimele `days` zile, cu medii mobile pe `window` perioade.
+
+        Se citesc doar contoarele zilnice din interval (nu istoricul imprumuturilor).
+        """
+        today = date.today()
+        first = _period_start(today - timedelta(days=days - 1), period)
+        # Perioadele anterioare necesare pentru media mobila a primelor randuri
+        start = first
+        for _ in range(window - 1):
+            start = _period_start(start - timedelta(days=1), period)
+
+        totals: Dict[date, Dict] = {}
+        rollups = self.data["rollups"]
+        for ordinal in range(start.toordinal(), today.toordinal() + 1):
+            day = date.fromordinal(ordinal)
+            row = totals.setdefault(_period_start(day, period), dict.fromkeys(ROLLUP_FIELDS, 0))
+            counts = rollups.get(day.strftime(DATE_FORMAT))
+            if counts:
+                for field in ROLLUP_FIELDS:
+                    row[field] += counts.get(field, 0)
+
+        periods = list(totals.items())
+        rows = []
+        for i, (key, row) in enumerate(periods):
+            if key < first:
+                continue
+            recent = [r for _, r in periods[max(0, i - window + 1):i + 1]]
+            rows.append(dict(row,
+                             period=key.strftime("%Y-%m" if period == "month" else DATE_FORMAT),
+                             avg_loans=sum(r["loans"] for r in recent) / len(recent),
+                             avg_penalties=sum(r["penalties"] for r in recent) / len(recent)))
+        return rows
+
+    def show_trends(self, days: int = 30, window: int = 7, period: str = "day") -> None:
+        """Afiseaza evolutia circulatiei pe perioade (raportul `trends`)"""
+        if days < 1 or window < 1:
+            print("EROARE! Numarul de zile si fereastra trebuie sa fie pozitive!")
+            return
+        print_trends_report(self._trend_rows(days, window, period), days, window, period)
+
+    def rebuild_rollups(self) -> None:
+        """Reconstruieste contoarele zilnice din istoricul imprumuturilor (inclusiv arhiva)"""
+        self.data["rollups"] = self._scan_loans()[3]
+        self._mark_dirty("rollups")
+        self._save_data()
+        print(f"\n Contoare zilnice reconstruite: {len(self.data['rollups'])} zile cu activitate.\n")
+
+    # Verificarea integritatii si reconcilierea intre doua fisiere de date
+
+    def _scan_loans(self) -> tuple:
+        """O singura trecere prin imprumuturi (inclusiv arhiva).
+
+        Returneaza contoarele recalculate ale cartilor si utilizatorilor,
+        problemele gasite (ID-uri duplicate, referinte lipsa, carti imprumutate
+        de doua ori) si contoarele zilnice de circulatie.
+        """
+        books = {b.get("id"): {"status": "DISPONIBIL", "loan_count": 0} for b in self.data["books"]}
+        users = {str(u.get("id")): dict.fromkeys(DERIVED_FIELDS["users"], 0) for u in self.data["users"]}
+        problems: List[str] = []
+        rollups: Dict[str, Dict] = {}
+        seen_ids = set()
+        active_by_book: Dict[int, int] = {}
+        for source in (self._iter_archived_loans(), self.data["loans"]):
+            for loan in source:
+                _rollup_loan(rollups, loan)
+                loan_id, book_id = loan.get("id"), loan.get("book_id")
+                if loan_id in seen_ids:
+                    problems.append(f"Imprumutul {loan_id}: ID duplicat")
+                seen_ids.add(loan_id)
+                active = loan.get("status") == "ACTIV"
+                if active:
+                    if book_id in active_by_book:
+                        problems.append(f"Cartea {book_id}: imprumutata simultan "
+                                        f"(imprumuturile {active_by_book[book_id]} si {loan_id})")
+                    active_by_book[book_id] = loan_id
+                book = books.get(book_id)
+                if book is not None:
+                    book["loan_count"] += 1
+                    if active:
+                        book["status"] = "IMPRUMUTAT"
+                elif active:
+                    # Imprumuturile returnate pot ramane dupa stergerea cartii (istoric)
+                    problems.append(f"Imprumutul {loan_id}: cartea {book_id} nu exista")
+                user = users.get(str(loan.get("user_id")))
+                if user is None:
+                    problems.append(f"Imprumutul {loan_id}: utilizatorul {loan.get('user_id')} nu exista")
+                else:
+                    user["total_loans"] += 1
+                    if active:
+                        user["active_loans"] += 1
+                    elif loan.get("status") == "RETURNAT":
+                        user["returned_loans"] += 1
+                        user["total_penalties"] += loan.get("penalty", 0)
+                        if loan.get("penalty", 0) == 0:
+                            user["on_time_returns"] += 1
+        # O carte returnata care asteapta ridicarea unei rezervari ramane REZERVAT
+        for book_id, hold_id in self.data["hold_queues"]["assigned"].items():
+            book = books.get(int(book_id))
+            if book is not None and book["status"] == "DISPONIBIL":
+                book["status"] = "REZERVAT"
+        return books, users, problems, rollups
+
+    def check_integrity(self, repair: bool = False) -> Dict:
+        """Verifica contoarele denormalizate, referintele si duplicatele (cu reparare optionala)"""
+        started = time.perf_counter()
+        books, users, problems, rollups = self._scan_loans()
+
+        for collection, label in (("books", "Cartea"), ("users", "Utilizatorul")):
+            seen = set()
+            for record in self.data[collection]:
+                if record.get("id") in seen:
+                    problems.append(f"{label} {record.get('id')}: ID duplicat")
+                seen.add(record.get("id"))
+        isbns: Dict[str, List] = {}
+        for book in self.data["books"]:
+            if book.get("isbn") and book.get("isbn") != "N/A":
+                isbns.setdefault(book["isbn"], []).append(book.get("id"))
+        for isbn, ids in isbns.items():
+            if len(ids) > 1:
+                problems.append(f"ISBN {isbn}: folosit de cartile {', '.join(str(i) for i in ids)}")
+
+        mismatches: List[str] = []
+        for collection, label, expected in (("books", "Cartea", books), ("users", "Utilizatorul", users)):
+            for record in self.data[collection]:
+                key = record.get("id") if collection == "books" else str(record.get("id"))
+                for field, value in expected.get(key, {}).items():
+                    if record.get(field) != value:
+                        mismatches.append(f"{label} {key}: {field} = {record.get(field)} (corect: {value})")
+        stale_days = sorted(day for day in set(rollups) | set(self.data["rollups"])
+                            if rollups.get(day) != self.data["rollups"].get(day))
+        for day in stale_days:
+            mismatches.append(f"Rollup {day}: {self.data['rollups'].get(day)} (corect: {rollups.get(day)})")
+
+        repaired = 0
+        if repair and mismatches:
+            repaired = self._apply_counters((books, users))
+            if stale_days:
+                self.data["rollups"] = rollups
+                self._mark_dirty("rollups")
+                repaired += len(stale_days)
+            self._save_data()
+
+        print_check_report(mismatches, problems, repaired, time.perf_counter() - started)
+        return {"counters": mismatches, "problems": problems, "repaired": repaired}
+
+    def _apply_counters(self, expected: tuple) -> int:
+        """Scrie contoarele recalculate; returneaza numarul de inregistrari corectate"""
+        fixed = 0
+        for collection, counters in zip(("books", "users"), expected):
+            for record in self.data[collection]:
+                key = record.get("id") if collection == "books" else str(record.get("id"))
+                values = counters.get(key)
+                if values and any(record.get(field) != value for field, value in values.items()):
+                    record.update(values)
+                    self._record_change("update", collection, record)
+                    fixed += 1
+        return fixed
+
+    def _read_other(self, path: str) -> Optional[DataFileStream]:
+        """Deschide un alt fisier de date pentru citire incrementala (fara fisiere auxiliare)"""
+        if not os.path.exists(path):
+            print(f"EROARE! Fisierul '{path}' nu exista!")
+            return None
+        try:
+            return DataFileStream(path)
+        except ValueError as e:
+            print(f"EROARE! Fisierul '{path}' nu este un fisier de date valid: {e}")
+            return None
+
+    def diff_file(self, other_file: str) -> Optional[Dict]:
+        """Compara datele curente cu alt fisier de date, inregistrare cu inregistrare"""
+        other = self._read_other(other_file)
+        if other is None:
+            return None
+        result = {}
+        for collection in ("books", "users", "loans"):
+            ours, theirs, _ = diff_buckets(self.data[collection], lambda: other.records(collection),
+                                           collection, self.codec)
+            changes = {"added": [], "removed": [], "changed": []}
+            for record_id, o, t in changed_records(ours, theirs):
+                changes["added" if o is None else "removed" if t is None else "changed"].append(record_id)
+            result[collection] = {kind: sorted(ids, key=str) for kind, ids in changes.items()}
+        print_diff(result, self.data_file, other_file)
+        return result
+
+    def merge_file(self, other_file: str, base_file: str = None) -> Optional[Dict]:
+        """Aplica modificarile din alt fisier de date.
+
+        Cu `base_file` (copia comuna initiala) reconcilierea este in trei directii:
+        se preia orice inregistrare modificata doar in cealalta copie. Fara baza
+        se preiau doar inregistrarile noi, iar diferentele sunt raportate ca
+        conflicte. Contoarele cartilor si utilizatorilor sunt recalculate la final.
+        """
+        other = self._read_other(other_file)
+        base = self._read_other(base_file) if base_file else None
+        if other is None or (base_file and base is None):
+            return None
+
+        applied = {c: {"insert": 0, "update": 0, "delete": 0} for c in ("books", "users", "loans")}
+        conflicts: List[str] = []
+        labels = {"books": "Cartea", "users": "Utilizatorul", "loans": "Imprumutul"}
+        book_remap: Dict[int, int] = {}
+        next_ids: Dict[str, int] = {}
+
+        for collection in ("books", "users", "loans"):
+            def theirs_records(collection=collection):
+                records = other.records(collection)
+                if collection == "loans" and book_remap:
+                    records = (dict(l, book_id=book_remap[l["book_id"]]) if l.get("book_id") in book_remap
+                               else l for l in records)
+                return records
+
+            # Celelalte fisiere sunt citite incremental: sumarele grupelor, apoi doar grupele diferite
+            ours, theirs, wanted = diff_buckets(self.data[collection], theirs_records, collection, self.codec)
+            base_buckets = record_buckets(base.records(collection), collection, self.codec,
+                                          wanted)[1] if base else None
+            if collection == "books":
+                next_ids["books"] = max(max((b.get("id", 0) for b in self.data["books"]), default=0),
+                                        other.max_ids.get("books", 0)) + 1
+            elif collection == "loans":
+                next_ids["loans"] = max(self._generate_loan_id(), other.max_ids.get("loans", 0) + 1)
+            label = labels[collection]
+            natural = None
+
+            operations = []
+            for record_id, o, t in changed_records(ours, theirs):
+                b = base_buckets[hash(record_id) % DIFF_BUCKETS].get(record_id) if base else None
+                b_hash = b[0] if b else None
+                if t is None:
+                    # Imprumuturile lipsa din cealalta copie au fost doar arhivate acolo
+                    if base and b_hash == o[0] and collection == "books":
+                        operations.append(("delete", o[1]))
+                elif o is None:
+                    if b_hash is None:
+                        operations.append(("insert", t[1]))
+                    elif b_hash != t[0]:
+                        conflicts.append(f"{label} {record_id}: stearsa aici, modificata in cealalta copie")
+                elif base and b_hash == o[0]:
+                    operations.append(("update", (o[1], t[1])))
+                elif base and b_hash == t[0]:
+                    continue
+                elif base and b_hash is None and collection != "users":
+                    # Adaugate independent in ambele copii cu acelasi ID: primesc un ID nou,
+                    # cu exceptia celor deja preluate la o reconciliere anterioara
+                    fields = NATURAL_KEYS[collection]
+                    if natural is None:
+                        natural = {tuple(r.get(f) for f in fields): r.get("id") for r in self.data[collection]}
+                    existing = natural.get(tuple(t[1].get(f) for f in fields))
+                    if existing is not None:
+                        if collection == "books":
+                            book_remap[record_id] = existing
+                        continue
+                    new_id = next_ids[collection]
+                    next_ids[collection] += 1
+                    if collection == "books":
+                        book_remap[record_id] = new_id
+                    operations.append(("insert", dict(t[1], id=new_id)))
+                else:
+                    conflicts.append(f"{label} {record_id}: modificat diferit in cele doua copii")
+
+            if collection == "loans":
+                operations = self._check_merged_loans(operations, conflicts)
+
+            deleted = set()
+            for op, payload in operations:
+                if op == "insert":
+                    record = dict(payload)
+                    self.data[collection].append(record)
+                elif op == "update":
+                    record, new = payload
+                    record.clear()
+                    record.update(new)
+                else:
+                    record = payload
+                    if self._index.active_loan(record.get("id")):
+                        conflicts.append(f"Cartea {record.get('id')}: stearsa in cealalta copie, dar imprumutata aici")
+                        continue
+                    deleted.add(id(record))
+                self._record_change(op, collection, record)
+                applied[collection][op] += 1
+            if deleted:
+                self.data[collection] = [r for r in self.data[collection] if id(r) not in deleted]
+
+        if isinstance(self._index, MappedIndex):
+            self._index.close()
+        self._index = LibraryIndex(self.data)
+        books, users, _, rollups = self._scan_loans()
+        self._apply_counters((books, users))
+        self.data["rollups"] = rollups
+        self._mark_dirty("rollups")
+        self._invalidate_coborrow()
+        self._save_data()
+        print_merge(applied, conflicts, other_file)
+        return {"applied": applied, "conflicts": conflicts}
+
+    def _check_merged_loans(self, operations: List[tuple], conflicts: List[str]) -> List[tuple]:
+        """Respinge imprumuturile fara carte/utilizator sau pentru carti deja imprumutate aici"""
+        book_ids = {b.get("id") for b in self.data["books"]}
+        user_ids = {str(u.get("id")) for u in self.data["users"]}
+        active = {l.get("book_id"): l.get("id") for l in self.data["loans"] if l.get("status") == "ACTIV"}
+        accepted = []
+        for op, payload in operations:
+            loan = payload[1] if op == "update" else payload
+            if loan.get("book_id") not in book_ids or str(loan.get("user_id")) not in user_ids:
+                conflicts.append(f"Imprumutul {loan.get('id')}: cartea sau utilizatorul nu exista aici")
+                continue
+            if loan.get("status") == "ACTIV" and active.get(loan.get("book_id"), loan.get("id")) != loan.get("id"):
+                conflicts.append(f"Imprumutul {loan.get('id')}: cartea '{loan.get('book_title')}' "
+                                 f"este imprumutata in ambele copii")
+                continue
+            if loan.get("status") == "ACTIV":
+                active[loan.get("book_id")] = loan.get("id")
+            elif active.get(loan.get("book_id")) == loan.get("id"):
+                del active[loan.get("book_id")]
+            accepted.append((op, payload))
+        return accepted
+
+    # Import/Export
+
+    def export_data(self, destination: str) -> None:
+        """Exporta datele in format CSV (folder complet sau fisier unic)"""
+        import csv
+        
+        # Cazul 1: Export intr-un singur fisier
+        if destination.lower().endswith(".csv"):
+            book_fieldnames = BOOK_FIELDS
+            
+            try:
+                # Verificam daca exista folderul parinte, daca e data o cale
+                parent_dir = os.path.dirname(destination)
+                if parent_dir and not os.path.exists(parent_dir):
+                    os.makedirs(parent_dir, exist_ok=True)
+
+                with open(destination, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.DictWriter(f, fieldnames=book_fieldnames, extrasaction='ignore')
+                    writer.writeheader()
+                    if self.data["books"]:
+                        writer.writerows(self.data["books"])
+                
+                print(f"\nExportat catalogul de carti ({len(self.data['books'])} carti) in '{destination}'")
+                return
+            except Exception as e:
+                print(f"EROARE la exportul in fisier: {e}")
+                return
+
+        # Cazul 2: Export complet intr-un folder
+        folder = destination
+        os.makedirs(folder, exist_ok=True)
+
+        print("\nExport in desfasurare (Backup complet)...")
+
+        active = [l for l in self.data["loans"] if l.get("status") == "ACTIV"]
+
+        # Export catalog carti
+        books_file = os.path.join(folder, "library_catalog.csv")
+        book_fieldnames = BOOK_FIELDS
+        with open(books_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=book_fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            if self.data["books"]:
+                writer.writerows(self.data["books"])
+
+        # Export utilizatori
+        users_file = os.path.join(folder, "users.csv")
+        user_fieldnames = USER_FIELDS
+        with open(users_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=user_fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            if self.data["users"]:
+                writer.writerows(self.data["users"])
+
+        # Export imprumuturi active
+        active_loans_file = os.path.join(folder, "active_loans.csv")
+        loan_fieldnames = LOAN_FIELDS
+        with open(active_loans_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=loan_fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            if active:
+                writer.writerows(active)
+
+        # Export istoric complet (arhiva este citita partitie cu partitie)
+        history_file = os.path.join(folder, "user_history.csv")
+        with open(history_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=loan_fieldnames + ['actual_return_date', 'penalty'], extrasaction='ignore')
+            writer.writeheader()
+            for month in sorted(self._load_archive_index()["partitions"]):
+                writer.writerows(self._read_archive_partition(month))
+            if self.data["loans"]:
+                writer.writerows(self.data["loans"])
+
+        print(f"\nExportat {len(self.data['books'])} carti")
+        print(f"Exportat {len(self.data['users'])} utilizatori")
+        print(f"Exportat {len(active)} imprumuturi active")
+
+        print(f"\nFisiere generate in '{folder}/':")
+        print("  • library_catalog.csv (catalog complet)")
+        print("  • users.csv (lista utilizatori)")
+        print("  • active_loans.csv (imprumuturi active)")
+        print("  • user_history.csv (istoric complet)")
+        print("\nExport complet.")
+
+    def export_changes(self, folder: str, since) -> None:
+        """Export incremental: doar inregistrarile modificate dupa watermark-ul dat"""
+        import csv
+        watermark_file = os.path.join(folder, WATERMARK_FILE)
+        if since == "last":
+            since = 0
+            if os.path.exists(watermark_file):
+                since = self._read_json(watermark_file).get("seq", 0)
+        try:
+            since = int(since)
+        except ValueError:
+            print(f"EROARE! Watermark invalid: '{since}' (folositi un numar sau 'last')")
+            return
+
+        # Evenimentele amanate (group commit) trebuie sa fie in jurnal inainte de citire
+        self.flush()
+        current = self.data["meta"].get("change_seq", 0)
+        if since > current:
+            print(f"EROARE! Watermark-ul {since} este mai mare decat ultima schimbare ({current}).")
+            return
+
+        # Ultimul eveniment pentru fiecare inregistrare (memoria creste doar cu activitatea)
+        latest: Dict[str, Dict] = {"books": {}, "users": {}, "loans": {}}
+        first_seq = None
+        for event in self.changes_since(since):
+            if first_seq is None:
+                first_seq = event["seq"]
+            rows = latest.get(event["collection"])
+            if rows is None:
+                # Rezervarile nu fac parte din exportul CSV (nici din cel complet)
+                continue
+            rows.pop(event["id"], None)
+            rows[event["id"]] = event
+        if first_seq is not None and first_seq > since + 1:
+            print(f"ATENTIE! Jurnalul incepe la seq {first_seq}; schimbarile anterioare lipsesc "
+                  f"(faceti un export complet).")
+
+        os.makedirs(folder, exist_ok=True)
+        fields = {"books": BOOK_FIELDS, "users": USER_FIELDS,
+                  "loans": LOAN_FIELDS + ['actual_return_date', 'penalty']}
+        for collection, events in latest.items():
+            with open(os.path.join(folder, f"changes_{collection}.csv"), 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=['seq', 'op'] + fields[collection], extrasaction='ignore')
+                writer.writeheader()
+                for event in events.values():
+                    row = dict(event["row"] or {"id": event["id"]})
+                    row.update(seq=event["seq"], op=event["op"])
+                    writer.writerow(row)
+        self._write_json(watermark_file, {"seq": current})
+
+        if since == current:
+            print("\nExport incremental: nicio schimbare noua.")
+        else:
+            print(f"\nExport incremental: schimbarile {since + 1}..{current}")
+        for collection, events in latest.items():
+            print(f"  • changes_{collection}.csv ({len(events)} inregistrari)")
+        print(f"Watermark nou: {current} (salvat in '{watermark_file}')\n")
+
+    def _notice_targets(self, today_day: int, after: tuple):
+        """Imprumuturile active scadente pana azi, in ordinea (zi scadenta, ID), dupa cursorul dat.
+
+        Indexul pastreaza imprumuturile active ordonate dupa scadenta: parcurgerea porneste de la
+        cursor si se opreste la ziua curenta, fara lista intermediara (cele returnate nu sunt citite).
+        """
+        return self._index.due_loans(today_day, after)
+
+    def notify(self, spool: str = None, batch_size: int = NOTIFY_BATCH) -> None:
+        """Scrie notificarile zilei (reminder la scadenta, penalitate la intarziere) in fisiere NDJSON.
+
+        Watermark-ul din outbox retine ultimul imprumut notificat in ziua curenta,
+        deci o rulare repetata (sau reluata dupa o intrerupere) nu dubleaza notificarile.
+        """
+        if batch_size < 1:
+            print("EROARE! Dimensiunea unui lot trebuie sa fie pozitiva!")
+            return
+        spool = spool or os.path.splitext(self.data_file)[0] + "_outbox"
+        os.makedirs(spool, exist_ok=True)
+        watermark_file = os.path.join(spool, WATERMARK_FILE)
+        today = date.today()
+        today_day = today.toordinal()
+        day = today.strftime(DATE_FORMAT)
+
+        mark = {"day": day, "return_day": None, "loan_id": 0, "batches": 0, "sent": 0}
+        if os.path.exists(watermark_file):
+            try:
+                stored = self._read_json(watermark_file)
+            except self.codec.decode_errors:
+                stored = {}
+            if stored.get("day") == day:
+                mark.update(stored)
+        resumed = mark["sent"]
+
+        counts = {"reminder": 0, "penalty": 0}
+        lines: List[bytes] = []
+        last = None
+
+        def flush() -> None:
+            # Fisierul lotului este complet inainte de a fi vizibil; apoi avanseaza watermark-ul
+            mark["batches"] += 1
+            path = os.path.join(spool, f"notices-{today:%Y%m%d}-{mark['batches']:04d}.ndjson")
+            with open(path + ".tmp", 'wb') as f:
+                f.write(b"".join(lines))
+            os.replace(path + ".tmp", path)
+            mark["return_day"], mark["loan_id"] = last
+            mark["sent"] += len(lines)
+            self._write_json(watermark_file, mark)
+            lines.clear()
+
+        for loan in self._notice_targets(today_day, (mark["return_day"] or 0, mark["loan_id"])):
+            overdue_days = today_day - loan["return_day"]
+            user = self._index.user(loan["user_id"]) or {}
+            kind = "reminder" if overdue_days == 0 else "penalty"
+            notice = {
+                "type": kind,
+                "day": day,
+                "loan_id": loan["id"],
+                "book_id": loan["book_id"],
+                "book_title": loan["book_title"],
+                "user_id": loan["user_id"],
+                "user_name": loan["user_name"],
+                "email": user.get("email"),
+                "due_date": loan["return_date"],
+                "overdue_days": overdue_days,
+                "penalty": overdue_days * PENALTY_PER_DAY
+            }
+            lines.append(self.codec.dumps(notice, True) + b"\n")
+            counts[kind] += 1
+            last = (loan["return_day"], loan["id"])
+            if len(lines) >= batch_size:
+                flush()
+        if lines:
+            flush()
+
+        created = counts["reminder"] + counts["penalty"]
+        print(f"\n Notificari generate pentru {day}: {created} "
+              f"(reminder: {counts['reminder']}, penalitate: {counts['penalty']})")
+        if resumed:
+            print(f"   Deja generate anterior azi: {resumed} (nu au fost dublate)")
+        print(f"   Outbox: '{spool}' ({mark['batches']} fisiere azi)\n")
+
+    # Backup incremental (depozit de blocuri adresate prin continut)
+
+    def _store_chunk(self, folder: str, blob: bytes) -> tuple:
+        """Scrie un bloc in depozit daca nu exista deja; returneaza (hash, octeti scrisi)"""
+        digest = _content_hash(blob)
+        path = os.path.join(folder, "chunks", digest[:2], digest)
+        if os.path.exists(path):
+            return digest, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", 'wb') as f:
+            f.write(blob)
+        os.replace(path + ".tmp", path)
+        return digest, len(blob)
+
+    def _load_chunk(self, folder: str, digest: str) -> bytes:
+        """Citeste un bloc din depozit si verifica amprenta"""
+        with open(os.path.join(folder, "chunks", digest[:2], digest), 'rb') as f:
+            blob = f.read()
+        if _content_hash(blob) != digest:
+            raise ValueError(f"blocul {digest} este corupt")
+        return blob
+
+    def backup(self, folder: str) -> None:
+        """Creeaza un snapshot; se scriu doar blocurile care nu exista deja in depozit"""
+        started = time.perf_counter()
+        manifest = {
+            "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "source": os.path.abspath(self.data_file),
+            "meta": self.data["meta"],
+            "collections": {},
+            "archive": {}
+        }
+        total, new, written = 0, 0, 0
+
+        for collection in ("books", "users", "loans", "holds"):
+            hashes = manifest["collections"][collection] = []
+            for chunk in _record_chunks(self.data[collection]):
+                digest, size = self._store_chunk(folder, self.codec.dumps(chunk, True))
+                hashes.append(digest)
+                total += 1
+                new += 1 if size else 0
+                written += size
+
+        # Partitiile arhivei sunt copiate ca blocuri intregi (se schimba rar)
+        archive_files = [ARCHIVE_INDEX_FILE] + [p["file"] for p in self._load_archive_index()["partitions"].values()]
+        for name in archive_files:
+            path = os.path.join(self.archive_dir, name)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    digest, size = self._store_chunk(folder, f.read())
+                manifest["archive"][name] = digest
+                total += 1
+                new += 1 if size else 0
+                written += size
+
+        snapshots = os.path.join(folder, "snapshots")
+        os.makedirs(snapshots, exist_ok=True)
+        name = datetime.now().strftime("%Y%m%d-%H%M%S")
+        suffix = 1
+        while os.path.exists(os.path.join(snapshots, name + ".json")):
+            suffix += 1
+            name = datetime.now().strftime("%Y%m%d-%H%M%S") + f"-{suffix}"
+        self._write_json(os.path.join(snapshots, name + ".json"), manifest)
+
+        print(f"\n Snapshot '{name}' creat in '{folder}'.")
+        print(f"   Blocuri: {total} total, {new} noi ({written / 1024:.1f} KB scrisi)")
+        print(f"   Durata: {time.perf_counter() - started:.2f} s\n")
+
+    def restore(self, folder: str, snapshot: str = None, force: bool = False) -> None:
+        """Reconstruieste fisierul de date dintr-un snapshot (implicit cel mai recent)"""
+        import shutil
+        snapshots = list_snapshots(folder)
+        if not snapshots:
+            print(f"EROARE! Nu exista snapshot-uri in '{folder}'.")
+            return
+        name = snapshot or snapshots[-1]
+        if name not in snapshots:
+            print(f"EROARE! Snapshot-ul '{name}' nu exista.")
+            print(f"Disponibile: {', '.join(snapshots)}")
+            return
+        if not force and any(self.data[key] for key in ("books", "users", "loans")):
+            print(f"EROARE! Fisierul '{self.data_file}' contine deja date. Folositi --force pentru a-l suprascrie.")
+            return
+
+        manifest = self._read_json(os.path.join(folder, "snapshots", name + ".json"))
+        try:
+            restored = {collection: [] for collection in ("books", "users", "loans", "holds")}
+            for collection, hashes in manifest["collections"].items():
+                for digest in hashes:
+                    restored[collection].extend(self.codec.loads(self._load_chunk(folder, digest)))
+            archive = {file: self._load_chunk(folder, digest) for file, digest in manifest["archive"].items()}
+        except (OSError, ValueError) as e:
+            print(f"EROARE! Snapshot-ul '{name}' nu poate fi restaurat: {e}")
+            return
+        # Evenimentele amanate (group commit) ajung in jurnal inainte ca acesta sa fie trunchiat
+        self.flush()
+
+        version = max(self.data["meta"].get("version", 0), manifest["meta"].get("version", 0)) + 1
+        if isinstance(self._index, MappedIndex):
+            self._index.close()
+        self.data.update(restored)
+        self.data["meta"] = dict(manifest["meta"], version=version)
+        self._index = LibraryIndex(self.data)
+
+        shutil.rmtree(self.archive_dir, ignore_errors=True)
+        self._archive_index = None
+        if archive:
+            os.makedirs(self.archive_dir, exist_ok=True)
+            for file, blob in archive.items():
+                with open(os.path.join(self.archive_dir, file), 'wb') as f:
+                    f.write(blob)
+
+        # Evenimentele de dupa snapshot nu mai descriu datele restaurate
+        self._truncate_changes(self.data["meta"].get("change_seq", 0))
+        self._rebuild_hold_queues()
+        self.data["rollups"] = self._scan_loans()[3]
+        self._invalidate_coborrow()
+        for collection in ("books", "users", "loans", "holds", "hold_queues", "rollups", "meta"):
+            self._mark_dirty(collection, bump_version=False)
+        self.flush()
+
+        print(f"\n Snapshot-ul '{name}' a fost restaurat in '{self.data_file}'.")
+        print(f"   {len(self.data['books'])} carti, {len(self.data['users'])} utilizatori, "
+              f"{len(self.data['loans'])} imprumuturi\n")
+
+    def _parse_book_files(self, files: List[str], workers: int, split_bytes: int) -> List[tuple]:
+        """Parseaza fisierele pe intervale, in paralel; rezultatele raman in ordinea fisierelor"""
+        parts = _import_parts(files, split_bytes)
+        if workers > 1 and len(parts) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=min(len(parts), workers)) as pool:
+                results = list(pool.map(_parse_book_part, parts))
+        else:
+            results = [_parse_book_part(part) for part in parts]
+
+        parsed, first, quotes = [], 0, 0
+        for (path, start, _), result in zip(parts, results):
+            if start == 0:
+                first, quotes = len(parsed), 0
+            elif quotes is None:
+                continue
+            elif quotes:
+                # Taietura a cazut intr-un camp intre ghilimele (cu linii noi): fisierul este reparsat intreg
+                del parsed[first:]
+                parsed.append(_parse_book_part((path, 0, os.path.getsize(path))))
+                quotes = None
+                continue
+            parsed.append(result)
+            quotes ^= result[2]
+        return parsed
+
+    def import_data(self, *filenames: str, workers: Optional[int] = None,
+                    split_bytes: int = IMPORT_SPLIT_BYTES) -> None:
+        """Importa carti din unul sau mai multe fisiere CSV (sau foldere cu fisiere CSV).
+
+        Fisierele sunt parsate si validate in paralel; deduplicarea dupa ISBN si alocarea
+        ID-urilor se fac la final, in ordinea fisierelor, deci rezultatul este acelasi ca
+        la un import secvential.
+        """
+        files = _import_files(list(filenames))
+        for filename in files:
+            if not os.path.exists(filename):
+                print(f"EROARE! Fisierul '{filename}' nu exista!")
+                return
+        if not files:
+            print("EROARE! Nu exista fisiere CSV de importat!")
+            return
+
+        print(f"\nImport din {', '.join(files) if len(files) <= 3 else f'{len(files)} fisiere'}...")
+
+        imported = 0
+        ignored = 0
+
+        try:
+            results = self._parse_book_files(files, workers or os.cpu_count() or 1, split_bytes)
+            next_id = self._generate_book_id()
+            today = datetime.now().strftime(DATE_FORMAT)
+            seen = set()
+            for rows, invalid, _ in results:
+                ignored += invalid
+                for isbn, title, author, category, year in rows:
+                    if isbn and isbn != 'N/A':
+                        if isbn in seen or self._index.books_with_isbn(isbn):
+                            ignored += 1
+                            continue
+                        seen.add(isbn)
+
+                    book = {
+                        "id": next_id,
+                        "title": title,
+                        "author": sys.intern(author),
+                        "isbn": isbn if isbn else "N/A",
+                        # O categorie goala in CSV ramane goala (doar coloana lipsa devine 'Necategorizat')
+                        "category": sys.intern(category) if category else category,
+                        "year": year,
+                        "status": "DISPONIBIL",
+                        "date_added": today,
+                        "loan_count": 0
+                    }
+                    next_id += 1
+                    self.data["books"].append(book)
+                    self._index.add_book(book)
+                    self._record_change("insert", "books", book)
+                    imported += 1
+
+            self._save_data()
+            print(f" Importat {imported} carti noi!")
+            if ignored > 0:
+                print(f" {ignored} inregistrari ignorate (duplicate sau invalide).")
+            print("")
+
+        except Exception as e:
+            print(f"EROARE! Eroare la import: {e}")
+
+    def _finish_bulk_import(self, loans: bool = False) -> None:
+        """Dupa un import in masa: index reconstruit, contoare recalculate o data, o singura salvare"""
+        if isinstance(self._index, MappedIndex):
+            self._index.close()
+        self._index = LibraryIndex(self.data)
+        books, users, _, rollups = self._scan_loans()
+        self._apply_counters((books, users))
+        if rollups != self.data["rollups"]:
+            self.data["rollups"] = rollups
+            self._mark_dirty("rollups")
+        if loans:
+            self._invalidate_coborrow()
+        self._save_data()
+
+    def import_users(self, filename: str) -> None:
+        """Importa utilizatori din CSV (format users.csv din export), validati pe loturi"""
+        import csv
+        if not os.path.exists(filename):
+            print(f"EROARE! Fisierul '{filename}' nu exista!")
+            return
+        print(f"\nImport utilizatori din {filename}...")
+
+        known = {str(user.get("id")) for user in self.data["users"]}
+        today = datetime.now().strftime(DATE_FORMAT)
+        imported, errors = 0, []
+        with open(filename, 'r', encoding='utf-8', newline='') as f:
+            for chunk in _csv_chunks(csv.DictReader(f)):
+                for line, row in chunk:
+                    user_id = _csv_value(row, "id", "user_id")
+                    name = _csv_value(row, "name", "nume")
+                    email = _csv_value(row, "email")
+                    registered = _csv_value(row, "registration_date", "data_inregistrare")
+                    if not user_id or not name:
+                        errors.append(f"Linia {line}: lipseste ID-ul sau numele")
+                        continue
+                    if user_id in known:
+                        errors.append(f"Linia {line}: utilizatorul {user_id} exista deja")
+                        continue
+                    if email and email != "N/A" and "@" not in email:
+                        errors.append(f"Linia {line}: email invalid '{email}'")
+                        continue
+                    try:
+                        registered = _ordinal_date(_date_ordinal(registered)) if registered else today
+                    except ValueError:
+                        errors.append(f"Linia {line}: data invalida '{registered}'")
+                        continue
+                    user = {
+                        "id": user_id,
+                        "name": name,
+                        "email": email or "N/A",
+                        "registration_date": registered,
+                        "active_loans": 0,
+                        "total_loans": 0,
+                        "total_penalties": 0,
+                        "returned_loans": 0,
+                        "on_time_returns": 0,
+                        "status": "INACTIV" if _csv_value(row, "status").upper() == "INACTIV" else "ACTIV"
+                    }
+                    known.add(user_id)
+                    self.data["users"].append(user)
+                    self._record_change("insert", "users", user)
+                    imported += 1
+
+        if imported:
+            self._finish_bulk_import()
+        print_import_summary(imported, "utilizatori noi", errors)
+
+    def import_loans(self, filename: str) -> None:
+        """Importa istoricul de imprumuturi din CSV (format user_history.csv din export).
+
+        Cartile sunt gasite dupa book_id (sau ISBN), utilizatorii dupa user_id, prin
+        index. Un imprumut deja existent (aceeasi carte, utilizator si data) este ignorat.
+        """
+        import csv
+        if not os.path.exists(filename):
+            print(f"EROARE! Fisierul '{filename}' nu exista!")
+            return
+        print(f"\nImport imprumuturi din {filename}...")
+
+        existing = set()
+        for source in (self._iter_archived_loans(), self.data["loans"]):
+            for loan in source:
+                existing.add((loan.get("book_id"), str(loan.get("user_id")), loan.get("loan_date")))
+        # Cartile care nu pot primi un imprumut activ nou
+        busy = {loan.get("book_id") for loan in self.data["loans"] if loan.get("status") == "ACTIV"}
+        busy.update(int(book_id) for book_id in self.data["hold_queues"]["assigned"])
+        next_id = self._generate_loan_id()
+        imported, errors = 0, []
+
+        with open(filename, 'r', encoding='utf-8', newline='') as f:
+            for chunk in _csv_chunks(csv.DictReader(f)):
+                for line, row in chunk:
+                    book_ref = _csv_value(row, "book_id")
+                    book = self._index.book(int(book_ref)) if book_ref.isdigit() else None
+                    if book is None:
+                        isbn = _csv_value(row, "isbn")
+                        matches = self._index.books_with_isbn(isbn) if isbn else []
+                        book = matches[0] if matches else None
+                    user = self._index.user(_csv_value(row, "user_id"))
+                    if book is None or user is None:
+                        errors.append(f"Linia {line}: cartea sau utilizatorul nu exista")
+                        continue
+                    try:
+                        days = {field: _date_ordinal(value) if value else None
+                                for field, value in ((field, (row.get(field) or "").strip()) for field in LOAN_DATE_FIELDS)}
+                    except ValueError:
+                        errors.append(f"Linia {line}: data invalida")
+                        continue
+                    if days["loan_date"] is None or days["return_date"] is None \
+                            or days["return_date"] < days["loan_date"]:
+                        errors.append(f"Linia {line}: datele imprumutului lipsesc sau sunt inversate")
+                        continue
+                    dates = {field: _ordinal_date(day) if day else None for field, day in days.items()}
+                    key = (book["id"], str(user["id"]), dates["loan_date"])
+                    if key in existing:
+                        errors.append(f"Linia {line}: imprumutul exista deja")
+                        continue
+                    returned = days["actual_return_date"] is not None
+                    if not returned and book["id"] in busy:
+                        errors.append(f"Linia {line}: cartea '{book['title']}' este deja imprumutata")
+                        continue
+                    penalty = _csv_value(row, "penalty")
+                    if returned:
+                        late = max(0, days["actual_return_date"] - days["return_date"])
+                        penalty = int(penalty) if penalty.isdigit() else late * PENALTY_PER_DAY
+                    loan = {
+                        "id": next_id,
+                        "book_id": book["id"],
+                        "book_title": book["title"],
+                        "user_id": str(user["id"]),
+                        "user_name": user["name"],
+                        "loan_date": dates["loan_date"],
+                        "return_date": dates["return_date"],
+                        "actual_return_date": dates["actual_return_date"],
+                        "status": "RETURNAT" if returned else "ACTIV",
+                        "penalty": penalty if returned else 0,
+                        "loan_day": days["loan_date"],
+                        "return_day": days["return_date"],
+                        "actual_return_day": days["actual_return_date"]
+                    }
+                    next_id += 1
+                    existing.add(key)
+                    if not returned:
+                        busy.add(book["id"])
+                    self.data["loans"].append(loan)
+                    self._record_change("insert", "loans", loan)
+                    imported += 1
+
+        if imported:
+            self._finish_bulk_import(loans=True)
+        print_import_summary(imported, "imprumuturi noi", errors)
+
+
+def print_import_summary(imported: int, label: str, errors: List[str], limit: int = 5) -> None:
+    """Afiseaza rezultatul unui import in masa (cu primele randuri respinse)"""
+    print(f" Importat {imported} {label}!")
+    if errors:
+        print(f" {len(errors)} inregistrari ignorate (duplicate sau invalide):")
+        for error in errors[:limit]:
+            print(f"   - {error}")
+        if len(errors) > limit:
+            print(f"   ... si inca {len(errors) - limit}")
+    print("")
+
+
+def print_diff(result: Dict, ours: str, theirs: str, limit: int = 10) -> None:
+    """Afiseaza diferentele dintre doua fisiere de date"""
+    names = {"books": "CARTI", "users": "UTILIZATORI", "loans": "IMPRUMUTURI"}
+    print("")
+    print("▀" * 60)
+    print(f"  DIFERENTE: {ours}")
+    print(f"         vs  {theirs}")
+    print("▀" * 60)
+    total = 0
+    for collection, changes in result.items():
+        counts = {kind: len(ids) for kind, ids in changes.items()}
+        total += sum(counts.values())
+        print(f"\n  {names[collection]}: +{counts['added']} adaugate, -{counts['removed']} lipsa, "
+              f"~{counts['changed']} modificate")
+        for kind, sign in (("added", "+"), ("removed", "-"), ("changed", "~")):
+            ids = changes[kind]
+            if ids:
+                more = f" ... (+{len(ids) - limit})" if len(ids) > limit else ""
+                print(f"    {sign} ID: {', '.join(str(i) for i in ids[:limit])}{more}")
+    if total == 0:
+        print("\n  Fisierele contin aceleasi date.")
+    print("▀" * 60)
+    print("")
+
+
+def print_check_report(mismatches: List[str], problems: List[str], repaired: int, elapsed: float,
+                       limit: int = 20) -> None:
+    """Afiseaza rezultatul verificarii integritatii"""
+    print("")
+    print("▀" * 60)
+    print("  VERIFICARE INTEGRITATE DATE")
+    print("▀" * 60)
+    for title, lines in (("CONTOARE GRESITE", mismatches), ("PROBLEME", problems)):
+        if not lines:
+            continue
+        print(f"\n  {title} ({len(lines)}):")
+        for line in lines[:limit]:
+            print(f"    ! {line}")
+        if len(lines) > limit:
+            print(f"    ... si inca {len(lines) - limit}")
+    if not mismatches and not problems:
+        print("\n  [OK] Nu au fost gasite probleme.")
+    if repaired:
+        print(f"\n  Reparat: {repaired} inregistrari cu contoare recalculate din imprumuturi.")
+    elif mismatches:
+        print("\n  Folositi --repair pentru a recalcula contoarele.")
+    if problems:
+        print("  Problemele de mai sus necesita corectare manuala.")
+    print(f"\n  Durata: {elapsed:.2f} s")
+    print("▀" * 60)
+    print("")
+
+
+def print_merge(applied: Dict, conflicts: List[str], theirs: str) -> None:
+    """Afiseaza rezultatul unei reconcilieri"""
+    names = {"books": "Carti", "users": "Utilizatori", "loans": "Imprumuturi"}
+    print("")
+    print("▀" * 60)
+    print(f"  MERGE din {theirs}")
+    print("▀" * 60)
+    for collection, ops in applied.items():
+        print(f"  {names[collection]:<12} adaugate: {ops['insert']:>5}  modificate: {ops['update']:>5}  "
+              f"sterse: {ops['delete']:>5}")
+    if conflicts:
+        print(f"\n  CONFLICTE ({len(conflicts)}, nepreluate):")
+        for conflict in conflicts:
+            print(f"    ! {conflict}")
+    print("▀" * 60)
+    print("")
+
+
+def list_snapshots(folder: str) -> List[str]:
+    """Numele snapshot-urilor dintr-un depozit de backup, cronologic"""
+    snapshots = os.path.join(folder, "snapshots")
+    if not os.path.isdir(snapshots):
+        return []
+    return sorted(name[:-len(".json")] for name in os.listdir(snapshots) if name.endswith(".json"))
+
+
+# Filiale (shard-uri): fiecare filiala are propriul fisier de date
+
+def branch_data_file(branch: Optional[str] = None) -> str:
+    """Fisierul de date al unei filiale (filiala principala foloseste DATA_FILE)"""
+    if not branch or branch == DEFAULT_BRANCH:
+        return DATA_FILE
+    if not all(c.isalnum() or c in "-_" for c in branch):
+        raise ValueError(f"Numele filialei '{branch}' poate contine doar litere, cifre, '-' si '_'")
+    return os.path.join(os.path.dirname(DATA_FILE), BRANCHES_FOLDER, f"{branch}.json")
+
+
+def branch_files() -> Dict[str, str]:
+    """Toate filialele existente, in ordine: principala, apoi alfabetic"""
+    branches = {}
+    if os.path.exists(DATA_FILE):
+        branches[DEFAULT_BRANCH] = DATA_FILE
+    folder = os.path.join(os.path.dirname(DATA_FILE), BRANCHES_FOLDER)
+    if os.path.isdir(folder):
+        for name in sorted(os.listdir(folder)):
+            if name.endswith(".json"):
+                branches[name[:-len(".json")]] = os.path.join(folder, name)
+    return branches
+
+
+def _branch_query(task: tuple):
+    """Ruleaza o interogare pe o singura filiala (executat intr-un proces separat)"""
+    branch, data_file, codec, kind, params = task
+    manager = LibraryManager(data_file, codec=codec, read_only=True)
+
+    def tagged(rows):
+        return [dict(row, branch=branch) for row in rows]
+
+    if kind == "search":
+        results = manager._search_results(*params)
+        return {"rows": [dict(book, branch=branch, expected_return=manager._expected_return(book),
+                              also_borrowed=manager._also_borrowed_titles(book) if pos < ALSO_BORROWED_ROWS else None)
+                         for pos, book in enumerate(results)],
+                "facets": manager.facet_counts(results) if results else {}}
+    if kind == "overdue":
+        return tagged(manager._overdue_loans(params[0]))
+    if kind == "borrowed":
+        return tagged(manager._borrowed_loans())
+    if kind == "range":
+        return tagged(manager._loans_in_range(*params))
+    if kind == "popular":
+        return tagged(manager._popular_books(params[0]))
+    if kind == "ready":
+        return tagged(manager._ready_holds())
+    if kind == "users":
+        return tagged(manager._top_active_users(params[0]))
+    if kind == "stats":
+        return manager._statistics_summary(params[0])
+    if kind == "counts":
+        return {key: len(manager.data[key]) for key in ("books", "users", "loans")}
+    raise ValueError(f"Interogare necunoscuta: {kind}")
+
+
+def run_federated(kind: str, params: list, branches: Dict[str, str], codec: str = None) -> List[tuple]:
+    """Ruleaza interogarea pe toate filialele in paralel; returneaza [(filiala, rezultat)]"""
+    tasks = [(name, path, codec, kind, params) for name, path in branches.items()]
+    if len(tasks) <= 1:
+        results = [_branch_query(task) for task in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=min(len(tasks), os.cpu_count() or 1)) as pool:
+            results = list(pool.map(_branch_query, tasks))
+    return list(zip(branches, results))
+
+
+def merge_statistics(summaries: List[Dict], top: int) -> Dict:
+    """Combina statisticile mai multor filiale"""
+    merged = {key: 0 for key in ("total_books", "available_books", "total_users", "active_users",
+                                 "total_loans", "active_loans", "overdue_count", "returned_count",
+                                 "on_time", "total_penalties")}
+    categories, authors, top_books, top_users = {}, set(), [], []
+    for summary in summaries:
+        for key in merged:
+            merged[key] += summary[key]
+        for cat, count in summary["categories"].items():
+            categories[cat] = categories.get(cat, 0) + count
+        authors.update(summary["authors"])
+        top_books.extend(summary["top_books"])
+        top_users.extend(summary["top_users"])
+    merged["categories"] = categories
+    merged["authors"] = sorted(authors)
+    merged["top_books"] = sorted(top_books, key=lambda x: x[1], reverse=True)[:top]
+    merged["top_users"] = sorted(top_users, key=lambda x: x[1], reverse=True)[:3]
+    return merged
+
+
+def federated_search(query: Optional[str], search_type: str, ranges: Dict, facet: tuple,
+                     branches: Dict[str, str], codec: str = None) -> None:
+    """Cauta in toate filialele si afiseaza rezultatele combinate"""
+    results, totals = [], {}
+    for _, part in run_federated("search", [query, search_type, ranges, facet], branches, codec):
+        results.extend(part["rows"])
+        # Numaratorile pe fatete ale filialelor se aduna
+        for facet_name, pairs in part["facets"].items():
+            counts = totals.setdefault(facet_name, {})
+            for value, count in pairs:
+                counts[value] = counts.get(value, 0) + count
+    facets = {name: sorted(counts.items(), key=lambda pair: (-pair[1], pair[0])) for name, counts in totals.items()}
+    print_search_results(results, search_label(query, search_type, ranges, facet),
+                         lambda book: book.get("expected_return"), facets, lambda book: book.get("also_borrowed"))
+
+
+def federated_report(report_type: str, top: int, branches: Dict[str, str], codec: str = None,
+                     date_range: tuple = None) -> None:
+    """Genereaza un raport global peste toate filialele"""
+    if report_type in ("due", "loaned"):
+        rows = [row for _, part in run_federated("range", [report_type, *date_range], branches, codec)
+                for row in part]
+        field = "return_day" if report_type == "due" else "loan_day"
+        rows.sort(key=lambda loan: loan.get(field) or 0)
+        print_borrowed_report(rows, range_report_title(report_type, date_range))
+    elif report_type == "overdue":
+        today = datetime.now().date()
+        rows = [row for _, part in run_federated("overdue", [today.toordinal()], branches, codec)
+                for row in part]
+        rows.sort(key=lambda loan: loan["overdue_days"], reverse=True)
+        print_overdue_report(rows, today)
+    elif report_type == "borrowed":
+        rows = [row for _, part in run_federated("borrowed", [], branches, codec) for row in part]
+        print_borrowed_report(rows)
+    elif report_type == "popular":
+        rows = [row for _, part in run_federated("popular", [top], branches, codec) for row in part]
+        print_popular_report(sorted(rows, key=lambda b: b.get("loan_count", 0), reverse=True)[:top], top)
+    elif report_type == "users":
+        rows = [row for _, part in run_federated("users", [top], branches, codec) for row in part]
+        print_active_users_report(sorted(rows, key=lambda u: u.get("total_loans", 0), reverse=True)[:top])
+    elif report_type == "ready":
+        rows = [row for _, part in run_federated("ready", [], branches, codec) for row in part]
+        print_ready_holds_report(sorted(rows, key=lambda hold: hold["pickup_day"]))
+    else:
+        print(f"EROARE! Tip raport invalid: {report_type}")
+        print("Tipuri disponibile: overdue, borrowed, popular, users, due, loaned, ready")
+
+
+def federated_statistics(top: int, branches: Dict[str, str], codec: str = None) -> None:
+    """Statistici globale peste toate filialele"""
+    summaries = [summary for _, summary in run_federated("stats", [top], branches, codec)]
+    print_statistics(merge_statistics(summaries, top), top,
+                     title=f"STATISTICI GLOBALE ({len(branches)} filiale)")
+
+
+def list_branches(branches: Dict[str, str], codec: str = None) -> None:
+    """Afiseaza filialele existente si dimensiunea fiecareia"""
+    if not branches:
+        print("\n Nu exista filiale cu date.\n")
+        return
+    print("")
+    print("▀" * 60)
+    print(f"  FILIALE ({len(branches)} total)")
+    print("▀" * 60)
+    print(f"{'Filiala':<20} {'Carti':>10} {'Utilizatori':>12} {'Imprumuturi':>12}")
+    for name, counts in run_federated("counts", [], branches, codec):
+        print(f"{name:<20} {counts['books']:>10} {counts['users']:>12} {counts['loans']:>12}")
+    print("▀" * 60)
+    print("")
+
+
+def search_label(query: Optional[str], search_type: str, ranges: Dict = None, facet: tuple = None) -> str:
+    """Descrierea unei cautari, afisata in antetul rezultatelor"""
+    parts = [f"{search_type}: \"{query}\""] if query else []
+    for field, (low, high) in (ranges or {}).items():
+        if field == "year":
+            bounds = [str(v) if v is not None else "" for v in (low, high)]
+        else:
+            bounds = [date.fromordinal(v).strftime(DATE_FORMAT) if v is not None else "" for v in (low, high)]
+        parts.append(f"{field}: {bounds[0]}..{bounds[1]}")
+    if facet:
+        parts.append(f"{facet[0]} = {facet[1]}")
+    return ", ".join(parts)
+
+
+def parse_facet(value: str) -> tuple:
+    """Transforma 'camp=valoare' intr-un filtru de fateta; ValueError daca e invalid"""
+    facet, sep, facet_value = value.partition("=")
+    if not sep or facet.strip() not in FACETS or not facet_value.strip():
+        raise ValueError(f"Fateta invalida '{value}' (format: camp=valoare, campuri: {', '.join(FACETS)})")
+    return facet.strip(), facet_value.strip()
+
+
+def parse_range(value: str, field: str) -> tuple:
+    """Transforma 'MIN:MAX' (capete optionale) in chei intregi; ValueError daca e invalid"""
+    example = "1990:2000" if field == "year" else "2026-03-01:2026-03-31"
+    error = ValueError(f"Interval invalid '{value}' pentru {field} (format: MIN:MAX, ex: {example})")
+    if ":" not in value:
+        raise error
+    bounds = []
+    for part in value.split(":", 1):
+        part = part.strip()
+        try:
+            if not part:
+                bounds.append(None)
+            elif field == "year":
+                bounds.append(int(part))
+            else:
+                bounds.append(_date_ordinal(part))
+        except ValueError:
+            raise error from None
+    return tuple(bounds)
+
+
+def print_search_results(results: List[Dict], label: str, expected_return, facets: Dict = None,
+                         also_borrowed=None) -> None:
+    """Afiseaza rezultatele unei cautari.
+
+    `expected_return(book)` da data estimata de returnare, iar `also_borrowed(book)`
+    titlurile imprumutate de cititorii aceleiasi carti (primele ALSO_BORROWED_ROWS rezultate).
+    """
+    if not results:
+        print(f"\n Nu s-au gasit carti ({label})\n")
+        return
+
+    print("")
+    print("▀" * 60)
+    print(f"  Rezultate cautare {label}")
+    print("▀" * 60)
+
+    for i, book in enumerate(results, 1):
+        status_icon = "[OK]" if book['status'] == "DISPONIBIL" else "X"
+        popular = " (Popular!)" if book.get('loan_count', 0) > 10 else ""
+
+        print(f"\n{i}. {book['title']}{_branch_label(book)}")
+        print(f"   Autor: {book['author']}")
+        print(f"   ISBN: {book.get('isbn', 'N/A')}")
+        print(f"   Status: {status_icon} {book['status']}")
+
+        if book['status'] == "IMPRUMUTAT":
+            return_date = expected_return(book)
+            if return_date:
+                print(f"   Returnare estimata: {return_date}")
+
+        print(f"   Categorie: {book.get('category', 'N/A')}")
+        if book.get('year'):
+            print(f"   An publicare: {book['year']}")
+        print(f"   Imprumuturi totale: {book.get('loan_count', 0)}{popular}")
+        # Recomandarile sunt calculate doar pentru primele rezultate afisate
+        titles = also_borrowed(book) if also_borrowed and i <= ALSO_BORROWED_ROWS else None
+        if titles:
+            print(f"   Cititorii ei au mai imprumutat: {', '.join(titles)}")
+
+    print(f"\n  Total gasite: {len(results)} carti")
+    if facets:
+        print("░" * 60)
+        print("  Rafinare (--facet camp=valoare):")
+        for facet, pairs in facets.items():
+            shown = ", ".join(f"{value} ({count})" for value, count in pairs[:FACET_TOP])
+            more = f", ... (+{len(pairs) - FACET_TOP})" if len(pairs) > FACET_TOP else ""
+            print(f"    {facet:<9} {shown}{more}")
+    print("▀" * 60)
+    print("")
+
+
+def print_recommendations(book: Dict, recommendations: List[tuple]) -> None:
+    """Afiseaza cartile imprumutate de cititorii unei carti"""
+    print("")
+    print("▀" * 60)
+    print(f"  RECOMANDARI PENTRU \"{book['title']}\"")
+    print("  Cititorii acestei carti au mai imprumutat:")
+    print("▀" * 60)
+
+    if not recommendations:
+        print("\n  Nu exista inca recomandari pentru aceasta carte.\n")
+        print("▀" * 60)
+        print("")
+        return
+
+    for i, (other, count) in enumerate(recommendations, 1):
+        print(f"  {i}. {other['title']} - {other['author']} [{other.get('status', 'N/A')}] "
+              f"({count} cititori comuni)")
+    print("▀" * 60)
+    print("")
+
+
+def _branch_label(row: Dict) -> str:
+    """Sufixul cu filiala pentru randurile din rapoartele combinate"""
+    return f" [{row['branch']}]" if "branch" in row else ""
+
+
+def print_overdue_report(overdue_list: List[Dict], today: date) -> None:
+    """Afiseaza raportul cartilor intarziate"""
+    print("")
+    print("▀" * 65)
+    print(f"  RAPORT CARTI INTARZIATE - {today}")
+    print("▀" * 65)
+
+    if not overdue_list:
+        print("\n  Nu exista carti intarziate!\n")
+        print("▀" * 65)
+        print("")
+        return
+
+    print(f"\n  {len(overdue_list)} carti sunt returnate cu intarziere:\n")
+
+    total_penalties = 0
+    for i, loan in enumerate(overdue_list, 1):
+        print(f"  {i}. {loan['book_title']} ({loan['author']}){_branch_label(loan)}")
+        print(f"     Utilizator: {loan['user_name']} (ID: {loan['user_id']})")
+        print(f"     Deadline: {loan['return_date']}")
+
+        if loan["overdue_days"] == 0:
+            print(f"     Intarziere: 0 zile (scadent ASTAZI!)")
+        else:
+            print(f"     Intarziere: {loan['overdue_days']} zile")
+
+        print(f"     Penalitate: {loan['current_penalty']} RON")
+        total_penalties += loan["current_penalty"]
+        print("")
+
+    print("░" * 65)
+    print(f"  Total penalitati de colectat: {total_penalties} RON")
+    print("")
+    print("  Actiuni recomandate:")
+    for loan in overdue_list:
+        if loan["overdue_days"] == 0:
+            print(f"    ✉ Trimite reminder catre {loan['user_name']} (scadent astazi)")
+        else:
+            print(f"    ✉ Trimite notificare penalitate catre {loan['user_name']}")
+    print("▀" * 65)
+    print("")
+
+
+def range_report_title(report_type: str, date_range: tuple) -> str:
+    """Titlul rapoartelor pe interval de date"""
+    low, high = (date.fromordinal(v).strftime(DATE_FORMAT) if v is not None else "..." for v in date_range)
+    title = "IMPRUMUTURI SCADENTE" if report_type == "due" else "IMPRUMUTURI EFECTUATE"
+    return f"{title} {low} - {high}"
+
+
+def print_borrowed_report(active: List[Dict], title: str = "CARTI IMPRUMUTATE") -> None:
+    """Afiseaza raportul cartilor imprumutate"""
+    print("")
+    print("▀" * 75)
+    print(f"  {title} ({len(active)} total)")
+    print("▀" * 75)
+
+    if not active:
+        print("\n  Nu exista imprumuturi in acest interval.\n" if title != "CARTI IMPRUMUTATE"
+              else "\n  Nu exista carti imprumutate in acest moment.\n")
+        print("▀" * 75)
+        print("")
+        return
+
+    print(f"{'ID':<5} {'Titlu':<22} {'Imprumutat de':<18} {'Imprumut':<12} {'Return':<12}")
+    print("░" * 75)
+
+    for loan in active:
+        title = loan['book_title'][:20] + ".." if len(loan['book_title']) > 22 else loan['book_title']
+        name = loan['user_name'][:16] + ".." if len(loan['user_name']) > 18 else loan['user_name']
+        print(f"{loan['book_id']:<5} {title:<22} {name:<18} {loan['loan_date']:<12} "
+              f"{loan['return_date']:<12}{_branch_label(loan)}")
+
+    print("▀" * 75)
+    print("")
+
+
+def print_ready_holds_report(holds: List[Dict]) -> None:
+    """Afiseaza rezervarile gata de ridicare"""
+    print("")
+    print("▀" * 75)
+    print(f"  REZERVARI GATA DE RIDICARE ({len(holds)} total)")
+    print("▀" * 75)
+
+    if not holds:
+        print("\n  Nu exista rezervari care asteapta sa fie ridicate.\n")
+        print("▀" * 75)
+        print("")
+        return
+
+    print(f"{'ID':<5} {'Titlu':<26} {'Rezervat de':<20} {'ID utiliz.':<10} {'Ridicare pana la':<16}")
+    print("░" * 75)
+    for hold in holds:
+        title = hold['book_title'][:24] + ".." if len(hold['book_title']) > 26 else hold['book_title']
+        name = hold['user_name'][:18] + ".." if len(hold['user_name']) > 20 else hold['user_name']
+        print(f"{hold['book_id']:<5} {title:<26} {name:<20} {hold['user_id']:<10} "
+              f"{hold['pickup_until']:<16}{_branch_label(hold)}")
+    print("▀" * 75)
+    print("")
+
+
+def print_popular_report(sorted_books: List[Dict], top: int) -> None:
+    """Afiseaza topul cartilor populare"""
+    print("")
+    print("▀" * 60)
+    print(f"  TOP {min(top, len(sorted_books))} CARTI POPULARE")
+    print("▀" * 60)
+
+    if not sorted_books:
+        print("\n  Nu exista carti in biblioteca.\n")
+        print("▀" * 60)
+        return
+
+    for i, book in enumerate(sorted_books, 1):
+        count = book.get('loan_count', 0)
+        if count > 0:
+            print(f"  {i}. \"{book['title']}\" - {count} imprumuturi{_branch_label(book)}")
+
+    print("▀" * 60)
+    print("")
+
+
+def print_active_users_report(sorted_users: List[Dict]) -> None:
+    """Afiseaza topul utilizatorilor activi"""
+    print("")
+    print("▀" * 60)
+    print(f"  TOP {len(sorted_users)} UTILIZATORI ACTIVI")
+    print("▀" * 60)
+
+    if not sorted_users:
+        print("\n  Nu exista utilizatori activi cu imprumuturi.\n")
+        print("▀" * 60)
+        return
+
+    for i, user in enumerate(sorted_users, 1):
+        count = user.get('total_loans', 0)
+        print(f"  {i}. {user['name']} - {count} imprumuturi{_branch_label(user)}")
+    print("▀" * 60)
+    print("")
+
+
+def print_statistics(summary: Dict, top: int, title: str = "STATISTICI BIBLIOTECA") -> None:
+    """Afiseaza statisticile calculate de LibraryManager._statistics_summary"""
+    total_books = summary["total_books"]
+    available_books = summary["available_books"]
+    borrowed_books = total_books - available_books
+    returned_count = summary["returned_count"]
+    on_time_rate = (summary["on_time"] / returned_count * 100) if returned_count else 100
+
+    current_month = datetime.now().strftime("%B %Y")
+
+    print("")
+    print("▀" * 60)
+    print(f"  {title} - {current_month}")
+    print("▀" * 60)
+    
+    print("\n  COLECTIE:")
+    print(f"    Total carti:    {total_books}")
+    print(f"    Categorii:      {len(summary['categories'])}")
+    print(f"    Autori unici:   {len(summary['authors'])}")
+
+    print("\n  STATUS CARTI:")
+    if total_books > 0:
+        available_pct = (available_books / total_books) * 100
+        borrowed_pct = (borrowed_books / total_books) * 100
+        bar_available = "█" * int(available_pct / 5) + "░" * (20 - int(available_pct / 5))
+        bar_borrowed = "█" * int(borrowed_pct / 5) + "░" * (20 - int(borrowed_pct / 5))
+        print(f"    Disponibile: {available_books} ({available_pct:.1f}%) {bar_available}")
+        print(f"    Imprumutate: {borrowed_books} ({borrowed_pct:.1f}%) {bar_borrowed}")
+    else:
+        print("    Nu exista carti.")
+    print("\n  UTILIZATORI:")
+    print(f"    Total inregistrati:     {summary['total_users']}")
+    print(f"    Cu imprumuturi active:  {summary['active_users']}")
+    print("\n  IMPRUMUTURI:")
+    print(f"    Total (toate timpurile): {summary['total_loans']}")
+    print(f"    Active:                  {summary['active_loans']}")
+    print(f"    Intarziate:              {summary['overdue_count']}")
+    print(f"    Rata returnare la timp:  {on_time_rate:.0f}%")
+
+    if total_books:
+        print(f"\n  TOP {top} CARTI POPULARE:")
+        for i, (book_title, count) in enumerate(summary["top_books"], 1):
+            if count > 0:
+                print(f"  {i}. \"{book_title}\" - {count} imprumuturi")
+
+    if total_books:
+        print(f"\n  TOP 3 CATEGORII:")
+        sorted_cats = sorted(summary["categories"].items(), key=lambda x: x[1], reverse=True)[:3]
+        for i, (cat, count) in enumerate(sorted_cats, 1):
+            pct = (count / total_books * 100) if total_books > 0 else 0
+            print(f"  {i}. {cat} - {count} carti ({pct:.1f}%)")
+
+    if summary["total_users"]:
+        print(f"\n  TOP 3 UTILIZATORI ACTIVI:")
+        for i, (name, count) in enumerate(summary["top_users"], 1):
+            if count > 0:
+                print(f"  {i}. {name} - {count} imprumuturi")
+
+    print(f"\n  VENITURI (din penalitati):")
+    print(f"    Total colectat: {summary['total_penalties']} RON")
+    print("")
+    print("▀" * 60)
+    print("")
+
+
+def print_trends_report(rows: List[Dict], days: int, window: int, period: str) -> None:
+    """Afiseaza raportul de evolutie calculat de LibraryManager._trend_rows"""
+    names = {"day": "ZILNIC", "week": "SAPTAMANAL", "month": "LUNAR"}
+    units = {"day": "zile", "week": "saptamani", "month": "luni"}
+    print("")
+    print("▀" * 75)
+    print(f"  EVOLUTIE CIRCULATIE ({names[period]}) - ultimele {days} zile")
+    print(f"  Medii mobile pe {window} {units[period]}")
+    print("▀" * 75)
+
+    if not any(row["loans"] or row["returns"] for row in rows):
+        print("\n  Nu exista imprumuturi sau returnari in acest interval.\n")
+        print("▀" * 75)
+        print("")
+        return
+
+    print(f"{'Perioada':<11} {'Impr.':>6} {'Retur.':>6} {'Intarz.':>7} {'Penal.':>7} "
+          f"{'Medie impr.':>11} {'Medie pen.':>10}  Grafic")
+    print("░" * 75)
+    peak = max(row["loans"] for row in rows) or 1
+    for row in rows:
+        bar = "█" * round(row["loans"] / peak * 15)
+        print(f"{row['period']:<11} {row['loans']:>6} {row['returns']:>6} {row['overdue']:>7} "
+              f"{row['penalties']:>7} {row['avg_loans']:>11.1f} {row['avg_penalties']:>10.1f}  {bar}")
+    print("░" * 75)
+    print(f"{'Total':<11} {sum(r['loans'] for r in rows):>6} {sum(r['returns'] for r in rows):>6} "
+          f"{sum(r['overdue'] for r in rows):>7} {sum(r['penalties'] for r in rows):>7}")
+    print("▀" * 75)
+    print("")
+
+
+HELP_EXAMPLES = r"""
+▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀
+                         EXEMPLE DE UTILIZARE
+▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄
+
+  CARTI:
+    Adaugare:
+      library_manager add_book "1984" "G. Orwell" --isbn 978-0451 --category Fiction
+    Listare:
+      library_manager list                    (toate cartile)
+      library_manager list --status borrowed  (doar cele imprumutate)
+    Cautare (dupa titlu, autor, isbn sau categorie):
+      library_manager search --author "Orwell"
+      library_manager search --category "SF"
+    Cautare pe intervale (an publicare, data adaugarii):
+      library_manager search --year 1990:2000
+      library_manager search --added 2026-03-01:2026-03-31 --category "SF"
+    Rafinare dupa fatete (categorie, autor, status, deceniu):
+      library_manager search "razboi" --facet decade=1990s
+      library_manager search --author "Orwell" --facet status=DISPONIBIL
+    Stergere:
+      library_manager delete_book "1984"
+      library_manager delete_book "978-0451" (Dupa ISBN)
+
+  UTILIZATORI:
+    Adaugare:
+      library_manager add_user "Ion Popescu" --id 1001 --email "ion@test.com"
+    Listare:
+      library_manager list --type users
+    Dezactivare/Reactivare:
+      library_manager delete_user 1001
+      library_manager reactivate_user 1001
+    Istoric imprumuturi:
+      library_manager user_history 1001
+      library_manager user_history 1001 --from 2025-01-01 --to 2025-06-30
+
+  IMPRUMUTURI:
+    Imprumut:
+      library_manager borrow "1984" --user_id 1001 --days 14
+    Returnare:
+      library_manager return "1984" --user_id 1001
+    Rezervare (coada de asteptare pentru o carte imprumutata):
+      library_manager reserve "1984" --user_id 1002
+      library_manager reserve "1984" --user_id 1003 --priority 1
+      library_manager cancel_reservation "1984" --user_id 1002
+    Recomandari (ce au mai imprumutat cititorii unei carti):
+      library_manager recommend "1984"
+      library_manager recommend "1984" --top 10
+
+  RAPOARTE SI STATISTICI:
+    Statistici generale (top carti, autori, categorii):
+      library_manager stats
+      library_manager stats --top 10
+    Rapoarte specifice:
+      library_manager report --overdue    (intarzieri)
+      library_manager report --borrowed   (carti imprumutate)
+      library_manager report --popular    (cele mai imprumutate)
+      library_manager report --users      (activitate utilizatori)
+      library_manager report --ready      (rezervari gata de ridicare)
+      library_manager report --due 2026-03-01:2026-03-07     (scadente in interval)
+      library_manager report --loaned 2026-02-01:2026-02-28  (imprumutate in interval)
+    Evolutia circulatiei (din contoare zilnice, cu medii mobile):
+      library_manager trends                          (ultimele 30 de zile, medie pe 7 zile)
+      library_manager trends --days 365 --by month --window 3
+      library_manager trends --rebuild                (reconstruieste contoarele din istoric)
+
+  FILIALE:
+    Comenzi pe o filiala (fisier de date separat):
+      library_manager --branch nord add_book "Dune" "F. Herbert"
+      library_manager --branch nord borrow "Dune" --user_id 1001
+    Cautari si rapoarte globale (rulate in paralel pe toate filialele):
+      library_manager --branch all search --author "Orwell"
+      library_manager --branch all report --overdue
+      library_manager --branch all stats
+      library_manager branches
+
+  SHELL INTERACTIV:
+    Datele raman incarcate intre comenzi; Tab completeaza titluri, autori si ID-uri:
+      library_manager shell
+      biblioteca> borrow "Ferma An<Tab>
+      biblioteca> return "1984" --user_id 10<Tab>
+    Comenzi dintr-un fisier (o comanda pe linie, '-' pentru intrarea standard):
+      library_manager batch operatii.txt
+    Group commit (modificarile scrise impreuna la 100 de operatii sau la 1 s; 'flush' le scrie imediat):
+      library_manager --durability group shell
+      library_manager --durability group --group-ops 500 --group-ms 200 batch operatii.txt
+
+  ARHIVA:
+    Arhivare imprumuturi returnate (implicit mai vechi de 180 zile):
+      library_manager archive
+      library_manager archive --days 90
+
+  EXPORT/IMPORT:
+    Export:
+      library_manager export backup_folder        (exporta tot intr-un folder)
+      library_manager export catalog_carti.csv    (exporta doar catalogul)
+      library_manager export sync --since last    (doar schimbarile de la ultimul export)
+      library_manager export sync --since 1200    (schimbarile cu seq > 1200)
+    Notificari (fisiere NDJSON pentru serviciul de email, fara dubluri la re-rulare):
+      library_manager notify
+      library_manager notify --spool data/outbox --batch 5000
+    Verificare integritate:
+      library_manager check              (doar raport)
+      library_manager check --repair     (recalculeaza contoarele gresite)
+    Comparare / reconciliere cu o copie offline:
+      library_manager diff laptop/library_data.json
+      library_manager merge laptop/library_data.json --base copie_initiala.json
+    Backup incremental / restaurare:
+      library_manager backup data/backups
+      library_manager restore data/backups --snapshot 20260301-220000 --force
+    Import:
+      library_manager import carti_noi.csv        (din folderul curent)
+      library_manager import "C:\\Users\\Eu\\Desktop\\import.csv" (cale completa)
+      library_manager import furnizori/ catalog_extra.csv --workers 4 (mai multe fisiere, in paralel)
+      library_manager import backup_folder/users.csv --users          (utilizatori)
+      library_manager import backup_folder/user_history.csv --loans   (istoric imprumuturi)
+"""
+
+
+class LazyHelpParser(argparse.ArgumentParser):
+    """Parser care genereaza textul cu exemple (epilog) abia cand ajutorul este afisat"""
+
+    epilog_factory = None
+
+    def format_help(self) -> str:
+        if self.epilog is None and self.epilog_factory is not None:
+            self.epilog = self.epilog_factory()
+        return super().format_help()
+
+
+def _requested_command(argv: List[str]) -> Optional[str]:
+    """Prima valoare pozitionala din argv (subcomanda), sau None pentru ajutor"""
+    skip_next = False
+    for arg in argv:
+        if skip_next:
+            skip_next = False
+        elif arg in ("-h", "--help"):
+            return None
+        elif arg in ("--codec", "--branch", "--durability", "--group-ops", "--group-ms"):
+            skip_next = True
+        elif not arg.startswith("-"):
+            return arg
+    return None
+
+
+def create_parser(argv: Optional[List[str]] = None) -> argparse.ArgumentParser:
+    """Creeaza parserul pentru linia de comanda.
+
+    Daca se primeste `argv`, este construita doar subcomanda ceruta (restul
+    subcomenzilor sunt adaugate doar pentru ajutor sau comenzi necunoscute).
+    """
+    # Determinam numele comenzii in functie de sistem (Windows vs Linux/Docker)
+    cmd_name = ".\\library_manager" if sys.platform == "win32" else "library_manager"
+
+    parser = LazyHelpParser(
+        prog=cmd_name,
+        add_help=False,
+        description="""
+▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀▀
+                       LIBRARY MANAGER - CLI
+              Sistem de management pentru biblioteca
+▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄▄
+""",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    # Exemplele sunt construite doar cand ajutorul este afisat efectiv
+    parser.epilog_factory = lambda: HELP_EXAMPLES.replace("library_manager", cmd_name)
+
+    parser.add_argument(
+        '-h', '--help',
+        action='help',
+        default=argparse.SUPPRESS,
+        help='Afiseaza mesajul de ajutor'
+    )
+    parser.add_argument("--codec", choices=["auto"] + list(CODECS), default=None,
+                        help="Codec JSON folosit la citire/scriere (default: auto)")
+    parser.add_argument("--compact", action="store_true", default=None,
+                        help="Scrie fisierele de date fara indentare")
+    parser.add_argument("--profile", action="store_true",
+                        help="Afiseaza timpul de executie si contoarele interne")
+    parser.add_argument("--branch", default=None,
+                        help=f"Filiala (default: {DEFAULT_BRANCH}); '{BRANCH_ALL}' pentru search/report/stats globale")
+    parser.add_argument("--durability", choices=DURABILITY_MODES, default=None,
+                        help=f"fsync: un fsync (fisierul de date) dupa fiecare operatie; group: group commit, "
+                             f"cu un fsync suplimentar pentru jurnalul de schimbari la fiecare grup "
+                             f"(default: {DURABILITY})")
+    parser.add_argument("--group-ops", type=int, default=None,
+                        help=f"Operatii adunate inainte de scriere in modul group (default: {GROUP_COMMIT_OPS})")
+    parser.add_argument("--group-ms", type=int, default=None,
+                        help=f"Intervalul maxim (ms) pana la scriere in modul group (default: {GROUP_COMMIT_MS})")
+
+    subparsers = parser.add_subparsers(dest="command", title="Comenzi disponibile", metavar="")
+    requested = _requested_command(argv) if argv is not None else None
+
+    def wanted(name: str) -> bool:
+        return requested is None or requested == name
+
+    if wanted("add_book"):
+        p = subparsers.add_parser("add_book", help="Adauga o carte noua")
+        p.add_argument("title", help="Titlul cartii")
+        p.add_argument("author", help="Autorul cartii")
+        p.add_argument("--isbn", help="Codul ISBN")
+        p.add_argument("--category", help="Categoria cartii")
+        p.add_argument("--year", type=int, help="Anul publicarii")
+
+    if wanted("add_user"):
+        p = subparsers.add_parser("add_user", help="Adauga un utilizator nou")
+        p.add_argument("name", help="Numele utilizatorului")
+        p.add_argument("--id", required=True, dest="user_id", help="ID-ul utilizatorului")
+        p.add_argument("--email", help="Adresa de email")
+
+    if wanted("list"):
+        p = subparsers.add_parser("list", help="Listeaza carti sau utilizatori")
+        p.add_argument("--type", choices=["books", "users"], default="books", help="Ce sa listeze")
+        p.add_argument("--status", help="Filtreaza dupa status (available/borrowed)")
+
+    if wanted("search"):
+        p = subparsers.add_parser("search", help="Cauta carti")
+        p.add_argument("query", nargs="?", help="Termen de cautare (optional)")
+        p.add_argument("--title", help="Cauta dupa titlu")
+        p.add_argument("--author", help="Cauta dupa autor")
+        p.add_argument("--isbn", help="Cauta dupa ISBN")
+        p.add_argument("--category", help="Cauta dupa categorie")
+        p.add_argument("--year", help="Anul publicarii in interval (ex: 1990:2000, 1990:, :2000)")
+        p.add_argument("--added", help="Adaugate in catalog in interval (ex: 2026-03-01:2026-03-31)")
+        p.add_argument("--facet", help="Rafinare dupa o valoare de fateta (ex: category=Fiction, decade=1990s)")
+
+    if wanted("borrow"):
+        p = subparsers.add_parser("borrow", help="Imprumuta o carte")
+        p.add_argument("book", help="Titlul sau ISBN-ul cartii")
+        p.add_argument("--user_id", required=True, help="ID-ul utilizatorului")
+        p.add_argument("--days", type=int, default=14, help="Numarul de zile (default: 14)")
+
+    if wanted("return"):
+        p = subparsers.add_parser("return", help="Returneaza o carte")
+        p.add_argument("book", help="Titlul sau ISBN-ul cartii")
+        p.add_argument("--user_id", required=True, help="ID-ul utilizatorului")
+
+    if wanted("reserve"):
+        p = subparsers.add_parser("reserve", help="Rezerva o carte imprumutata (coada de asteptare)")
+        p.add_argument("book", help="Titlul sau ISBN-ul cartii")
+        p.add_argument("--user_id", required=True, help="ID-ul utilizatorului")
+        p.add_argument("--priority", type=int, default=0,
+                       help="Prioritatea (mai mare = servit mai devreme, default: 0)")
+
+    if wanted("cancel_reservation"):
+        p = subparsers.add_parser("cancel_reservation", help="Anuleaza o rezervare")
+        p.add_argument("book", help="Titlul sau ISBN-ul cartii")
+        p.add_argument("--user_id", required=True, help="ID-ul utilizatorului")
+
+    if wanted("delete_book"):
+        p = subparsers.add_parser("delete_book", help="Sterge o carte")
+        p.add_argument("book", help="Titlul sau ISBN-ul cartii")
+
+    if wanted("delete_user"):
+        p = subparsers.add_parser("delete_user", help="Dezactiveaza un utilizator")
+        p.add_argument("user_id", help="ID-ul utilizatorului")
+
+    if wanted("reactivate_user"):
+        p = subparsers.add_parser("reactivate_user", help="Reactiveaza un utilizator")
+        p.add_argument("user_id", help="ID-ul utilizatorului de reactivat")
+
+    if wanted("user_history"):
+        p = subparsers.add_parser("user_history", help="Istoricul imprumuturilor unui utilizator")
+        p.add_argument("user_id", help="ID-ul utilizatorului")
+        p.add_argument("--from", dest="date_from", help="Data de inceput (YYYY-MM-DD)")
+        p.add_argument("--to", dest="date_to", help="Data de sfarsit (YYYY-MM-DD)")
+
+    if wanted("recommend"):
+        p = subparsers.add_parser("recommend", help="Carti imprumutate de cititorii unei carti")
+        p.add_argument("book", help="Titlul, ISBN-ul sau ID-ul cartii")
+        p.add_argument("--top", type=int, default=RECOMMEND_TOP,
+                       help=f"Numarul de recomandari (default: {RECOMMEND_TOP})")
+
+    if wanted("report"):
+        p = subparsers.add_parser("report", help="Genereaza rapoarte")
+        p.add_argument("--overdue", action="store_true", help="Raport carti intarziate")
+        p.add_argument("--borrowed", action="store_true", help="Raport carti imprumutate")
+        p.add_argument("--popular", action="store_true", help="Raport carti populare")
+        p.add_argument("--users", action="store_true", help="Raport utilizatori activi")
+        p.add_argument("--ready", action="store_true", help="Rezervari gata de ridicare")
+        p.add_argument("--due", metavar="DE_LA:PANA_LA", help="Imprumuturi active scadente in interval")
+        p.add_argument("--loaned", metavar="DE_LA:PANA_LA", help="Imprumuturi efectuate in interval")
+        p.add_argument("--top", type=int, default=10, help="Numarul de rezultate pentru top")
+
+    if wanted("stats"):
+        p = subparsers.add_parser("stats", help="Afiseaza statistici")
+        p.add_argument("--top", type=int, default=5, help="Numarul de rezultate pentru top-uri")
+
+    if wanted("trends"):
+        p = subparsers.add_parser("trends", help="Evolutia imprumuturilor si penalitatilor pe perioade")
+        p.add_argument("--days", type=int, default=30, help="Intervalul analizat in zile (default: 30)")
+        p.add_argument("--by", choices=TREND_PERIODS, default="day", dest="period",
+                       help="Gruparea: zi, saptamana sau luna (default: day)")
+        p.add_argument("--window", type=int, default=7,
+                       help="Numarul de perioade pentru media mobila (default: 7)")
+        p.add_argument("--rebuild", action="store_true", help="Reconstruieste contoarele zilnice din istoric")
+
+    if wanted("archive"):
+        p = subparsers.add_parser("archive", help="Arhiveaza imprumuturile returnate vechi")
+        p.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS,
+                       help=f"Vechimea minima a returnarii in zile (default: {ARCHIVE_AFTER_DAYS})")
+
+    if wanted("branches"):
+        subparsers.add_parser("branches", help="Listeaza filialele (fisierele de date)")
+
+    if wanted("notify"):
+        p = subparsers.add_parser("notify", help="Genereaza notificarile de scadenta/intarziere (NDJSON)")
+        p.add_argument("--spool", help="Folderul outbox (default: library_data_outbox langa fisierul de date)")
+        p.add_argument("--batch", type=int, default=NOTIFY_BATCH,
+                       help=f"Notificari pe fisier (default: {NOTIFY_BATCH})")
+
+    if wanted("export"):
+        p = subparsers.add_parser("export", help="Exporta datele in fisiere CSV")
+        p.add_argument("folder", help="Folderul unde se vor genera fisierele CSV (ex: backup)")
+        p.add_argument("--since", default=None,
+                       help="Export incremental: doar schimbarile cu seq mai mare ('last' = watermark-ul salvat)")
+
+    if wanted("check"):
+        p = subparsers.add_parser("check", help="Verifica integritatea datelor (contoare, referinte, duplicate)")
+        p.add_argument("--repair", action="store_true", help="Recalculeaza contoarele gresite din imprumuturi")
+
+    if wanted("diff"):
+        p = subparsers.add_parser("diff", help="Compara datele cu alt fisier de date")
+        p.add_argument("other", help="Celalalt fisier de date (JSON)")
+
+    if wanted("merge"):
+        p = subparsers.add_parser("merge", help="Preia modificarile din alt fisier de date")
+        p.add_argument("other", help="Celalalt fisier de date (JSON)")
+        p.add_argument("--base", help="Copia comuna initiala (reconciliere in trei directii)")
+
+    if wanted("backup"):
+        p = subparsers.add_parser("backup", help="Backup incremental (doar blocurile modificate)")
+        p.add_argument("folder", help="Folderul depozitului de backup")
+
+    if wanted("restore"):
+        p = subparsers.add_parser("restore", help="Restaureaza datele dintr-un snapshot")
+        p.add_argument("folder", help="Folderul depozitului de backup")
+        p.add_argument("--snapshot", help="Numele snapshot-ului (default: cel mai recent)")
+        p.add_argument("--force", action="store_true", help="Suprascrie datele existente")
+
+    if wanted("shell"):
+        subparsers.add_parser("shell", help="Shell interactiv (datele raman incarcate, completare cu Tab)")
+
+    if wanted("batch"):
+        p = subparsers.add_parser("batch", help="Executa comenzile dintr-un fisier (una pe linie)")
+        p.add_argument("filename", help="Fisierul cu comenzi ('-' pentru intrarea standard)")
+
+    if wanted("flush"):
+        subparsers.add_parser("flush", help="Scrie pe disc modificarile amanate (group commit)")
+
+    if wanted("import"):
+        p = subparsers.add_parser("import", help="Importa carti (sau utilizatori/imprumuturi) din CSV")
+        p.add_argument("filenames", nargs="+", metavar="filename",
+                       help="Fisierele CSV de importat (sau foldere cu fisiere CSV)")
+        p.add_argument("--workers", type=int, default=None,
+                       help="Procese pentru parsarea cartilor (implicit: numarul de procesoare)")
+        kind = p.add_mutually_exclusive_group()
+        kind.add_argument("--users", action="store_true", help="Importa utilizatori (format users.csv)")
+        kind.add_argument("--loans", action="store_true", help="Importa istoric imprumuturi (format user_history.csv)")
+
+    if requested and not subparsers.choices:
+        # Comanda necunoscuta: construim parserul complet pentru mesajul de eroare
+        return create_parser()
+    return parser
+
+
+def print_profile(manager: LibraryManager, command: str, elapsed: float) -> None:
+    """Afiseaza (pe stderr) timpul comenzii si contoarele managerului"""
+    print(f"\n[profil] comanda '{command}': {elapsed * 1000:.1f} ms", file=sys.stderr)
+    for key, value in manager.counters.items():
+        print(f"[profil]   {key}: {value}", file=sys.stderr)
+
+
+def search_criteria(args: argparse.Namespace) -> Optional[tuple]:
+    """(termen, tip, intervale, fateta) pentru comanda search sau None (cu mesaj de eroare)"""
+    ranges, facet = {}, None
+    try:
+        if args.year:
+            ranges["year"] = parse_range(args.year, "year")
+        if args.added:
+            ranges["date_added"] = parse_range(args.added, "date_added")
+        if args.facet:
+            facet = parse_facet(args.facet)
+    except ValueError as e:
+        print(f"EROARE! {e}")
+        return None
+
+    for value, search_type in ((args.author, "author"), (args.title, "title"), (args.isbn, "isbn"),
+                               (args.category, "category"), (args.query, "title")):
+        if value:
+            return value, search_type, ranges, facet
+    if ranges or facet:
+        return None, "title", ranges, facet
+    print("\n EROARE! Specifica un criteriu de cautare!")
+    print("Exemple:")
+    print('  search --author "Orwell"')
+    print('  search --title "1984"')
+    print('  search --isbn "9780451524935"')
+    print('  search --category "Fiction"')
+    print('  search --year 1990:2000')
+    return None
+
+
+def report_type(args: argparse.Namespace) -> str:
+    """Tipul de raport cerut (implicit: overdue)"""
+    if args.due:
+        return "due"
+    if args.loaned:
+        return "loaned"
+    if args.overdue:
+        return "overdue"
+    if args.borrowed:
+        return "borrowed"
+    if args.popular:
+        return "popular"
+    if args.users:
+        return "users"
+    if args.ready:
+        return "ready"
+    return "overdue"
+
+
+def report_range(args: argparse.Namespace) -> Optional[tuple]:
+    """Intervalul de date pentru rapoartele --due/--loaned (None daca lipseste sau e invalid)"""
+    value = args.due or args.loaned
+    if not value:
+        return None
+    try:
+        return parse_range(value, "date")
+    except ValueError as e:
+        print(f"EROARE! {e}")
+        return None
+
+
+def run_federated_command(args: argparse.Namespace) -> None:
+    """Executa search/report/stats/branches peste toate filialele"""
+    branches = branch_files()
+    if args.command == "branches":
+        list_branches(branches, args.codec)
+    elif not branches:
+        print("\n Nu exista filiale cu date.\n")
+    elif args.command == "search":
+        criteria = search_criteria(args)
+        if criteria:
+            federated_search(*criteria, branches, args.codec)
+    elif args.command == "report":
+        kind = report_type(args)
+        date_range = report_range(args)
+        if kind not in ("due", "loaned") or date_range:
+            federated_report(kind, args.top, branches, args.codec, date_range)
+    elif args.command == "stats":
+        federated_statistics(args.top, branches, args.codec)
+
+
+class LibraryShell:
+    """Shell interactiv: comenzile obisnuite, executate pe acelasi manager incarcat.
+
+    Clasa este combinata cu cmd.Cmd abia in run_shell (importul lui cmd costa
+    timp la pornirea fiecarei comenzi). Titlurile, autorii si ID-urile de
+    utilizator sunt completate cu Tab din trie-uri actualizate la fiecare modificare.
+    """
+
+    prompt = "biblioteca> "
+    intro = ("Shell interactiv Library Manager. Comenzile sunt cele din linia de comanda "
+             "(ex: borrow \"1984\" --user_id 1001).\nTab completeaza comenzi, titluri, autori si "
+             "ID-uri; 'help' afiseaza comenzile, 'exit' iese.")
+    # Optiunile dupa care urmeaza un ID de utilizator, un autor sau un titlu
+    USER_OPTIONS = ("--user_id", "--id")
+    AUTHOR_OPTIONS = ("--author",)
+    USER_COMMANDS = ("delete_user", "reactivate_user", "user_history")
+
+    def __init__(self, manager: LibraryManager):
+        super().__init__()
+        self.manager = manager
+        self._build_tries()
+        manager.change_listeners.append(self._on_change)
+        import threading
+        # In modul group, un fir separat scrie modificarile amanate si cand shell-ul asteapta comenzi
+        self.lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def _flush_loop(self) -> None:
+        while not self._stopped.wait(self.manager.group_ms / 1000):
+            with self.lock:
+                self.manager.flush(due_only=True)
+
+    def _build_tries(self) -> None:
+        books, users = self.manager.data["books"], self.manager.data["users"]
+        self.titles = PrefixTrie(b.get("title", "") for b in books)
+        self.authors = PrefixTrie(b.get("author", "") for b in books)
+        self.user_ids = PrefixTrie(str(u.get("id")) for u in users)
+        # Valorile indexate pentru fiecare carte (la modificare trebuie sterse cele vechi)
+        self._book_keys = {b.get("id"): (b.get("title", ""), b.get("author", "")) for b in books}
+        self._collections = (books, users)
+
+    def _on_change(self, op: str, collection: str, record: Dict) -> None:
+        if collection == "users" and op == "insert":
+            self.user_ids.add(str(record.get("id")))
+        elif collection == "books":
+            old = self._book_keys.pop(record.get("id"), None)
+            if old:
+                self.titles.remove(old[0])
+                self.authors.remove(old[1])
+            if op != "delete":
+                self.titles.add(record.get("title", ""))
+                self.authors.add(record.get("author", ""))
+                self._book_keys[record.get("id")] = (record.get("title", ""), record.get("author", ""))
+
+    # Completare
+
+    def command_names(self) -> List[str]:
+        return sorted(set(SHELL_COMMANDS) | {"exit", "help"})
+
+    def completenames(self, text: str, *ignored) -> List[str]:
+        return [name for name in self.command_names() if name.startswith(text)]
+
+    def completedefault(self, text: str, line: str, begidx: int, endidx: int) -> List[str]:
+        before = line[:endidx]
+        in_quote = before.count('"') % 2 == 1
+        # Argumentul curent incepe dupa ghilimeaua deschisa sau dupa ultimul spatiu
+        arg_start = before.rindex('"') + 1 if in_quote else len(before) - len(before.split(" ")[-1])
+        prefix = before[arg_start:]
+        words = before[:arg_start].rstrip('"').split()
+        command, previous = (words[0] if words else ""), (words[-1] if len(words) > 1 else "")
+
+        if prefix.startswith("-"):
+            return []
+        if previous in self.USER_OPTIONS or (command in self.USER_COMMANDS and len(words) == 1):
+            trie = self.user_ids
+        elif previous in self.AUTHOR_OPTIONS:
+            trie = self.authors
+        elif previous.startswith("-") and previous != "--title":
+            return []
+        else:
+            trie = self.titles
+
+        offset = len(prefix) - len(text)
+        matches = []
+        for word in trie.complete(prefix):
+            if not in_quote and " " in word:
+                # Textele cu spatii sunt puse intre ghilimele, ca sa ramana un singur argument
+                matches.append('"' + word + '"' if offset == 0 else word[offset:])
+            else:
+                matches.append(word[offset:])
+        return matches
+
+    # Executie
+
+    def emptyline(self) -> bool:
+        return False
+
+    def default(self, line: str) -> bool:
+        if line.split()[:1] in (["exit"], ["quit"], ["EOF"]):
+            return True
+        args = parse_command_line(line)
+        if args is None:
+            return False
+
+        started = time.perf_counter()
+        with self.lock:
+            run_command(self.manager, args)
+        if self.manager.data["books"] is not self._collections[0] or \
+                self.manager.data["users"] is not self._collections[1]:
+            # Colectiile au fost inlocuite (restore/merge): trie-urile se reconstruiesc
+            self._build_tries()
+        if args.profile:
+            print_profile(self.manager, args.command, time.perf_counter() - started)
+        return False
+
+    def do_help(self, arg: str) -> None:
+        if arg:
+            self.default(f"{arg} --help")
+        else:
+            print("Comenzi: " + ", ".join(self.command_names()))
+            print("Detalii: help <comanda>")
+
+    def do_exit(self, arg: str) -> bool:
+        return True
+
+    do_quit = do_exit
+    do_EOF = do_exit
+
+
+def run_shell(manager: LibraryManager) -> None:
+    """Porneste shell-ul interactiv"""
+    import cmd
+    try:
+        import readline
+        # Titlurile contin spatii: doar ghilimelele si spatiile separa cuvintele la completare
+        readline.set_completer_delims(' "')
+    except ImportError:
+        pass
+    import threading
+    shell = type("LibraryCmd", (LibraryShell, cmd.Cmd), {})(manager)
+    if manager.durability == "group":
+        threading.Thread(target=shell._flush_loop, daemon=True).start()
+    try:
+        shell.cmdloop()
+    except KeyboardInterrupt:
+        print("")
+    finally:
+        shell._stopped.set()
+        with shell.lock:
+            manager.flush()
+
+
+def parse_command_line(line: str) -> Optional[argparse.Namespace]:
+    """Parseaza o comanda din shell sau din fisierul batch (None daca linia nu este o comanda valida)"""
+    import shlex
+    try:
+        argv = shlex.split(line)
+    except ValueError as e:
+        print(f"EROARE! {e}")
+        return None
+    if not argv:
+        return None
+    if argv[0] in ("shell", "batch", "branches") or \
+            any(a.split("=")[0] in SESSION_OPTIONS for a in argv):
+        print("EROARE! Comanda/optiunea nu este disponibila in shell sau batch "
+              "(filiala, codec-ul si durabilitatea se aleg la pornire).")
+        return None
+    try:
+        args = create_parser(argv).parse_args(argv)
+    except SystemExit:
+        # argparse a afisat deja eroarea sau ajutorul
+        return None
+    return args if args.command else None
+
+
+def run_batch(manager: LibraryManager, filename: str) -> None:
+    """Executa comenzile dintr-un fisier (una pe linie; liniile goale si cele cu '#' sunt ignorate)"""
+    try:
+        f = sys.stdin if filename == "-" else open(filename, encoding="utf-8")
+    except OSError as e:
+        print(f"EROARE! Fisierul de comenzi nu poate fi citit: {e}")
+        return
+    executed = failed = 0
+    with f:
+        for line_num, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            args = parse_command_line(line)
+            if args is None:
+                print(f"   (linia {line_num} a fost ignorata)")
+                failed += 1
+                continue
+            run_command(manager, args)
+            executed += 1
+    manager.flush()
+    print(f"\n Batch '{filename}': {executed} comenzi executate, {failed} linii invalide.")
+
+
+def run_command(manager: LibraryManager, args: argparse.Namespace) -> None:
+    """Executa o comanda (din linia de comanda sau din shell) pe managerul dat"""
+    if args.command == "add_book":
+        manager.add_book(args.title, args.author, args.isbn, args.category, args.year)
+
+    elif args.command == "add_user":
+        manager.add_user(args.name, args.user_id, args.email)
+
+    elif args.command == "list":
+        if args.type == "users":
+            manager.list_users()
+        else:
+            if args.status and args.status.lower() == "borrowed":
+                manager.generate_report("borrowed")
+            else:
+                manager.list_books(args.status)
+
+    elif args.command == "search":
+        criteria = search_criteria(args)
+        if criteria:
+            manager.search_books(*criteria)
+
+    elif args.command == "borrow":
+        manager.borrow_book(args.book, args.user_id, args.days)
+
+    elif args.command == "return":
+        manager.return_book(args.book, args.user_id)
+
+    elif args.command == "reserve":
+        manager.reserve_book(args.book, args.user_id, args.priority)
+
+    elif args.command == "cancel_reservation":
+        manager.cancel_reservation(args.book, args.user_id)
+
+    elif args.command == "delete_book":
+        manager.delete_book(args.book)
+
+    elif args.command == "delete_user":
+        manager.deactivate_user(args.user_id)
+
+    elif args.command == "reactivate_user":
+        manager.reactivate_user(args.user_id)
+
+    elif args.command == "user_history":
+        manager.user_history(args.user_id, args.date_from, args.date_to)
+
+    elif args.command == "recommend":
+        manager.recommend(args.book, args.top)
+
+    elif args.command == "report":
+        kind = report_type(args)
+        date_range = report_range(args)
+        if kind not in ("due", "loaned") or date_range:
+            manager.generate_report(kind, args.top, date_range)
+
+    elif args.command == "stats":
+        manager.show_statistics(args.top)
+
+    elif args.command == "trends":
+        if args.rebuild:
+            manager.rebuild_rollups()
+        manager.show_trends(args.days, args.window, args.period)
+
+    elif args.command == "archive":
+        manager.archive_loans(args.days)
+
+    elif args.command == "notify":
+        manager.notify(args.spool, args.batch)
+
+    elif args.command == "export":
+        if args.since is not None:
+            manager.export_changes(args.folder, args.since)
+        else:
+            manager.export_data(args.folder)
+
+    elif args.command == "check":
+        manager.check_integrity(args.repair)
+
+    elif args.command == "diff":
+        manager.diff_file(args.other)
+
+    elif args.command == "merge":
+        manager.merge_file(args.other, args.base)
+
+    elif args.command == "backup":
+        manager.backup(args.folder)
+
+    elif args.command == "restore":
+        manager.restore(args.folder, args.snapshot, args.force)
+
+    elif args.command == "import":
+        if args.users or args.loans:
+            for filename in _import_files(args.filenames):
+                if args.users:
+                    manager.import_users(filename)
+                else:
+                    manager.import_loans(filename)
+        else:
+            manager.import_data(*args.filenames, workers=args.workers)
+
+    elif args.command == "flush":
+        written = manager.flush()
+        print(f"\n Modificari scrise pe disc: {written} operatii amanate." if written
+              else "\n Nu exista modificari amanate.")
+
+    elif args.command == "batch":
+        run_batch(manager, args.filename)
+
+    elif args.command == "shell":
+        run_shell(manager)
+
+
+def main():
+    parser = create_parser(sys.argv[1:])
+    args = parser.parse_args()
+    started = time.perf_counter()
+
+    if not args.command:
+        parser.print_help()
+        return
+
+    if args.branch == BRANCH_ALL or args.command == "branches":
+        if args.command not in FEDERATED_COMMANDS:
+            print(f"EROARE! Comanda '{args.command}' se aplica unei singure filiale (folositi --branch NUME).")
+            return
+        run_federated_command(args)
+        return
+
+    try:
+        manager = LibraryManager(branch_data_file(args.branch), codec=args.codec, compact=args.compact,
+                                 read_only=args.command in SNAPSHOT_COMMANDS, durability=args.durability,
+                                 group_ops=args.group_ops, group_ms=args.group_ms)
+    except ValueError as e:
+        print(f"EROARE! {e}")
+        return
+    except ImportError as e:
+        print(f"EROARE! Codec-ul cerut nu este instalat: {e}")
+        return
+
+    run_command(manager, args)
+    # Procesul se incheie: modificarile amanate (group commit) sunt scrise acum
+    manager.flush()
+
+    if args.profile:
+        print_profile(manager, args.command, time.perf_counter() - started)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
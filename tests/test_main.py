@@ -2,14 +2,33 @@
 """
 Teste pentru Library Manager
 """
+import csv
+import glob
+import io
+import json
 import os
+import shutil
 import sys
 import tempfile
+import tracemalloc
 import unittest
+from datetime import date, timedelta
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from main import LibraryManager
+from library_manager import (COBORROW_HISTORY, COBORROW_NEIGHBOURS, JsonCodec, JsonStream, LibraryManager,
+                             LibraryShell, MappedIndex, PrefixTrie, SnapshotRecords, _coborrow_add, _record_chunks,
+                             branch_data_file, create_parser, get_codec, list_snapshots, merge_statistics,
+                             parse_facet, parse_range, run_batch, run_federated)
+
+
+def remove_sidecars(data_file):
+    """Sterge fisierele auxiliare (index, arhiva) create langa fisierul de date"""
+    base = os.path.splitext(data_file)[0]
+    for path in glob.glob(base + ".*"):
+        if path != data_file:
+            os.unlink(path)
+    shutil.rmtree(base + "_archive", ignore_errors=True)
 
 
 class TestBooks(unittest.TestCase):
@@ -20,6 +39,7 @@ class TestBooks(unittest.TestCase):
         self.manager = LibraryManager(self.temp_file.name)
     
     def tearDown(self):
+        remove_sidecars(self.temp_file.name)
         if os.path.exists(self.temp_file.name):
             try:
                 os.unlink(self.temp_file.name)
@@ -75,6 +95,7 @@ class TestUsers(unittest.TestCase):
         self.manager = LibraryManager(self.temp_file.name)
     
     def tearDown(self):
+        remove_sidecars(self.temp_file.name)
         if os.path.exists(self.temp_file.name):
             try:
                 os.unlink(self.temp_file.name)
@@ -111,6 +132,7 @@ class TestLoans(unittest.TestCase):
         self.manager = LibraryManager(self.temp_file.name)
     
     def tearDown(self):
+        remove_sidecars(self.temp_file.name)
         if os.path.exists(self.temp_file.name):
             try:
                 os.unlink(self.temp_file.name)
@@ -168,6 +190,7 @@ class TestPersistence(unittest.TestCase):
         self.manager = LibraryManager(self.temp_file.name)
     
     def tearDown(self):
+        remove_sidecars(self.temp_file.name)
         if os.path.exists(self.temp_file.name):
             try:
                 os.unlink(self.temp_file.name)
@@ -190,6 +213,7 @@ class TestValidations(unittest.TestCase):
         self.manager = LibraryManager(self.temp_file.name)
     
     def tearDown(self):
+        remove_sidecars(self.temp_file.name)
         if os.path.exists(self.temp_file.name):
             os.unlink(self.temp_file.name)
     
@@ -214,6 +238,7 @@ class TestOperations(unittest.TestCase):
         self.manager = LibraryManager(self.temp_file.name)
     
     def tearDown(self):
+        remove_sidecars(self.temp_file.name)
         if os.path.exists(self.temp_file.name):
             os.unlink(self.temp_file.name)
 
@@ -247,5 +272,1594 @@ class TestOperations(unittest.TestCase):
         self.assertEqual(user["status"], "ACTIV")
 
 
+class TestArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
+        self.temp_file.close()
+        self.manager = LibraryManager(self.temp_file.name)
+        self.manager.add_book("Carte Veche", "Autor Test")
+        self.manager.add_user("Ion Popescu", "1001")
+        self.manager.borrow_book("Carte Veche", "1001")
+        self.manager.return_book("Carte Veche", "1001")
+        # Simulam o returnare veche
+        self.manager.data["loans"][0]["actual_return_date"] = "2020-01-15"
+
+    def tearDown(self):
+        remove_sidecars(self.temp_file.name)
+        if os.path.exists(self.temp_file.name):
+            os.unlink(self.temp_file.name)
+        shutil.rmtree(self.manager.archive_dir, ignore_errors=True)
+
+    def test_archive_moves_old_returned_loans(self):
+        self.manager.archive_loans(30)
+        self.assertEqual(len(self.manager.data["loans"]), 0)
+        partition = os.path.join(self.manager.archive_dir, "loans_2020-01.json")
+        self.assertTrue(os.path.exists(partition))
+        self.assertEqual(self.manager._archive_totals()["count"], 1)
+
+    def test_active_loans_are_not_archived(self):
+        self.manager.borrow_book("Carte Veche", "1001")
+        self.manager.archive_loans(30)
+        self.assertEqual(len(self.manager.data["loans"]), 1)
+        self.assertEqual(self.manager.data["loans"][0]["status"], "ACTIV")
+
+    def test_loan_ids_continue_after_archive(self):
+        self.manager.archive_loans(30)
+        manager2 = LibraryManager(self.temp_file.name)
+        manager2.borrow_book("Carte Veche", "1001")
+        self.assertEqual(manager2.data["loans"][0]["id"], 2)
+
+    def test_export_history_includes_archive(self):
+        self.manager.archive_loans(30)
+        folder = tempfile.mkdtemp()
+        try:
+            self.manager.export_data(folder)
+            with open(os.path.join(folder, "user_history.csv"), encoding='utf-8') as f:
+                rows = list(csv.DictReader(f))
+            self.assertEqual(len(rows), 1)
+            self.assertEqual(rows[0]["actual_return_date"], "2020-01-15")
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+
+class TestUserHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
+        self.temp_file.close()
+        self.manager = LibraryManager(self.temp_file.name)
+        self.manager.add_book("Carte 1", "Autor 1")
+        self.manager.add_book("Carte 2", "Autor 2")
+        self.manager.add_user("Ion Popescu", "1001")
+        self.manager.add_user("Maria Ionescu", "1002")
+
+    def tearDown(self):
+        remove_sidecars(self.temp_file.name)
+        if os.path.exists(self.temp_file.name):
+            os.unlink(self.temp_file.name)
+        shutil.rmtree(self.manager.archive_dir, ignore_errors=True)
+
+    def test_history_contains_only_user_loans(self):
+        self.manager.borrow_book("Carte 1", "1001")
+        self.manager.borrow_book("Carte 2", "1002")
+        loans = self.manager._user_loans("1001")
+        self.assertEqual([l["book_title"] for l in loans], ["Carte 1"])
+
+    def test_return_updates_counters(self):
+        self.manager.borrow_book("Carte 1", "1001")
+        self.manager.return_book("Carte 1", "1001")
+        user = self.manager._find_user("1001")
+        self.assertEqual(user["returned_loans"], 1)
+        self.assertEqual(user["on_time_returns"], 1)
+
+    def test_date_range_filter(self):
+        self.manager.borrow_book("Carte 1", "1001")
+        self.manager.data["loans"][0]["loan_date"] = "2024-03-01"
+        self.assertEqual(len(self.manager._user_loans("1001", date_from="2024-01-01", date_to="2024-12-31")), 1)
+        self.assertEqual(len(self.manager._user_loans("1001", date_from="2025-01-01")), 0)
+
+    def test_history_includes_archived_loans(self):
+        self.manager.borrow_book("Carte 1", "1001")
+        self.manager.return_book("Carte 1", "1001")
+        self.manager.data["loans"][0]["actual_return_date"] = "2020-01-15"
+        self.manager.archive_loans(30)
+        manager2 = LibraryManager(self.temp_file.name)
+        self.assertEqual(len(manager2._user_loans("1001")), 1)
+        self.assertEqual(manager2._user_loans("1002"), [])
+
+    def test_history_reads_only_the_user_archived_loans(self):
+        for user_id in ("1001", "1002", "1001"):
+            book = "Carte 1" if user_id == "1001" else "Carte 2"
+            self.manager.borrow_book(book, user_id)
+            self.manager.return_book(book, user_id)
+        for loan in self.manager.data["loans"]:
+            loan["actual_return_date"] = "2020-01-15"
+        self.manager.archive_loans(30)
+        manager2 = LibraryManager(self.temp_file.name)
+        partition = manager2._load_archive_index()["partitions"]["2020-01"]
+        self.assertEqual(len(partition["users"]["1001"]), 2)
+        self.assertEqual([l["id"] for l in manager2._user_loans("1001")], [1, 3])
+        self.assertEqual(len(manager2._read_archive_partition("2020-01")), 3)
+
+
+class TestDateOrdinals(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
+        self.temp_file.close()
+
+    def tearDown(self):
+        remove_sidecars(self.temp_file.name)
+        if os.path.exists(self.temp_file.name):
+            os.unlink(self.temp_file.name)
+
+    def test_new_loan_has_ordinals(self):
+        manager = LibraryManager(self.temp_file.name)
+        manager.add_book("Carte Test", "Autor Test")
+        manager.add_user("Ion Popescu", "1001")
+        manager.borrow_book("Carte Test", "1001", 10)
+        loan = manager.data["loans"][0]
+        self.assertEqual(loan["loan_day"], date.today().toordinal())
+        self.assertEqual(loan["return_day"] - loan["loan_day"], 10)
+
+    def test_old_file_is_upgraded_and_penalty_uses_ordinals(self):
+        due = date.today() - timedelta(days=3)
+        old_data = {
+            "books": [{"id": 1, "title": "Carte Veche", "author": "Autor", "isbn": "N/A",
+                       "status": "IMPRUMUTAT", "loan_count": 1}],
+            "users": [{"id": "1001", "name": "Ion", "active_loans": 1, "total_loans": 1,
+                       "total_penalties": 0, "status": "ACTIV"}],
+            "loans": [{"id": 1, "book_id": 1, "book_title": "Carte Veche", "user_id": "1001",
+                       "user_name": "Ion", "loan_date": (due - timedelta(days=14)).isoformat(),
+                       "return_date": due.isoformat(), "actual_return_date": None,
+                       "status": "ACTIV", "penalty": 0}]
+        }
+        with open(self.temp_file.name, 'w', encoding='utf-8') as f:
+            json.dump(old_data, f)
+
+        manager = LibraryManager(self.temp_file.name)
+        self.assertEqual(manager.data["loans"][0]["return_day"], due.toordinal())
+        manager.return_book("Carte Veche", "1001")
+        self.assertEqual(manager.data["loans"][0]["penalty"], 3)
+        self.assertEqual(manager._find_user("1001")["total_penalties"], 3)
+
+
+class TestCodec(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
+        self.temp_file.close()
+
+    def tearDown(self):
+        remove_sidecars(self.temp_file.name)
+        if os.path.exists(self.temp_file.name):
+            os.unlink(self.temp_file.name)
+
+    def test_compact_file_has_no_indentation(self):
+        manager = LibraryManager(self.temp_file.name, codec="json", compact=True)
+        manager.add_book("Carte Test", "Autor Test")
+        with open(self.temp_file.name, encoding='utf-8') as f:
+            self.assertNotIn("\n", f.read())
+
+    def test_reads_files_written_by_other_codecs(self):
+        manager = LibraryManager(self.temp_file.name, codec="auto")
+        manager.add_book("Carte Ăîș", "Autor Test")
+        manager2 = LibraryManager(self.temp_file.name, codec="json")
+        self.assertEqual(manager2.data["books"][0]["title"], "Carte Ăîș")
+
+    def test_reads_legacy_pretty_printed_file(self):
+        with open(self.temp_file.name, 'w', encoding='utf-8') as f:
+            json.dump({"books": [{"id": 1, "title": "Veche", "author": "A", "status": "DISPONIBIL"}],
+                       "users": [], "loans": []}, f, indent=4, ensure_ascii=False)
+        manager = LibraryManager(self.temp_file.name)
+        self.assertEqual(manager.data["books"][0]["title"], "Veche")
+
+    def test_unknown_codec(self):
+        self.assertIsInstance(get_codec("json"), JsonCodec)
+        with self.assertRaises(ValueError):
+            get_codec("yaml")
+
+
+class TestDirtyTracking(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
+        self.temp_file.close()
+        self.manager = LibraryManager(self.temp_file.name)
+
+    def tearDown(self):
+        remove_sidecars(self.temp_file.name)
+        if os.path.exists(self.temp_file.name):
+            os.unlink(self.temp_file.name)
+
+    def test_save_skipped_when_nothing_changed(self):
+        self.manager.add_book("Carte Test", "Autor Test")
+        self.manager._save_data()
+        self.assertEqual(self.manager.counters["saves"], 1)
+        self.assertEqual(self.manager.counters["saves_skipped"], 1)
+
+    def test_failed_validation_does_not_save(self):
+        self.manager.add_user("Ion Popescu", "1001")
+        self.manager.reactivate_user("1001")
+        self.assertEqual(self.manager.counters["saves"], 1)
+
+    def test_clean_collections_are_reused(self):
+        self.manager.add_book("Carte Test", "Autor Test")
+        self.manager.add_user("Ion Popescu", "1001")
+        self.assertEqual(self.manager.counters["collections_reused"], 7)
+        manager2 = LibraryManager(self.temp_file.name)
+        self.assertEqual(len(manager2.data["books"]), 1)
+        self.assertEqual(len(manager2.data["users"]), 1)
+
+
+class TestIndexSidecar(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
+        self.temp_file.close()
+        manager = LibraryManager(self.temp_file.name)
+        manager.add_book("1984", "George Orwell", "9780451524935")
+        manager.add_book("Dune", "Frank Herbert")
+        manager.add_user("Ion Popescu", "1001")
+        manager.borrow_book("Dune", "1001")
+        # Fisierul index este scris de prima comanda de citire
+        LibraryManager(self.temp_file.name, read_only=True)
+
+    def tearDown(self):
+        remove_sidecars(self.temp_file.name)
+        if os.path.exists(self.temp_file.name):
+            os.unlink(self.temp_file.name)
+
+    def test_sidecar_is_used_when_fresh(self):
+        manager = LibraryManager(self.temp_file.name)
+        self.assertIsInstance(manager._index, MappedIndex)
+        self.assertEqual(manager._find_book("9780451524935")["title"], "1984")
+        self.assertEqual(manager._find_book("dune")["id"], 2)
+        self.assertEqual(manager._find_user("1001")["name"], "Ion Popescu")
+        self.assertEqual(manager._index.active_loan(2)["user_id"], "1001")
+        self.assertEqual(len(manager._index.user_loans("1001")), 1)
+        manager._index.close()
+
+    def test_stale_sidecar_is_rebuilt(self):
+        with open(self.temp_file.name, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data["books"].reverse()
+        with open(self.temp_file.name, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4)
+        manager = LibraryManager(self.temp_file.name)
+        self.assertNotIsInstance(manager._index, MappedIndex)
+        self.assertEqual(manager.counters["index_rebuilt"], 1)
+        self.assertEqual(manager._find_book("1984")["id"], 1)
+
+    def test_mutation_after_mapped_load(self):
+        manager = LibraryManager(self.temp_file.name)
+        manager.return_book("Dune", "1001")
+        manager.add_book("Solaris", "Stanislaw Lem")
+        manager2 = LibraryManager(self.temp_file.name)
+        self.assertNotIsInstance(manager2._index, MappedIndex)
+        self.assertEqual(manager2.counters["index_loaded"], 0)
+        LibraryManager(self.temp_file.name, read_only=True)
+        manager3 = LibraryManager(self.temp_file.name)
+        self.assertIsInstance(manager3._index, MappedIndex)
+        self.assertIsNone(manager3._index.active_loan(2))
+        self.assertEqual(manager3._find_book("Solaris")["id"], 3)
+        manager3._index.close()
+
+    def test_additions_on_mapped_index_are_indexed_once(self):
+        manager = LibraryManager(self.temp_file.name)
+        self.assertIsInstance(manager._index, MappedIndex)
+        manager.add_book("Solaris", "Stanislaw Lem")
+        manager.add_user("Ana Ionescu", "1002")
+        self.assertIsInstance(manager._index, MappedIndex)
+        self.assertEqual([b["id"] for b in manager._index.books_titled("solaris")], [3])
+        manager.borrow_book("Solaris", "1002")
+        self.assertEqual(manager._index.active_loan(3)["user_id"], "1002")
+        self.assertEqual(len(manager._index.user_loans("1002")), 1)
+        manager.return_book("Solaris", "1002")
+        self.assertIsNone(manager._index.active_loan(3))
+        manager.delete_book("Solaris")
+        self.assertEqual(manager._index.books_titled("Solaris"), [])
+
+    def test_delete_on_mapped_index(self):
+        manager = LibraryManager(self.temp_file.name)
+        self.assertIsInstance(manager._index, MappedIndex)
+        manager.delete_book("1984")
+        # Pozitiile din fisierul index s-au mutat: cautarile trec prin indexul din memorie
+        self.assertNotIsInstance(manager._index, MappedIndex)
+        self.assertIsNone(manager._find_book("1984"))
+        self.assertEqual(manager._find_book("Dune")["id"], 2)
+        self.assertEqual(manager._index.active_loan(2)["user_id"], "1001")
+        reloaded = LibraryManager(self.temp_file.name)
+        self.assertEqual([b["title"] for b in reloaded.data["books"]], ["Dune"])
+
+
+class TestQueryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
+        self.temp_file.close()
+        self.manager = LibraryManager(self.temp_file.name)
+        self.manager.add_book("Ferma Animalelor", "George Orwell")
+
+    def tearDown(self):
+        remove_sidecars(self.temp_file.name)
+        if os.path.exists(self.temp_file.name):
+            os.unlink(self.temp_file.name)
+
+    def test_repeated_search_hits_cache(self):
+        self.manager.search_books("Orwell", "author")
+        self.manager.search_books("orwell", "author")
+        # Fatetele sunt numarate din rezultate, fara intrari separate in cache
+        self.assertEqual(self.manager.counters["cache_misses"], 1)
+        self.assertEqual(self.manager.counters["cache_hits"], 1)
+
+    def test_cache_persists_between_runs(self):
+        self.manager.search_books("Orwell", "author")
+        manager2 = LibraryManager(self.temp_file.name)
+        manager2.search_books("Orwell", "author")
+        self.assertEqual(manager2.counters["cache_hits"], 1)
+
+    def test_mutation_invalidates_cache(self):
+        self.manager.search_books("Orwell", "author")
+        self.manager.add_book("1984", "George Orwell")
+        self.manager.search_books("Orwell", "author")
+        self.assertEqual(self.manager.counters["cache_misses"], 2)
+        manager2 = LibraryManager(self.temp_file.name)
+        self.assertEqual(len(manager2._search_positions("Orwell", "author")), 2)
+
+    def test_overdue_report_is_cached_per_day(self):
+        self.manager.generate_report("overdue")
+        self.manager.generate_report("overdue")
+        self.assertEqual(self.manager.counters["cache_hits"], 1)
+
+    def test_new_entries_are_appended_and_compacted(self):
+        cache_file = os.path.splitext(self.temp_file.name)[0] + ".qcache"
+        self.manager.search_books("Orwell", "author")
+        with open(cache_file, 'rb') as f:
+            before = f.read()
+        self.manager.search_books("Ferma", "title")
+        with open(cache_file, 'rb') as f:
+            self.assertTrue(f.read().startswith(before))
+        cache = self.manager._query_cache
+        cache.max_size = 2
+        for query in ("a", "b", "c", "d", "e", "f", "g", "h", "i"):
+            self.manager.search_books(query, "title")
+        with open(cache_file, 'rb') as f:
+            self.assertLessEqual(len(f.readlines()) - 1, 4 * cache.max_size)
+        manager2 = LibraryManager(self.temp_file.name)
+        manager2.search_books("i", "title")
+        self.assertEqual(manager2.counters["cache_hits"], 1)
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_parser_builds_only_requested_command(self):
+        parser = create_parser(["--profile", "stats", "--top", "3"])
+        subparsers = parser._subparsers._group_actions[0]
+        self.assertEqual(list(subparsers.choices), ["stats"])
+        args = parser.parse_args(["--profile", "stats", "--top", "3"])
+        self.assertEqual((args.command, args.top, args.profile), ("stats", 3, True))
+
+    def test_unknown_command_gets_full_parser(self):
+        parser = create_parser(["nu_exista"])
+        subparsers = parser._subparsers._group_actions[0]
+        self.assertIn("add_book", subparsers.choices)
+        self.assertIn("stats", subparsers.choices)
+
+    def test_help_text_built_only_when_requested(self):
+        parser = create_parser()
+        self.assertIsNone(parser.epilog)
+        self.assertIn("EXEMPLE DE UTILIZARE", parser.format_help())
+
+    def test_data_folder_created_on_first_save(self):
+        folder = tempfile.mkdtemp()
+        data_file = os.path.join(folder, "nou", "library_data.json")
+        try:
+            manager = LibraryManager(data_file)
+            self.assertFalse(os.path.exists(os.path.dirname(data_file)))
+            manager.add_book("Carte Test", "Autor Test")
+            self.assertTrue(os.path.exists(data_file))
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+
+class TestBranches(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.branches = {}
+        for name, title in (("centru", "1984"), ("nord", "Dune")):
+            path = os.path.join(self.folder, f"{name}.json")
+            manager = LibraryManager(path)
+            manager.add_book(title, "Autor " + name, category="Fiction")
+            manager.add_user("Cititor " + name, "1001")
+            manager.borrow_book(title, "1001", days=14)
+            self.branches[name] = path
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_federated_search_tags_branch(self):
+        results = {name: part["rows"] for name, part in run_federated("search", ["autor", "author"], self.branches)}
+        self.assertEqual([b["title"] for b in results["centru"]], ["1984"])
+        self.assertEqual(results["nord"][0]["branch"], "nord")
+        self.assertIsNotNone(results["nord"][0]["expected_return"])
+
+    def test_single_branch_runs_in_process(self):
+        results = run_federated("counts", [], {"nord": self.branches["nord"]})
+        self.assertEqual(results, [("nord", {"books": 1, "users": 1, "loans": 1})])
+
+    def test_merged_statistics(self):
+        summaries = [summary for _, summary in run_federated("stats", [5], self.branches)]
+        merged = merge_statistics(summaries, 5)
+        self.assertEqual(merged["total_books"], 2)
+        self.assertEqual(merged["active_loans"], 2)
+        self.assertEqual(merged["categories"], {"Fiction": 2})
+        self.assertEqual(len(merged["top_books"]), 2)
+
+    def test_branch_name_validated(self):
+        self.assertTrue(branch_data_file("nord").endswith(os.path.join("branches", "nord.json")))
+        with self.assertRaises(ValueError):
+            branch_data_file("../nord")
+
+
+class TestChangeLog(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
+        self.temp_file.close()
+        self.export_dir = tempfile.mkdtemp()
+        self.manager = LibraryManager(self.temp_file.name)
+        self.manager.add_book("Carte 1", "Autor 1")
+        self.manager.add_user("Ion Popescu", "1001")
+
+    def tearDown(self):
+        remove_sidecars(self.temp_file.name)
+        shutil.rmtree(self.export_dir, ignore_errors=True)
+        if os.path.exists(self.temp_file.name):
+            os.unlink(self.temp_file.name)
+
+    def read_csv(self, name):
+        with open(os.path.join(self.export_dir, name), newline='', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+
+    def test_every_mutation_logged_in_order(self):
+        self.manager.borrow_book("Carte 1", "1001")
+        events = list(LibraryManager(self.temp_file.name).changes_since(0))
+        self.assertEqual([e["seq"] for e in events], [1, 2, 3, 4, 5])
+        self.assertEqual([(e["op"], e["collection"]) for e in events[:3]],
+                         [("insert", "books"), ("insert", "users"), ("insert", "loans")])
+
+    def test_changes_since_seeks_to_watermark(self):
+        for i in range(2, 40):
+            self.manager.add_book(f"Carte {i}", "Autor")
+        events = list(self.manager.changes_since(25))
+        self.assertEqual([e["seq"] for e in events], list(range(26, 41)))
+        self.assertEqual(list(self.manager.changes_since(40)), [])
+
+    def test_export_since_watermark(self):
+        self.manager.export_changes(self.export_dir, "last")
+        self.manager.borrow_book("Carte 1", "1001")
+        self.manager.return_book("Carte 1", "1001")
+        self.manager.delete_book("Carte 1")
+        self.manager.export_changes(self.export_dir, "last")
+
+        books = self.read_csv("changes_books.csv")
+        self.assertEqual([(b["id"], b["op"]) for b in books], [("1", "delete")])
+        loans = self.read_csv("changes_loans.csv")
+        self.assertEqual([(l["op"], l["status"]) for l in loans], [("update", "RETURNAT")])
+        with open(os.path.join(self.export_dir, "watermark.json")) as f:
+            self.assertEqual(json.load(f)["seq"], 9)
+
+    def test_export_after_reservation(self):
+        self.manager.add_user("Maria Ionescu", "1002")
+        self.manager.borrow_book("Carte 1", "1001")
+        self.manager.reserve_book("Carte 1", "1002")
+        self.manager.export_changes(self.export_dir, "last")
+
+        self.assertEqual(len(self.read_csv("changes_users.csv")), 2)
+        self.assertFalse(os.path.exists(os.path.join(self.export_dir, "changes_holds.csv")))
+        with open(os.path.join(self.export_dir, "watermark.json")) as f:
+            self.assertEqual(json.load(f)["seq"], self.manager.data["meta"]["change_seq"])
+
+
+class TestBackup(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.data_file = os.path.join(self.folder, "library_data.json")
+        self.backup_dir = os.path.join(self.folder, "backups")
+        self.manager = LibraryManager(self.data_file)
+        self.manager.add_book("Carte 1", "Autor 1")
+        self.manager.add_user("Ion Popescu", "1001")
+        self.manager.borrow_book("Carte 1", "1001")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def chunk_files(self):
+        return glob.glob(os.path.join(self.backup_dir, "chunks", "*", "*"))
+
+    def test_unchanged_data_adds_no_chunks(self):
+        self.manager.backup(self.backup_dir)
+        chunks = self.chunk_files()
+        self.manager.backup(self.backup_dir)
+        self.assertEqual(self.chunk_files(), chunks)
+        self.assertEqual(len(list_snapshots(self.backup_dir)), 2)
+
+    def test_chunk_boundaries_survive_insertions(self):
+        books = [{"id": i, "title": f"Carte {i}"} for i in range(1, 5001)]
+        before = [tuple(b["id"] for b in chunk) for chunk in _record_chunks(books)]
+        books.insert(10, {"id": 9999, "title": "Noua"})
+        after = [tuple(b["id"] for b in chunk) for chunk in _record_chunks(books)]
+        self.assertGreater(len(before), 2)
+        self.assertEqual(len(set(before) - set(after)), 1)
+
+    def test_restore_snapshot(self):
+        self.manager.backup(self.backup_dir)
+        snapshot = list_snapshots(self.backup_dir)[0]
+        self.manager.add_book("Carte 2", "Autor 2")
+
+        self.manager.restore(self.backup_dir, snapshot)
+        self.assertEqual(len(LibraryManager(self.data_file).data["books"]), 2)
+
+        self.manager.restore(self.backup_dir, snapshot, force=True)
+        restored = LibraryManager(self.data_file)
+        self.assertEqual([b["title"] for b in restored.data["books"]], ["Carte 1"])
+        self.assertEqual(restored.data["loans"][0]["status"], "ACTIV")
+        self.assertEqual([e["seq"] for e in restored.changes_since(0)], [1, 2, 3, 4, 5])
+
+    def test_corrupt_chunk_is_detected(self):
+        self.manager.backup(self.backup_dir)
+        with open(self.chunk_files()[0], 'ab') as f:
+            f.write(b" ")
+        target = LibraryManager(os.path.join(self.folder, "restaurat.json"))
+        target.restore(self.backup_dir)
+        self.assertEqual(target.data["books"], [])
+
+
+class TestDiffMerge(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.main_file = os.path.join(self.folder, "library_data.json")
+        self.laptop_file = os.path.join(self.folder, "laptop.json")
+        self.base_file = os.path.join(self.folder, "base.json")
+        manager = LibraryManager(self.main_file)
+        manager.add_book("Carte 1", "Autor 1")
+        manager.add_book("Carte 2", "Autor 2")
+        manager.add_user("Ion Popescu", "1001")
+        manager.add_user("Ana Ionescu", "1002")
+        shutil.copy(self.main_file, self.base_file)
+        shutil.copy(self.main_file, self.laptop_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_diff_reports_changes_per_collection(self):
+        laptop = LibraryManager(self.laptop_file)
+        laptop.borrow_book("Carte 1", "1001")
+        laptop.add_book("Carte 3", "Autor 3")
+        result = LibraryManager(self.main_file).diff_file(self.laptop_file)
+        self.assertEqual(result["books"], {"added": [3], "removed": [], "changed": []})
+        self.assertEqual(result["loans"]["added"], [1])
+        # Statusul si contoarele sunt calculate din imprumuturi, nu sunt diferente proprii
+        self.assertEqual(result["users"], {"added": [], "removed": [], "changed": []})
+
+    def test_three_way_merge_applies_offline_changes(self):
+        laptop = LibraryManager(self.laptop_file)
+        laptop.borrow_book("Carte 2", "1002")
+        laptop.return_book("Carte 2", "1002")
+        laptop.add_book("Carte Laptop", "Autor L")
+        main = LibraryManager(self.main_file)
+        main.add_book("Carte Principala", "Autor P")
+
+        result = main.merge_file(self.laptop_file, self.base_file)
+        self.assertEqual(result["conflicts"], [])
+        merged = LibraryManager(self.main_file)
+        self.assertEqual(sorted(b["title"] for b in merged.data["books"]),
+                         ["Carte 1", "Carte 2", "Carte Laptop", "Carte Principala"])
+        user = merged._find_user("1002")
+        self.assertEqual((user["total_loans"], user["returned_loans"]), (1, 1))
+        self.assertEqual(merged.data["books"][1]["loan_count"], 1)
+
+        again = merged.merge_file(self.laptop_file, self.base_file)
+        self.assertEqual(sum(sum(ops.values()) for ops in again["applied"].values()), 0)
+
+    def test_same_book_borrowed_in_both_copies_is_conflict(self):
+        LibraryManager(self.laptop_file).borrow_book("Carte 1", "1001")
+        main = LibraryManager(self.main_file)
+        main.borrow_book("Carte 1", "1002")
+
+        result = main.merge_file(self.laptop_file, self.base_file)
+        self.assertEqual(len(result["conflicts"]), 1)
+        self.assertIn("ambele copii", result["conflicts"][0])
+        active = [l for l in main.data["loans"] if l["status"] == "ACTIV"]
+        self.assertEqual([l["user_id"] for l in active], ["1002"])
+
+    def test_two_way_merge_takes_only_new_records(self):
+        LibraryManager(self.laptop_file).add_user("Nou", "2000")
+        main = LibraryManager(self.main_file)
+        main.deactivate_user("1001")
+        result = main.merge_file(self.laptop_file)
+        self.assertEqual(result["applied"]["users"]["insert"], 1)
+        self.assertEqual(len(result["conflicts"]), 1)
+        self.assertEqual(main._find_user("1001")["status"], "INACTIV")
+
+    def test_stream_reads_values_split_across_blocks(self):
+        document = {"books": [{"id": 12345, "title": "Carte \u0103\u0219", "year": 1999}] * 3,
+                    "meta": {"version": 7}, "format": 2, "strings": ["a", "b"]}
+        stream = JsonStream(io.BytesIO(json.dumps(document, indent=4, ensure_ascii=False).encode('utf-8')),
+                            chunk_size=3)
+        read = {}
+        for key in stream.members():
+            read[key] = list(stream.items()) if key in ("books", "strings") else stream.value()
+        self.assertEqual(read, document)
+
+    def test_diff_memory_does_not_grow_with_file_size(self):
+        def diff_peak(count):
+            records = [{"id": i, "title": f"Carte {i}", "author": f"Autor {i % 50}", "isbn": "",
+                        "category": "Fiction", "year": 2000, "status": "DISPONIBIL",
+                        "date_added": "2025-01-01", "loan_count": 0} for i in range(1, count + 1)]
+            main = LibraryManager(self.main_file)
+            main.data["books"] = records
+            main._mark_dirty("books")
+            main._save_data()
+            shutil.copy(self.main_file, self.laptop_file)
+            LibraryManager(self.laptop_file).add_book("Carte Laptop", "Autor L")
+            main = LibraryManager(self.main_file)
+            tracemalloc.start()
+            try:
+                result = main.diff_file(self.laptop_file)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            self.assertEqual(result["books"]["added"], [count + 1])
+            return peak, os.path.getsize(self.laptop_file)
+
+        small_peak, small_size = diff_peak(1000)
+        large_peak, large_size = diff_peak(4000)
+        # Celalalt fisier nu este incarcat: memoria creste doar cu hash-urile noastre (8 octeti/carte)
+        self.assertLess(large_peak - small_peak, (large_size - small_size) // 10)
+
+
+class TestIntegrityCheck(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
+        self.temp_file.close()
+        self.manager = LibraryManager(self.temp_file.name)
+        self.manager.add_book("Carte 1", "Autor 1", isbn="111")
+        self.manager.add_book("Carte 2", "Autor 2", isbn="222")
+        self.manager.add_user("Ion Popescu", "1001")
+        self.manager.borrow_book("Carte 1", "1001")
+
+    def tearDown(self):
+        remove_sidecars(self.temp_file.name)
+        if os.path.exists(self.temp_file.name):
+            os.unlink(self.temp_file.name)
+
+    def test_consistent_data_has_no_problems(self):
+        result = self.manager.check_integrity()
+        self.assertEqual((result["counters"], result["problems"]), ([], []))
+
+    def test_repair_recomputes_drifted_counters(self):
+        self.manager.data["books"][0]["status"] = "DISPONIBIL"
+        self.manager.data["users"][0]["active_loans"] = 5
+        self.manager.data["users"][0]["total_loans"] = 0
+        result = self.manager.check_integrity(repair=True)
+        self.assertEqual(len(result["counters"]), 3)
+        self.assertEqual(result["repaired"], 2)
+
+        reloaded = LibraryManager(self.temp_file.name)
+        self.assertEqual(reloaded.data["books"][0]["status"], "IMPRUMUTAT")
+        self.assertEqual(reloaded.data["users"][0]["active_loans"], 1)
+        self.assertEqual(reloaded.check_integrity()["counters"], [])
+
+    def test_references_and_duplicates_reported(self):
+        loan = dict(self.manager.data["loans"][0], user_id="9999")
+        self.manager.data["loans"].append(loan)
+        self.manager.data["books"][1]["isbn"] = "111"
+        problems = self.manager.check_integrity()["problems"]
+        self.assertTrue(any("ID duplicat" in p for p in problems))
+        self.assertTrue(any("imprumutata simultan" in p for p in problems))
+        self.assertTrue(any("utilizatorul 9999 nu exista" in p for p in problems))
+        self.assertTrue(any(p.startswith("ISBN 111") for p in problems))
+
+    def test_archived_loans_are_counted(self):
+        self.manager.return_book("Carte 1", "1001")
+        for loan in self.manager.data["loans"]:
+            loan["actual_return_date"] = "2020-01-01"
+        self.manager.archive_loans(days=30)
+        self.assertEqual(self.manager.data["loans"], [])
+        # Data returnarii a fost schimbata manual, deci contoarele zilnice sunt refacute din arhiva
+        self.manager.rebuild_rollups()
+        self.assertEqual(self.manager.check_integrity()["counters"], [])
+
+
+class TestRangeQueries(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
+        self.temp_file.close()
+        self.manager = LibraryManager(self.temp_file.name)
+        for title, year in (("Carte 2005", 2005), ("Carte 1995", 1995), ("Carte 1999", 1999), ("Fara an", None)):
+            self.manager.add_book(title, "Autor", year=year)
+        self.manager.add_user("Ion Popescu", "1001")
+        self.manager.borrow_book("Carte 1995", "1001", days=7)
+        self.manager.borrow_book("Carte 2005", "1001", days=30)
+
+    def tearDown(self):
+        remove_sidecars(self.temp_file.name)
+        if os.path.exists(self.temp_file.name):
+            os.unlink(self.temp_file.name)
+
+    def titles(self, manager, ranges, query=None):
+        return [b["title"] for b in manager._search_results(query, "title", ranges)]
+
+    def test_year_range_sorted_by_year(self):
+        self.assertEqual(self.titles(self.manager, {"year": (1990, 2000)}), ["Carte 1995", "Carte 1999"])
+        self.assertEqual(self.titles(self.manager, {"year": (2000, None)}), ["Carte 2005"])
+        self.assertEqual(self.titles(self.manager, {"year": (1990, 2000)}, query="1999"), ["Carte 1999"])
+
+    def test_mapped_index_serves_ranges(self):
+        LibraryManager(self.temp_file.name, read_only=True)
+        reloaded = LibraryManager(self.temp_file.name)
+        self.assertIsInstance(reloaded._index, MappedIndex)
+        self.assertEqual(self.titles(reloaded, {"year": (1990, 2000)}), ["Carte 1995", "Carte 1999"])
+        today = date.today().toordinal()
+        self.assertEqual(len(self.titles(reloaded, {"date_added": (today, today)})), 4)
+        reloaded.add_book("Carte 1997", "Autor", year=1997)
+        self.assertEqual(self.titles(reloaded, {"year": (1990, 2000)}), ["Carte 1995", "Carte 1997", "Carte 1999"])
+
+    def test_range_index_updated_on_mutations(self):
+        self.titles(self.manager, {"year": (None, None)})
+        self.manager.add_book("Carte 1997", "Autor", year=1997)
+        self.manager.delete_book("Carte 1999")
+        self.assertEqual(self.titles(self.manager, {"year": (1990, 2000)}), ["Carte 1995", "Carte 1997"])
+
+    def test_loans_due_in_range(self):
+        today = date.today().toordinal()
+        due = self.manager._loans_in_range("due", today, today + 7)
+        self.assertEqual([l["book_title"] for l in due], ["Carte 1995"])
+        self.manager.return_book("Carte 1995", "1001")
+        self.assertEqual(self.manager._loans_in_range("due", today, today + 7), [])
+        self.assertEqual(len(self.manager._loans_in_range("loaned", today, None)), 2)
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range("1990:", "year"), (1990, None))
+        self.assertEqual(parse_range("2026-01-01:2026-01-02", "date_added"),
+                         (date(2026, 1, 1).toordinal(), date(2026, 1, 2).toordinal()))
+        with self.assertRaises(ValueError):
+            parse_range("1990", "year")
+
+
+class TestFacets(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
+        self.temp_file.close()
+        self.manager = LibraryManager(self.temp_file.name)
+        self.manager.add_book("Razboi si pace", "Tolstoi", category="Roman", year=1869)
+        self.manager.add_book("Razboiul lumilor", "H.G. Wells", category="SF", year=1898)
+        self.manager.add_book("Razboi in SF", "Autor SF", category="SF", year=1995)
+        self.manager.add_book("Alta carte", "Tolstoi", category="Roman", year=1880)
+        self.manager.add_user("Ion Popescu", "1001")
+        self.manager.borrow_book("Razboiul lumilor", "1001")
+
+    def tearDown(self):
+        remove_sidecars(self.temp_file.name)
+        if os.path.exists(self.temp_file.name):
+            os.unlink(self.temp_file.name)
+
+    def test_counts_only_for_result_set(self):
+        results = self.manager._search_results("razboi", "title")
+        facets = self.manager.facet_counts(results)
+        self.assertEqual(facets["category"], [("SF", 2), ("Roman", 1)])
+        self.assertEqual(facets["status"], [("DISPONIBIL", 2), ("IMPRUMUTAT", 1)])
+        self.assertEqual(facets["decade"], [("1860s", 1), ("1890s", 1), ("1990s", 1)])
+        self.assertNotIn(("Tolstoi", 2), facets["author"])
+
+    def test_drill_down_into_facet_value(self):
+        results = self.manager._search_results("razboi", "title", facet=("category", "SF"))
+        self.assertEqual([b["title"] for b in results], ["Razboiul lumilor", "Razboi in SF"])
+        only_facet = self.manager._search_results(None, "title", facet=("author", "Tolstoi"))
+        self.assertEqual(len(only_facet), 2)
+
+    def test_postings_come_from_index_file(self):
+        self.manager.search_books("razboi")
+        self.manager.search_books(None, facet=("author", "Tolstoi"))
+        with open(os.path.splitext(self.temp_file.name)[0] + ".qcache", encoding='utf-8') as f:
+            kinds = [line.split("|")[1] for line in f if line.startswith('["')]
+        self.assertEqual(kinds, ["search"])
+        reader = LibraryManager(self.temp_file.name, read_only=True)
+        results = reader._search_results(None, "title", None, ("category", "SF"))
+        self.assertEqual([b["title"] for b in results], ["Razboiul lumilor", "Razboi in SF"])
+        self.assertEqual(reader.facet_counts(results)["author"], [("Autor SF", 1), ("H.G. Wells", 1)])
+        self.assertIsNone(reader._postings)
+
+    def test_counts_follow_mutations(self):
+        self.manager.facet_counts(self.manager.data["books"])
+        self.manager.return_book("Razboiul lumilor", "1001")
+        facets = self.manager.facet_counts(self.manager.data["books"])
+        self.assertEqual(facets["status"], [("DISPONIBIL", 4)])
+
+    def test_parse_facet(self):
+        self.assertEqual(parse_facet("decade=1990s"), ("decade", "1990s"))
+        with self.assertRaises(ValueError):
+            parse_facet("editura=Polirom")
+
+
+class TestShell(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
+        self.temp_file.close()
+        self.manager = LibraryManager(self.temp_file.name)
+        self.manager.add_book("Ferma Animalelor", "George Orwell")
+        self.manager.add_book("Fluturi", "Irina Binder")
+        self.manager.add_user("Ion Popescu", "1001")
+        self.shell = LibraryShell(self.manager)
+
+    def tearDown(self):
+        remove_sidecars(self.temp_file.name)
+        if os.path.exists(self.temp_file.name):
+            os.unlink(self.temp_file.name)
+
+    def complete(self, line):
+        text = line.replace('"', " ").split(" ")[-1]
+        return self.shell.completedefault(text, line, len(line) - len(text), len(line))
+
+    def test_trie_prefix_completion(self):
+        words = [f"Titlu {i:04d}" for i in range(1000)] + ["titlu special", "Altceva"]
+        trie = PrefixTrie(words)
+        self.assertEqual(trie.complete("titlu 00", limit=3), ["Titlu 0000", "Titlu 0001", "Titlu 0002"])
+        self.assertEqual(trie.complete("TITLU S"), ["titlu special"])
+        trie.remove("titlu special")
+        trie.add("Titlu 9999")
+        self.assertEqual(trie.complete("titlu s"), [])
+        self.assertEqual(trie.complete("titlu 99"), ["Titlu 9999"])
+
+    def test_completes_titles_authors_and_user_ids(self):
+        self.assertEqual(self.complete('borrow "Ferma An'), ["Animalelor"])
+        self.assertEqual(self.complete('borrow F'), ['"Ferma Animalelor"', "Fluturi"])
+        self.assertEqual(self.complete('search --author Geo'), ['"George Orwell"'])
+        self.assertEqual(self.complete('return Fluturi --user_id 10'), ["1001"])
+
+    def test_commands_update_completions(self):
+        self.shell.default('add_book "Fratii Karamazov" "F. Dostoievski"')
+        self.shell.default('add_user "Ana Ionescu" --id 2002')
+        self.shell.default('delete_book "Fluturi"')
+        self.assertEqual(self.complete('borrow "Fr'), ["Fratii Karamazov"])
+        self.assertEqual(self.complete('borrow "Fl'), [])
+        self.assertEqual(self.complete('borrow x --user_id 2'), ["2002"])
+        self.assertEqual(len(LibraryManager(self.temp_file.name).data["books"]), 2)
+
+    def test_invalid_input_keeps_shell_running(self):
+        self.assertFalse(self.shell.default('nu_exista'))
+        self.assertFalse(self.shell.default('search "fara ghilimea'))
+        self.assertFalse(self.shell.default('--branch all stats'))
+        self.assertTrue(self.shell.default('exit'))
+
+
+class TestRollups(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
+        self.temp_file.close()
+        self.manager = LibraryManager(self.temp_file.name)
+        self.manager.add_user("Ion Popescu", "1001")
+        for i in range(3):
+            self.manager.add_book(f"Carte {i}", "Autor")
+            self.manager.borrow_book(f"Carte {i}", "1001")
+        self.today = date.today().strftime("%Y-%m-%d")
+
+    def tearDown(self):
+        remove_sidecars(self.temp_file.name)
+        if os.path.exists(self.temp_file.name):
+            os.unlink(self.temp_file.name)
+
+    def test_borrow_and_return_update_daily_counters(self):
+        # Un imprumut scadent acum 3 zile este returnat cu penalitate
+        loan = self.manager.data["loans"][0]
+        loan["return_day"] = date.today().toordinal() - 3
+        self.manager.return_book("Carte 0", "1001")
+        self.manager.return_book("Carte 1", "1001")
+        expected = {"loans": 3, "returns": 2, "overdue": 1, "penalties": 3}
+        self.assertEqual(self.manager.data["rollups"], {self.today: expected})
+        self.assertEqual(LibraryManager(self.temp_file.name).data["rollups"][self.today], expected)
+
+    def test_rollups_rebuilt_for_old_files_and_after_archive(self):
+        self.manager.return_book("Carte 2", "1001")
+        returned = self.manager.data["loans"][2]
+        returned["loan_date"] = returned["actual_return_date"] = "2020-01-01"
+        self.manager.rebuild_rollups()
+        self.manager.archive_loans(days=30)
+        expected = dict(self.manager.data["rollups"])
+        self.assertEqual(expected["2020-01-01"]["loans"], 1)
+
+        with open(self.temp_file.name, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+        del raw["rollups"]
+        with open(self.temp_file.name, 'w', encoding='utf-8') as f:
+            json.dump(raw, f)
+        self.assertEqual(LibraryManager(self.temp_file.name).data["rollups"], expected)
+
+    def test_check_repairs_stale_rollups(self):
+        self.manager.data["rollups"][self.today]["loans"] = 10
+        self.manager.data["rollups"]["2021-05-05"] = {"loans": 1, "returns": 0, "overdue": 0, "penalties": 0}
+        result = self.manager.check_integrity(repair=True)
+        self.assertEqual(len(result["counters"]), 2)
+        self.assertEqual(LibraryManager(self.temp_file.name).data["rollups"],
+                         {self.today: {"loans": 3, "returns": 0, "overdue": 0, "penalties": 0}})
+
+    def test_trend_rows_use_rolling_windows(self):
+        today = date.today()
+        rollups = self.manager.data["rollups"] = {}
+        for back in range(10):
+            day = (today - timedelta(days=back)).strftime("%Y-%m-%d")
+            rollups[day] = {"loans": back, "returns": 0, "overdue": 0, "penalties": 2 * back}
+        rows = self.manager._trend_rows(days=5, window=3)
+        self.assertEqual([r["loans"] for r in rows], [4, 3, 2, 1, 0])
+        self.assertEqual([r["avg_loans"] for r in rows], [5, 4, 3, 2, 1])
+        self.assertEqual(rows[0]["avg_penalties"], 10)
+
+        months = self.manager._trend_rows(days=60, window=2, period="month")
+        self.assertEqual(sum(r["loans"] for r in months), 45)
+        self.assertEqual(months[-1]["period"], today.strftime("%Y-%m"))
+
+
+class TestRecommendations(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
+        self.temp_file.close()
+        self.manager = LibraryManager(self.temp_file.name)
+        for i in range(1, 5):
+            self.manager.add_book(f"Carte {i}", "Autor")
+        for user_id in ("1", "2", "3"):
+            self.manager.add_user(f"Cititor {user_id}", user_id)
+        # Fiecare cititor imprumuta si returneaza cartile in ordine
+        for user_id, titles in (("1", [1, 2]), ("2", [1, 3, 2]), ("3", [2, 1, 1])):
+            for i in titles:
+                self.manager.borrow_book(f"Carte {i}", user_id)
+                self.manager.return_book(f"Carte {i}", user_id)
+
+    def tearDown(self):
+        remove_sidecars(self.temp_file.name)
+        if os.path.exists(self.temp_file.name):
+            os.unlink(self.temp_file.name)
+
+    def recommended(self, manager, book_id):
+        return [(book["id"], count) for book, count in manager.also_borrowed(manager._index.book(book_id))]
+
+    def test_counts_readers_in_common(self):
+        self.assertEqual(self.recommended(self.manager, 1), [(2, 3), (3, 1)])
+        self.assertEqual(self.recommended(self.manager, 3), [(1, 1), (2, 1)])
+        self.assertEqual(self.recommended(self.manager, 4), [])
+        self.assertEqual(self.manager._also_borrowed_titles(self.manager._index.book(3)), ["Carte 1", "Carte 2"])
+
+    def test_incremental_matrix_matches_rebuild(self):
+        incremental = self.manager.data["coborrow"]
+        reloaded = LibraryManager(self.temp_file.name)
+        self.assertEqual(reloaded.data["coborrow"], incremental)
+        reloaded._invalidate_coborrow()
+        self.assertEqual(reloaded._coborrow_matrix(), incremental)
+        self.assertTrue(all(isinstance(key, str) for row in incremental.values() for key in row))
+
+    def test_recent_books_are_kept_per_reader(self):
+        self.assertEqual(self.manager.data["recent_books"]["2"], ["1", "3", "2"])
+        reloaded = LibraryManager(self.temp_file.name)
+        self.assertEqual(reloaded.data["recent_books"], self.manager.data["recent_books"])
+
+    def test_rebuild_on_read_does_not_save(self):
+        self.manager.data["meta"].pop("coborrow_history")
+        self.manager._mark_dirty("meta", bump_version=False)
+        self.manager._save_data()
+        saved = os.stat(self.temp_file.name).st_mtime_ns
+        reader = LibraryManager(self.temp_file.name)
+        self.assertEqual(self.recommended(reader, 1), [(2, 3), (3, 1)])
+        self.assertEqual(reader.counters["saves"], 0)
+        self.assertEqual(os.stat(self.temp_file.name).st_mtime_ns, saved)
+
+    def test_deleted_books_are_not_recommended(self):
+        self.manager.delete_book("Carte 3")
+        self.assertEqual(self.recommended(self.manager, 1), [(2, 3)])
+
+    def test_neighbours_are_pruned(self):
+        matrix = {}
+        _coborrow_add(matrix, "1", ["2"])
+        _coborrow_add(matrix, "1", [str(i) for i in range(2, 2 * COBORROW_NEIGHBOURS + 10)])
+        self.assertLessEqual(len(matrix["1"]), 2 * COBORROW_NEIGHBOURS)
+        self.assertEqual(matrix["1"]["2"], 2)
+
+
+class TestHolds(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
+        self.temp_file.close()
+        self.manager = LibraryManager(self.temp_file.name)
+        self.manager.add_book("Dune", "F. Herbert")
+        for user_id in ("1", "2", "3", "4"):
+            self.manager.add_user(f"Cititor {user_id}", user_id)
+        self.manager.borrow_book("Dune", "1")
+        self.book = self.manager.data["books"][0]
+
+    def tearDown(self):
+        remove_sidecars(self.temp_file.name)
+        if os.path.exists(self.temp_file.name):
+            os.unlink(self.temp_file.name)
+
+    def test_return_assigns_next_holder_by_priority_then_time(self):
+        self.manager.reserve_book("Dune", "2")
+        self.manager.reserve_book("Dune", "3")
+        self.manager.reserve_book("Dune", "4", priority=1)
+        self.assertEqual([h["user_id"] for h in self.manager._book_holds(1)], ["4", "2", "3"])
+
+        self.manager.return_book("Dune", "1")
+        self.assertEqual(self.book["status"], "REZERVAT")
+        self.assertEqual([h["user_id"] for h in self.manager._ready_holds()], ["4"])
+        self.manager.borrow_book("Dune", "2")
+        self.assertEqual(len(self.manager.data["loans"]), 1)
+
+        self.manager.borrow_book("Dune", "4")
+        self.assertEqual(self.book["status"], "IMPRUMUTAT")
+        self.assertEqual(self.manager._ready_holds(), [])
+        self.manager.return_book("Dune", "4")
+        reloaded = LibraryManager(self.temp_file.name)
+        self.assertEqual([h["user_id"] for h in reloaded._ready_holds()], ["2"])
+        self.assertEqual(reloaded.check_integrity()["counters"], [])
+
+    def test_invalid_reservations_are_rejected(self):
+        self.manager.reserve_book("Dune", "1")
+        self.manager.reserve_book("Dune", "2")
+        self.manager.reserve_book("Dune", "2")
+        self.manager.add_book("Fluturi", "I. Binder")
+        self.manager.reserve_book("Fluturi", "2")
+        self.assertEqual([h["user_id"] for h in self.manager.data["holds"]], ["2"])
+
+    def test_cancelled_and_inactive_holders_are_skipped(self):
+        for user_id in ("2", "3", "4"):
+            self.manager.reserve_book("Dune", user_id)
+        self.manager.cancel_reservation("Dune", "2")
+        self.manager.deactivate_user("3")
+        self.manager.return_book("Dune", "1")
+        self.assertEqual([h["user_id"] for h in self.manager._ready_holds()], ["4"])
+        self.assertEqual([h["status"] for h in self.manager.data["holds"]], ["ANULATA", "ANULATA", "PREGATITA"])
+
+        # Anularea unei rezervari pregatite elibereaza cartea
+        self.manager.cancel_reservation("Dune", "4")
+        self.assertEqual(self.book["status"], "DISPONIBIL")
+        self.assertEqual(self.manager._ready_holds(), [])
+        self.assertEqual(self.manager.data["hold_queues"]["waiting"], {})
+
+    def test_uncollected_hold_expires_to_next_holder(self):
+        self.manager.reserve_book("Dune", "2")
+        self.manager.reserve_book("Dune", "3")
+        self.manager.return_book("Dune", "1")
+        # Termenul de ridicare a trecut: la urmatoarea operatie cartea trece mai departe
+        self.manager.data["hold_queues"]["ready"][0][0] = date.today().toordinal() - 1
+        self.manager.borrow_book("Dune", "2")
+        self.assertEqual([h["status"] for h in self.manager.data["holds"]], ["EXPIRATA", "PREGATITA"])
+        self.manager.borrow_book("Dune", "3")
+        self.assertEqual(self.manager.data["loans"][-1]["user_id"], "3")
+
+    def test_rejected_borrow_leaves_no_unsaved_expiry(self):
+        self.manager.reserve_book("Dune", "2")
+        self.manager.reserve_book("Dune", "3")
+        self.manager.return_book("Dune", "1")
+        self.manager.data["hold_queues"]["ready"][0][0] = date.today().toordinal() - 1
+        self.manager.borrow_book("Dune", "2", days=90)
+        self.manager.borrow_book("Dune", "999")
+        self.assertEqual([h["status"] for h in self.manager.data["holds"]], ["PREGATITA", "ASTEPTARE"])
+        self.assertFalse(self.manager._dirty)
+
+        # Respins dupa expirare (cartea trece la cititorul 3): expirarea este salvata
+        self.manager.borrow_book("Dune", "2")
+        self.assertFalse(self.manager._dirty)
+        reloaded = LibraryManager(self.temp_file.name)
+        self.assertEqual([h["status"] for h in reloaded.data["holds"]], ["EXPIRATA", "PREGATITA"])
+
+
+class TestNotify(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
+        self.temp_file.close()
+        self.spool = tempfile.mkdtemp()
+        manager = LibraryManager(self.temp_file.name)
+        manager.add_user("Ion Popescu", "1001", "ion@test.com")
+        today = date.today().toordinal()
+        # Zilele de intarziere: 3, 0 (scadent azi), 0, nescadent, 1
+        for i, late in enumerate([3, 0, 0, -5, 1]):
+            manager.add_book(f"Carte {i}", "Autor")
+            manager.borrow_book(f"Carte {i}", "1001")
+            loan = manager.data["loans"][-1]
+            loan["return_day"] = today - late
+            loan["return_date"] = date.fromordinal(today - late).strftime("%Y-%m-%d")
+            manager._record_change("update", "loans", loan)
+        manager._save_data()
+        self.manager = LibraryManager(self.temp_file.name)
+
+    def tearDown(self):
+        remove_sidecars(self.temp_file.name)
+        shutil.rmtree(self.spool, ignore_errors=True)
+        if os.path.exists(self.temp_file.name):
+            os.unlink(self.temp_file.name)
+
+    def notices(self):
+        rows = []
+        for path in sorted(glob.glob(os.path.join(self.spool, "notices-*.ndjson"))):
+            with open(path, 'r', encoding='utf-8') as f:
+                rows.extend(json.loads(line) for line in f)
+        return rows
+
+    def test_notices_follow_due_date_order_in_batches(self):
+        self.manager.notify(self.spool, batch_size=2)
+        notices = self.notices()
+        self.assertEqual([n["loan_id"] for n in notices], [1, 5, 2, 3])
+        self.assertEqual([n["type"] for n in notices], ["penalty", "penalty", "reminder", "reminder"])
+        self.assertEqual((notices[0]["penalty"], notices[0]["email"]), (3, "ion@test.com"))
+        self.assertEqual(len(glob.glob(os.path.join(self.spool, "notices-*.ndjson"))), 2)
+
+    def test_rerun_same_day_does_not_duplicate(self):
+        self.manager.notify(self.spool, batch_size=2)
+        self.manager.notify(self.spool, batch_size=2)
+        LibraryManager(self.temp_file.name).notify(self.spool)
+        self.assertEqual(len(self.notices()), 4)
+
+    def test_interrupted_run_resumes_after_watermark(self):
+        self.manager.notify(self.spool, batch_size=2)
+        expected = self.notices()
+        # Simulam o intrerupere dupa primul lot
+        files = sorted(glob.glob(os.path.join(self.spool, "notices-*.ndjson")))
+        os.unlink(files[1])
+        with open(os.path.join(self.spool, "watermark.json"), 'r', encoding='utf-8') as f:
+            mark = json.load(f)
+        mark.update(return_day=date.today().toordinal() - 1, loan_id=expected[1]["loan_id"], batches=1, sent=2)
+        with open(os.path.join(self.spool, "watermark.json"), 'w', encoding='utf-8') as f:
+            json.dump(mark, f)
+        self.manager.notify(self.spool, batch_size=2)
+        self.assertEqual(self.notices(), expected)
+
+    def test_new_day_starts_over(self):
+        self.manager.notify(self.spool)
+        with open(os.path.join(self.spool, "watermark.json"), 'r', encoding='utf-8') as f:
+            mark = json.load(f)
+        mark["day"] = "2000-01-01"
+        with open(os.path.join(self.spool, "watermark.json"), 'w', encoding='utf-8') as f:
+            json.dump(mark, f)
+        # Fisierele zilei anterioare au fost preluate de serviciul de email
+        for path in glob.glob(os.path.join(self.spool, "notices-*.ndjson")):
+            os.unlink(path)
+        self.manager.return_book("Carte 0", "1001")
+        self.manager.notify(self.spool)
+        self.assertEqual([n["loan_id"] for n in self.notices()], [5, 2, 3])
+
+    def test_targets_come_from_active_loans_only(self):
+        self.manager.return_book("Carte 0", "1001")
+        today = date.today().toordinal()
+        targets = self.manager._notice_targets(today, (0, 0))
+        self.assertNotIsInstance(targets, list)
+        self.assertEqual([loan["id"] for loan in targets], [5, 2, 3])
+        # Istoricul pe data returnarii nu este sortat/parcurs
+        self.assertNotIn("return_date", self.manager._index.ranges)
+        # Primul cititor scrie fisierul index, al doilea il foloseste mapat
+        LibraryManager(self.temp_file.name, read_only=True)
+        reader = LibraryManager(self.temp_file.name, read_only=True)
+        self.assertIsInstance(reader._index, MappedIndex)
+        self.assertEqual([loan["id"] for loan in reader._notice_targets(today, (today - 1, 5))], [2, 3])
+
+    def test_due_index_follows_new_and_returned_loans(self):
+        today = date.today().toordinal()
+        self.assertEqual([loan["id"] for loan in self.manager._notice_targets(today, (0, 0))], [1, 5, 2, 3])
+        self.manager.return_book("Carte 1", "1001")
+        self.manager.add_book("Carte noua", "Autor")
+        self.manager.borrow_book("Carte noua", "1001", days=1)
+        self.assertEqual([loan["id"] for loan in self.manager._notice_targets(today, (0, 0))], [1, 5, 3])
+        self.assertEqual([loan["id"] for loan in self.manager._notice_targets(today + 1, (today, 3))], [6])
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
+
+
+class TestBulkImport(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
+        self.temp_file.close()
+        self.folder = tempfile.mkdtemp()
+        self.manager = LibraryManager(self.temp_file.name)
+        self.manager.add_user("Ion Popescu", "1001", "ion@test.com")
+        self.manager.add_book("Ion", "Liviu Rebreanu", isbn="111")
+        self.manager.add_book("Enigma Otiliei", "George Calinescu")
+
+    def tearDown(self):
+        remove_sidecars(self.temp_file.name)
+        shutil.rmtree(self.folder, ignore_errors=True)
+        if os.path.exists(self.temp_file.name):
+            os.unlink(self.temp_file.name)
+
+    def write_csv(self, name, header, rows):
+        path = os.path.join(self.folder, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(header + "\n" + "".join(row + "\n" for row in rows))
+        return path
+
+    def test_users_import_rejects_duplicates_and_invalid_rows(self):
+        path = self.write_csv("users.csv", "id,name,email,registration_date,status", [
+            "2001,Maria Ionescu,maria@test.com,2024-03-01,ACTIV",
+            "1001,Ion Dublat,,,",
+            "2001,Maria Dublata,,,",
+            "2002,Fara Email,gresit,,",
+            "2003,Vasile Pop,,,INACTIV",
+        ])
+        self.manager.import_users(path)
+        users = {u["id"]: u for u in self.manager.data["users"]}
+        self.assertEqual(sorted(users), ["1001", "2001", "2003"])
+        self.assertEqual(users["2001"]["registration_date"], "2024-03-01")
+        self.assertEqual((users["2003"]["status"], users["2003"]["email"]), ("INACTIV", "N/A"))
+        self.assertEqual(LibraryManager(self.temp_file.name)._index.user("2003")["name"], "Vasile Pop")
+
+    def test_loans_import_recomputes_counters_and_rollups_with_one_save(self):
+        path = self.write_csv("history.csv",
+                              "book_id,isbn,user_id,loan_date,return_date,actual_return_date,penalty", [
+                                  ",111,1001,2024-01-01,2024-01-15,2024-01-18,",
+                                  "2,,1001,2024-02-01,2024-02-15,,",
+                                  "99,,1001,2024-02-01,2024-02-15,,",
+                                  "1,,9999,2024-02-01,2024-02-15,,",
+                                  "1,,1001,2024-03-10,2024-03-01,,",
+                              ])
+        saves = self.manager.counters["saves"]
+        self.manager.import_loans(path)
+        self.assertEqual(self.manager.counters["saves"], saves + 1)
+
+        loans = self.manager.data["loans"]
+        self.assertEqual([(l["id"], l["status"], l["penalty"]) for l in loans],
+                         [(1, "RETURNAT", 3), (2, "ACTIV", 0)])
+        self.assertEqual(self.manager._index.active_loan(2)["id"], 2)
+        books = {b["id"]: b for b in self.manager.data["books"]}
+        self.assertEqual((books[1]["status"], books[1]["loan_count"]), ("DISPONIBIL", 1))
+        self.assertEqual(books[2]["status"], "IMPRUMUTAT")
+        user = self.manager.data["users"][0]
+        self.assertEqual((user["total_loans"], user["active_loans"], user["total_penalties"]), (2, 1, 3))
+        self.assertEqual(self.manager.data["rollups"]["2024-01-18"]["penalties"], 3)
+        self.assertEqual(self.manager.check_integrity()["counters"], [])
+
+    def test_loans_reimport_is_idempotent(self):
+        path = self.write_csv("history.csv", "book_id,user_id,loan_date,return_date,actual_return_date", [
+            "1,1001,2024-01-01,2024-01-15,2024-01-10",
+            "2,1001,2024-02-01,2024-02-15,",
+            "2,1001,2024-02-05,2024-02-20,",
+        ])
+        self.manager.import_loans(path)
+        self.assertEqual(len(self.manager.data["loans"]), 2)
+        self.manager.import_loans(path)
+        manager = LibraryManager(self.temp_file.name)
+        self.assertEqual(len(manager.data["loans"]), 2)
+        self.assertEqual(manager.data["users"][0]["total_loans"], 2)
+
+
+class TestParallelImport(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.files = []
+        self.manager = self.new_manager()
+        self.manager.add_book("Existenta", "Autor", isbn="E-1")
+        self.catalog = os.path.join(self.folder, "catalog")
+        os.mkdir(self.catalog)
+        for n in range(3):
+            rows = [f"Titlu {n}-{i},Autor {i % 7},ISBN-{(n * 40 + i) % 90},Roman,{1900 + i}" for i in range(60)]
+            rows += [",Fara titlu,,,", f"Duplicat {n},Autor,E-1,,"]
+            with open(os.path.join(self.catalog, f"furnizor_{n}.csv"), 'w', encoding='utf-8') as f:
+                f.write("title,author,isbn,category,year\n" + "\n".join(rows) + "\n")
+
+    def tearDown(self):
+        for path in self.files:
+            remove_sidecars(path)
+            if os.path.exists(path):
+                os.unlink(path)
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def new_manager(self):
+        temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
+        temp_file.close()
+        self.files.append(temp_file.name)
+        return LibraryManager(temp_file.name)
+
+    def imported_books(self, *paths, **options):
+        manager = self.new_manager()
+        manager.add_book("Existenta", "Autor", isbn="E-1")
+        manager.import_data(*paths, **options)
+        return manager.data["books"]
+
+    def test_parallel_import_matches_sequential(self):
+        sequential = self.imported_books(self.catalog, workers=1)
+        self.assertEqual(len(sequential), 1 + 90)
+        self.assertEqual(len({b["isbn"] for b in sequential}), len(sequential))
+        self.assertEqual([b["id"] for b in sequential], list(range(1, 92)))
+        self.assertEqual(self.imported_books(self.catalog, workers=3, split_bytes=256), sequential)
+
+    def test_byte_range_split_keeps_every_line_once(self):
+        path = os.path.join(self.catalog, "furnizor_0.csv")
+        whole = self.imported_books(path, workers=1)
+        for split in (1, 7, 64, 100):
+            self.assertEqual(self.imported_books(path, workers=1, split_bytes=split), whole)
+
+    def test_quoted_newlines_across_split_fall_back_to_whole_file(self):
+        path = os.path.join(self.folder, "note.csv")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('title,author,category\n"Carte\nCu, virgule\nsi linii",Autor,X\nAlta,Autor,Y\n')
+        books = self.imported_books(path, workers=2, split_bytes=30)
+        self.assertEqual([b["title"] for b in books[1:]], ["Carte\nCu, virgule\nsi linii", "Alta"])
+
+    def test_empty_category_is_kept(self):
+        path = os.path.join(self.folder, "categorii.csv")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("title,author,category\nFara categorie,Autor,\nCu categorie,Autor,SF\n")
+        books = self.imported_books(path, workers=1)
+        self.assertEqual([b["category"] for b in books[1:]], ["", "SF"])
+        without_column = os.path.join(self.folder, "fara_coloana.csv")
+        with open(without_column, 'w', encoding='utf-8') as f:
+            f.write("title,author\nCarte,Autor\n")
+        self.assertEqual(self.imported_books(without_column, workers=1)[1]["category"], "Necategorizat")
+
+    def test_missing_file_imports_nothing(self):
+        self.manager.import_data(self.catalog, os.path.join(self.folder, "lipsa.csv"))
+        self.assertEqual(len(self.manager.data["books"]), 1)
+
+
+class TestDictionaryEncoding(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
+        self.temp_file.close()
+        self.old_file = self.temp_file.name + ".v1.json"
+        manager = LibraryManager(self.temp_file.name)
+        manager.add_user("Ion Popescu", "1001")
+        for i in range(4):
+            manager.add_book(f"Carte {i}", "Mihai Eminescu", category="Poezie")
+        manager.borrow_book("Carte 0", "1001")
+        manager.return_book("Carte 0", "1001")
+        manager.borrow_book("Carte 0", "1001")
+
+    def tearDown(self):
+        for path in (self.temp_file.name, self.old_file):
+            remove_sidecars(path)
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def raw(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_repeated_strings_are_stored_once(self):
+        raw = self.raw(self.temp_file.name)
+        self.assertEqual(raw["format"], 2)
+        self.assertEqual(raw["strings"].count("Mihai Eminescu"), 1)
+        self.assertTrue(all(isinstance(book["author"], int) for book in raw["books"]))
+        self.assertEqual(raw["strings"][raw["loans"][0]["book_title"]], "Carte 0")
+
+        loans = LibraryManager(self.temp_file.name).data["loans"]
+        self.assertEqual(loans[0]["book_title"], "Carte 0")
+        self.assertIs(loans[0]["book_title"], loans[1]["book_title"])
+
+    def test_old_format_is_still_read(self):
+        expected = LibraryManager(self.temp_file.name).data
+        old = LibraryManager(self.old_file, data_format=1)
+        old.data.update({key: expected[key] for key in ("books", "users", "loans")})
+        old._mark_dirty("books")
+        old._save_data()
+        self.assertNotIn("strings", self.raw(self.old_file))
+
+        manager = LibraryManager(self.old_file)
+        self.assertEqual(manager.data["books"], expected["books"])
+        self.assertEqual(manager.data["loans"], expected["loans"])
+        result = manager.diff_file(self.temp_file.name)
+        self.assertTrue(all(not any(changes.values()) for changes in result.values()))
+
+    def test_incremental_save_extends_the_table(self):
+        manager = LibraryManager(self.temp_file.name)
+        manager._mark_dirty("books")
+        manager._save_data()
+        manager.add_book("Ion", "Liviu Rebreanu", category="Roman")
+        self.assertEqual(manager.counters["collections_reused"], 7)
+        self.assertEqual(self.raw(self.temp_file.name)["strings"][-2:], ["Liviu Rebreanu", "Roman"])
+        reloaded = LibraryManager(self.temp_file.name).data
+        self.assertEqual(reloaded["books"], manager.data["books"])
+        self.assertEqual(reloaded["loans"], manager.data["loans"])
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
+        self.temp_file.close()
+        self.snapshot_file = os.path.splitext(self.temp_file.name)[0] + ".snap"
+        manager = LibraryManager(self.temp_file.name)
+        manager.add_user("Ion Popescu", "1001", "ion@test.com")
+        manager.add_user("Maria Ionescu", "1002")
+        for i in range(5):
+            manager.add_book(f"Carte {i}", "Autor Ș", category="Poezie" if i % 2 else "Roman", year=2000 + i)
+        manager.add_book("Fara an", "Autor")
+        manager.borrow_book("Carte 0", "1001")
+        manager.borrow_book("Carte 1", "1002")
+        manager.return_book("Carte 1", "1002")
+        manager.borrow_book("Carte 1", "1001")
+
+    def tearDown(self):
+        remove_sidecars(self.temp_file.name)
+        if os.path.exists(self.temp_file.name):
+            os.unlink(self.temp_file.name)
+
+    def test_read_only_manager_serves_records_from_snapshot(self):
+        expected = LibraryManager(self.temp_file.name).data
+        manager = LibraryManager(self.temp_file.name, read_only=True)
+        self.assertIsInstance(manager.data["loans"], SnapshotRecords)
+        for collection in ("books", "users", "loans", "holds", "rollups"):
+            self.assertEqual(list(manager.data[collection]), list(expected[collection]))
+        self.assertIsNone(manager.data["books"][-1]["year"])
+        self.assertIs(manager.data["books"][0], manager._index.book(1))
+        self.assertEqual(manager.also_borrowed(manager.data["books"][1]), [(manager.data["books"][0], 1)])
+
+    def test_read_commands_match_full_load(self):
+        full = LibraryManager(self.temp_file.name)
+        snapshot = LibraryManager(self.temp_file.name, read_only=True)
+        today = date.today().toordinal()
+        for manager in (full, snapshot):
+            manager.results = (manager._statistics_summary(), manager._search_results("carte", "title"),
+                               manager._overdue_loans(today + 30), manager._popular_books(3),
+                               manager._top_active_users(3), manager._borrowed_loans())
+        self.assertEqual(snapshot.results, full.results)
+
+    def test_stale_or_unsupported_snapshot_falls_back_to_json(self):
+        manager = LibraryManager(self.temp_file.name)
+        with open(self.temp_file.name, 'ab') as f:
+            f.write(b"\n")
+        self.assertNotIsInstance(LibraryManager(self.temp_file.name, read_only=True).data["books"], SnapshotRecords)
+
+        manager.data["books"][0]["note"] = "camp nou"
+        manager._record_change("update", "books", manager.data["books"][0])
+        manager._save_data()
+        reader = LibraryManager(self.temp_file.name, read_only=True)
+        self.assertEqual(reader.data["books"][0]["note"], "camp nou")
+        self.assertFalse(os.path.exists(self.snapshot_file))
+
+    def test_save_rewrites_only_changed_sections(self):
+        manager = LibraryManager(self.temp_file.name)
+        manager.add_book("Noua", "Autor")
+        # Cartile si meta sunt serializate din nou, restul este copiat din instantaneul anterior
+        self.assertEqual(manager.counters["snapshot_written"], 2)
+        self.assertEqual(manager.counters["snapshot_reused"], len(manager.data) - 2)
+        reader = LibraryManager(self.temp_file.name, read_only=True)
+        self.assertIsInstance(reader.data["books"], SnapshotRecords)
+        self.assertEqual(reader.data["books"][-1]["title"], "Noua")
+        self.assertEqual(list(reader.data["loans"]), list(manager.data["loans"]))
+
+        # Fara instantaneu valid pentru starea anterioara, toate sectiunile sunt scrise
+        os.unlink(self.snapshot_file)
+        other = LibraryManager(self.temp_file.name)
+        other.add_user("Nou", "1003")
+        self.assertEqual(other.counters["snapshot_reused"], 0)
+        self.assertIsInstance(LibraryManager(self.temp_file.name, read_only=True).data["users"], SnapshotRecords)
+
+    def test_readers_never_write_files(self):
+        reader = LibraryManager(self.temp_file.name, read_only=True)
+        reader._mark_dirty("books")
+        reader._save_data()
+        self.assertEqual(reader.counters["saves"], 0)
+
+        # Fisier modificat din afara aplicatiei: instantaneul este invechit si nu este rescris
+        with open(self.temp_file.name, 'ab') as f:
+            f.write(b"\n")
+        written = os.stat(self.snapshot_file).st_mtime_ns
+        reader = LibraryManager(self.temp_file.name, read_only=True)
+        self.assertNotIsInstance(reader.data["books"], SnapshotRecords)
+        self.assertEqual(os.stat(self.snapshot_file).st_mtime_ns, written)
+        os.unlink(self.snapshot_file)
+        LibraryManager(self.temp_file.name, read_only=True)
+        self.assertFalse(os.path.exists(self.snapshot_file))
+
+    def test_readers_never_rewrite_the_data_file(self):
+        manager = LibraryManager(self.temp_file.name)
+        # Fisier mai vechi: fara matricea de co-imprumut
+        manager._invalidate_coborrow()
+        manager._mark_dirty("meta", bump_version=False)
+        manager._save_data()
+        saved = os.stat(self.temp_file.name).st_mtime_ns
+        LibraryManager(self.temp_file.name, read_only=True).flush()
+        reader = LibraryManager(self.temp_file.name, read_only=True)
+        self.assertIsInstance(reader.data["loans"], SnapshotRecords)
+        # Matricea este reconstruita doar in memorie
+        self.assertEqual(reader.also_borrowed(reader.data["books"][1]), [(reader.data["books"][0], 1)])
+        self.assertEqual(os.stat(self.temp_file.name).st_mtime_ns, saved)
+
+    def test_catalog_without_loans_is_served_from_snapshot(self):
+        path = self.temp_file.name + ".fara_imprumuturi.json"
+        LibraryManager(path).add_book("Singura", "Autor")
+        try:
+            LibraryManager(path, read_only=True)
+            reader = LibraryManager(path, read_only=True)
+            self.assertIsInstance(reader.data["books"], SnapshotRecords)
+            self.assertEqual(reader.also_borrowed(reader.data["books"][0]), [])
+        finally:
+            remove_sidecars(path)
+            os.unlink(path)
+
+
+class TestGroupCommit(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False)
+        self.temp_file.close()
+        manager = LibraryManager(self.temp_file.name)
+        manager.add_book("Ferma Animalelor", "George Orwell")
+        manager.add_user("Ion Popescu", "1001")
+
+    def tearDown(self):
+        remove_sidecars(self.temp_file.name)
+        if os.path.exists(self.temp_file.name):
+            os.unlink(self.temp_file.name)
+
+    def stored_titles(self):
+        return [b["title"] for b in LibraryManager(self.temp_file.name).data["books"]]
+
+    def test_fsync_mode_writes_every_operation(self):
+        manager = LibraryManager(self.temp_file.name, durability="fsync")
+        manager.add_book("Dune", "F. Herbert")
+        self.assertIn("Dune", self.stored_titles())
+        self.assertEqual(manager.counters["saves"], 1)
+        # Doar fisierul de date este sincronizat; jurnalul de schimbari este totusi scris
+        self.assertEqual(manager.counters["fsyncs"], 1)
+        self.assertEqual([e["op"] for e in manager.changes_since(0)][-1], "insert")
+        self.assertEqual(manager.flush(), 0)
+
+    def test_group_mode_syncs_change_log_once_per_group(self):
+        manager = LibraryManager(self.temp_file.name, durability="group", group_ops=100, group_ms=60_000)
+        manager.add_book("Dune", "F. Herbert")
+        manager.add_book("Solaris", "S. Lem")
+        self.assertEqual(manager.counters["fsyncs"], 0)
+        self.assertEqual(manager.flush(), 2)
+        self.assertEqual(manager.counters["fsyncs"], 2)
+
+    def test_group_mode_writes_after_group_ops(self):
+        manager = LibraryManager(self.temp_file.name, durability="group", group_ops=3, group_ms=60_000)
+        manager.add_book("Dune", "F. Herbert")
+        manager.borrow_book("Dune", "1001")
+        self.assertEqual(self.stored_titles(), ["Ferma Animalelor"])
+        self.assertEqual(manager.counters["saves_deferred"], 2)
+        manager.return_book("Dune", "1001")
+        reloaded = LibraryManager(self.temp_file.name)
+        self.assertEqual(reloaded.data["books"][-1]["status"], "DISPONIBIL")
+        self.assertEqual(len(reloaded.data["loans"]), 1)
+        seqs = [e["seq"] for e in reloaded.changes_since(0)]
+        self.assertEqual(seqs, list(range(1, reloaded.data["meta"]["change_seq"] + 1)))
+
+    def test_explicit_and_interval_flush(self):
+        manager = LibraryManager(self.temp_file.name, durability="group", group_ops=100, group_ms=60_000)
+        manager.add_book("Dune", "F. Herbert")
+        manager.add_user("Ana Ionescu", "1002")
+        self.assertEqual(manager.flush(due_only=True), 0)
+        self.assertEqual(manager.flush(), 2)
+        self.assertIn("Dune", self.stored_titles())
+        self.assertEqual(manager.flush(), 0)
+
+        manager.group_ms = 0
+        manager.add_book("Solaris", "S. Lem")
+        self.assertIn("Solaris", self.stored_titles())
+        with self.assertRaises(ValueError):
+            LibraryManager(self.temp_file.name, durability="niciodata")
+
+    def test_batch_runs_commands_and_flushes(self):
+        commands = os.path.splitext(self.temp_file.name)[0] + ".ops"
+        with open(commands, 'w', encoding='utf-8') as f:
+            f.write('# comentariu\nadd_book "Dune" "F. Herbert"\n\nborrow Dune --user_id 1001\n'
+                    '--durability fsync stats\n')
+        manager = LibraryManager(self.temp_file.name, durability="group", group_ops=100, group_ms=60_000)
+        run_batch(manager, commands)
+        self.assertEqual(manager.counters["saves"], 1)
+        self.assertEqual(LibraryManager(self.temp_file.name).data["books"][-1]["status"], "IMPRUMUTAT")